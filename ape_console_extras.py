@@ -1,10 +1,12 @@
 # ruff: noqa: T201
 
 import os
+from functools import cache
 
 import web3
-from ape import convert
+from ape.api.address import BaseAddress
 
+from scripts._helpers.ownership import rotate_ownership, summary_path  # noqa: PLC2701
 from scripts.deployment import DeploymentManager, Environment
 
 ENV = Environment[os.environ.get("ENV", "local")]
@@ -21,29 +23,85 @@ def transfer(w3, wallet, val=10**60):
     print(f"new balance: {w3.eth.get_balance(wallet)}")
 
 
-def propose_owner(dm, from_wallet, to_wallet):
-    contracts = [c for c in dm.context.contracts.values() if hasattr(c.contract, "proposeOwner")]
+def propose_owner(dm, from_wallet, to_wallet, **kwargs):
     dm.owner.set_autosign(True)
-    for i, c in enumerate(contracts):
-        c.contract.proposeOwner(to_wallet, sender=from_wallet, gas_price=convert("28 gwei", int))
-        print(f"Signed contract {i + 1} out of {len(contracts)}")
+    action = "propose"
+    return rotate_ownership(dm.context.contracts, from_wallet, action, to_wallet, summary_path(ENV, action), **kwargs)
 
 
-def claim_ownership(dm, wallet):
-    contracts = [c for c in dm.context.contracts.values() if hasattr(c.contract, "claimOwnership")]
+def claim_ownership(dm, wallet, **kwargs):
     dm.owner.set_autosign(True)
-    for i, c in enumerate(contracts):
-        c.contract.claimOwnership(sender=wallet, gas_price=convert("28 gwei", int))
-        print(f"Signed contract {i + 1} out of {len(contracts)}")
+    action = "claim"
+    return rotate_ownership(dm.context.contracts, wallet, action, wallet.address, summary_path(ENV, action), **kwargs)
+
+
+def rotate_owner(dm, from_wallet, to_wallet, **kwargs):
+    # contracts already proposed or claimed are skipped, so an interrupted rotation is resumed by running it again
+    propose_owner(dm, from_wallet, to_wallet.address, **kwargs)
+    return claim_ownership(dm, to_wallet, **kwargs)
+
+
+def console_name(key: str) -> str:
+    return key.replace(".", "_").replace("-", "_")
+
+
+# stands in for a deployed contract until it is first used, resolving it only then
+class LazyContract(BaseAddress):
+    def __init__(self, contract_config):
+        self._config = contract_config
+
+    @property
+    def address(self):
+        return self._config.address()
+
+    @property
+    def contract(self):
+        return self._config.contract
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.contract, name)
+
+    def __call__(self, *args, **kwargs):
+        return self.contract(*args, **kwargs)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(dir(self.contract)))
+
+    def __repr__(self):
+        if self._config.has_contract() and not self._config.contract_pending():
+            return repr(self.contract)
+        return f"<{self._config.container_name()} {self.address} (not loaded)>"
+
+
+@cache
+def deployment_manager() -> DeploymentManager:
+    return DeploymentManager(ENV)
+
+
+@cache
+def console_namespace() -> dict:
+    # names come from the config files only, so building the namespace doesn't fetch any contract
+    dm = deployment_manager()
+    contracts = {console_name(k): LazyContract(v) for k, v in dm.context.contracts.items()}
+    configs = {console_name(k): v for k, v in dm.context.config.items()}
+    return {"dm": dm, "owner": dm.owner} | contracts | configs
+
+
+def __getattr__(name: str):
+    # dunders are probed by IPython, inspect and pytest, building the namespace for them would load the accounts
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    namespace = console_namespace()
+    if name not in namespace:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return namespace[name]
+
+
+def __dir__():
+    return sorted(globals().keys() | console_namespace().keys())
 
 
 def ape_init_extras():
-    dm = DeploymentManager(ENV)
-
-    globals()["dm"] = dm
-    globals()["owner"] = dm.owner
-    for k, v in dm.context.contracts.items():
-        globals()[k.replace(".", "_").replace("-", "_")] = v.contract
-        print(k.replace(".", "_"), v.contract)
-    for k, v in dm.context.config.items():
-        globals()[k.replace(".", "_").replace("-", "_")] = v
+    return console_namespace()
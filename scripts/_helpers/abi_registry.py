@@ -0,0 +1,81 @@
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+ABI_KEYS_MEMO_SIZE = 256
+
+# abis are never mutated once compiled. The memo holds a reference to each abi, so its id can't be reused while the
+# entry is cached, and drops the least recently used ones past ABI_KEYS_MEMO_SIZE
+_abi_keys: OrderedDict[int, tuple[list, str]] = OrderedDict()
+_abi_keys_lock = Lock()
+
+
+def abi_key(abi: list) -> str:
+    with _abi_keys_lock:
+        cached = _abi_keys.get(id(abi))
+        if cached is not None and cached[0] is abi:
+            _abi_keys.move_to_end(id(abi))
+            return cached[1]
+    json_dump = json.dumps(abi, sort_keys=True)
+    _hash = hashlib.sha1(json_dump.encode("utf8"))
+    key = _hash.hexdigest()
+    with _abi_keys_lock:
+        _abi_keys[id(abi)] = (abi, key)
+        if len(_abi_keys) > ABI_KEYS_MEMO_SIZE:
+            _abi_keys.popitem(last=False)
+    return key
+
+
+def abi_cache_path() -> Path:
+    # registry shared by the deployments and the publications not writing local files
+    return Path.cwd() / ".cache" / "abi"
+
+
+# abis stored once per content as <path>/<abi_key>.json, with an index.json mapping each contract_def to its abi_key
+class AbiRegistry:
+    def __init__(self, path: Path):
+        self.path = path
+        self.index: dict[str, str] = {}
+        self.abis: dict[str, list] = {}
+        self._contract_types: dict[str, str] = {}
+        self._lock = Lock()
+        index_file = path / "index.json"
+        if index_file.exists():
+            self.index = json.loads(index_file.read_text(encoding="utf8"))
+
+    def add(self, contract_def: str, abi: list) -> str:
+        key = abi_key(abi)
+        with self._lock:
+            self.index[contract_def] = key
+            self.abis.setdefault(key, abi)
+        return key
+
+    def add_contract_type(self, contract_type: Any) -> str:
+        # every contract deployed from a contract type has its abi, so it's serialised and hashed once per registry
+        name = contract_type.name
+        if name not in self._contract_types:
+            self._contract_types[name] = self.add(name, contract_type.dict()["abi"])
+        return self._contract_types[name]
+
+    def key_for(self, contract_def: str) -> str | None:
+        return self.index.get(contract_def)
+
+    def get(self, key: str) -> list:
+        if key not in self.abis:
+            self.abis[key] = json.loads((self.path / f"{key}.json").read_text(encoding="utf8"))
+        return self.abis[key]
+
+    def abi_for(self, contract_def: str) -> list | None:
+        key = self.key_for(contract_def)
+        return self.get(key) if key else None
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        for key, abi in self.abis.items():
+            abi_file = self.path / f"{key}.json"
+            if not abi_file.exists():
+                abi_file.write_text(json.dumps(abi), encoding="utf8")
+        (self.path / "index.json").write_text(json.dumps(self.index, indent=2, sort_keys=True) + "\n", encoding="utf8")
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from typing import Any
+
+import ape
+from ape import accounts, chain
+
+from .basetypes import Environment
+
+
+# deploys through ape, against foundry locally or a live network otherwise
+class ApeBackend:
+    multicall = True
+    concurrent = True
+    persistent = True
+    empty_chain = False
+
+    @staticmethod
+    def project():
+        return ape.project
+
+    @staticmethod
+    def owner(env: Environment):
+        match env:
+            case Environment.local:
+                return accounts[0]
+            case Environment.dev:
+                return accounts.load("devacc")
+            case Environment.int:
+                return accounts.load("intacc")
+            case Environment.prod:
+                return accounts.load("prodacc")
+        return None
+
+    @staticmethod
+    def block_number() -> int:
+        return chain.blocks.height
+
+    @staticmethod
+    def chain_key() -> str:
+        genesis_hash = chain.blocks[0].hash.hex().removeprefix("0x")
+        return f"{chain.chain_id}-{genesis_hash[:16]}"
+
+    @staticmethod
+    def code(address: str) -> bytes:
+        return bytes(chain.provider.get_code(address))
+
+
+_active_backend: list[Any] = [ApeBackend()]
+
+
+@contextmanager
+def using_backend(backend: Any):
+    previous = _active_backend[0]
+    _active_backend[0] = backend
+    try:
+        yield backend
+    finally:
+        _active_backend[0] = previous
+
+
+def active_backend() -> Any:
+    return _active_backend[0]
+
+
+# contract configs look up their containers through the active backend when they are created, so the same configs
+# deploy with any of them
+class ProjectProxy:
+    def __getattr__(self, name: str):
+        return getattr(active_backend().project(), name)
+
+
+project = ProjectProxy()
@@ -1,10 +1,10 @@
 # ruff: noqa: PLR6301, ARG002
 
 import hashlib
-import json
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from enum import Enum
+from threading import Lock
 from typing import Any
 
 from ape.contracts.base import ContractContainer, ContractInstance
@@ -12,15 +12,54 @@ from ape_accounts.accounts import KeyfileAccount
 from rich import print as rprint
 from rich.markup import escape
 
+from .abi_registry import AbiRegistry, abi_cache_path
+from .journal import DeploymentJournal
+from .txqueue import TransactionQueue
+
 Environment = Enum("Environment", ["local", "dev", "int", "prod"])
 
 
-def abi_key(abi: list) -> str:
-    json_dump = json.dumps(abi, sort_keys=True)
-    _hash = hashlib.sha1(json_dump.encode("utf8"))
+def bytecode_key(bytecode: str) -> str:
+    _hash = hashlib.sha1(bytecode.encode("utf8"))
     return _hash.hexdigest()
 
 
+@dataclass
+class ReadCache:
+    block: int | None = None
+    values: dict[tuple, Any] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    def __post_init__(self):
+        self._lock = Lock()
+
+    def key(self, address: str, func: str, args: tuple) -> tuple:
+        return (address, func, args)
+
+    def lookup(self, key: tuple) -> tuple[bool, Any]:
+        if key in self.values:
+            self.hits += 1
+            return True, self.values[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: tuple, value: Any):
+        with self._lock:
+            self.values[key] = value
+
+    def invalidate(self, address: str, block: int | None = None):
+        # called from the transaction queue threads as transactions are confirmed. Only the deployer writes to the
+        # contracts, so the values read from the others are still current at the block of the transaction
+        with self._lock:
+            self.values = {k: v for k, v in self.values.items() if k[0] != address}
+            if block is not None:
+                self.block = max(self.block or 0, block)
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses ({len(self.values)} values cached, current at block {self.block})"
+
+
 @dataclass
 class DeploymentContext:
     contracts: dict[str, Any]
@@ -29,6 +68,13 @@ class DeploymentContext:
     config: dict[str, Any] = field(default_factory=dict)
     gas_func: Callable | None = None
     dryrun: bool = False
+    backend: Any = None
+    reads: ReadCache = field(default_factory=ReadCache)
+    queue: TransactionQueue | None = None
+    journal: DeploymentJournal | None = None
+    current_setter: str | None = None
+    failed: list[str] = field(default_factory=list)
+    abis: AbiRegistry = field(default_factory=lambda: AbiRegistry(abi_cache_path()))
 
     def __getitem__(self, key):
         if key in self.contracts:
@@ -45,7 +91,7 @@ class DeploymentContext:
         return self.gas_func(self) if self.gas_func is not None else {}
 
 
-@dataclass
+@dataclass  # noqa: PLR0904
 class ContractConfig:
     key: str
     contract: ContractInstance | None
@@ -55,9 +101,15 @@ class ContractConfig:
     deployment_args: list[Any] = field(default_factory=list)
     abi_key: str | None = None
     version: str | None = None
+    bytecode_key: str | None = None
+    deployment_tx: str | None = None
 
     nft: bool = False
 
+    def __post_init__(self):
+        # prefetch threads and the caller can resolve the same lazily loaded contract at once
+        self._resolve_lock = Lock()
+
     def deployable(self, context: DeploymentContext) -> bool:
         return True
 
@@ -71,15 +123,27 @@ class ContractConfig:
     def deployment_args_repr(self, context: DeploymentContext) -> list[Any]:
         return [f"[blue]{escape(c)}[/blue]" if c in context else c for c in self.deployment_args]
 
-    def deployment_options(self, context: DeploymentContext) -> dict[str, Any]:
-        return {"sender": context.owner} | context.gas_options()
+    def deployment_options(self, context: DeploymentContext, nonce: int | None = None) -> dict[str, Any]:
+        nonce_options = {"nonce": nonce} if nonce is not None else {}
+        return {"sender": context.owner} | context.gas_options() | nonce_options
 
     def config_dependencies(self, context: DeploymentContext) -> dict[str, Callable]:
         return self.config_deps
 
     def address(self):
+        if "contract" not in self.__dict__:
+            return self.__dict__.get("_lazy_address")
         return self.contract.address if self.contract else None
 
+    def has_contract(self) -> bool:
+        # doesn't resolve a lazily loaded contract
+        if "contract" not in self.__dict__:
+            return "_lazy_address" in self.__dict__
+        return self.contract is not None
+
+    def contract_pending(self) -> bool:
+        return "contract" not in self.__dict__ and "_lazy_address" in self.__dict__
+
     def container_name(self):
         return self.container.contract_type.name if self.container else None
 
@@ -87,20 +151,58 @@ class ContractConfig:
         return self.key
 
     def __repr__(self):
-        return f"Contract[key={self.key}, contract={self.contract}, container_name={self.container_name()}]"
+        # doesn't resolve a lazily loaded contract
+        return f"{type(self).__name__}[key={self.key}, address={self.address()}]"
 
     def load_contract(self, address: str):
-        self.contract = self.container.at(address)
-
-    def deploy(self, context: DeploymentContext):
-        if self.contract is not None:
+        # the instance is only resolved when `contract` is first accessed, as it fetches the contract from the chain
+        self.__dict__.pop("contract", None)
+        self._lazy_address = address
+
+    def resolve_contract(self) -> ContractInstance | None:
+        return self.contract
+
+    def __getattr__(self, name: str):
+        if name == "contract" and "_lazy_address" in self.__dict__:
+            with self.__dict__["_resolve_lock"]:
+                if "contract" not in self.__dict__:
+                    self.contract = self.container.at(self.__dict__["_lazy_address"])
+            return self.__dict__["contract"]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def compiled_bytecode_key(self) -> str | None:
+        deployment_bytecode = self.container.contract_type.deployment_bytecode if self.container else None
+        if not deployment_bytecode or not deployment_bytecode.bytecode:
+            return None
+        return bytecode_key(deployment_bytecode.bytecode)
+
+    def deployed_code_matches(self, code: bytes) -> bool:
+        # vyper appends the immutables after the runtime bytecode, so the code on chain starts with the compiled one
+        runtime_bytecode = self.container.contract_type.runtime_bytecode if self.container else None
+        if not runtime_bytecode or not runtime_bytecode.bytecode or not code:
+            return False
+        compiled = runtime_bytecode.bytecode.lower().removeprefix("0x")
+        return code.hex().lower().removeprefix("0x").startswith(compiled)
+
+    def runs_compiled_code(self, context: DeploymentContext, code_at: Callable[[str], bytes]) -> bool:
+        return self.deployed_code_matches(code_at(self.address()))
+
+    def bytecode_changed(self) -> bool:
+        # contracts deployed before fingerprints were stored can't be compared
+        if not self.has_contract() or self.bytecode_key is None:
+            return False
+        compiled_key = self.compiled_bytecode_key()
+        return compiled_key is not None and compiled_key != self.bytecode_key
+
+    def deploy(self, context: DeploymentContext, nonce: int | None = None):
+        if self.has_contract():
             rprint(
-                f"[dark_orange bold]WARNING[/]: Deployment will override contract [blue bold]{self.key}[/] at {self.contract}"
+                f"[dark_orange bold]WARNING[/]: Deployment will override contract [blue bold]{self.key}[/] at {self.address()}"
             )
         if not self.deployable(context):
             raise Exception(f"Cant deploy contract {self} in current context")  # noqa: TRY002
         print_args = self.deployment_args_repr(context)
-        kwargs = self.deployment_options(context)
+        kwargs = self.deployment_options(context, nonce)
         kwargs_str = ", ".join(f"{k}={v}" for k, v in kwargs.items())
         rprint(
             f"Deploying [blue]{self.key}[/blue] <- {self.container_name()}.deploy({', '.join(str(a) for a in print_args)}, {kwargs_str})"  # noqa: E501
@@ -111,7 +213,12 @@ class ContractConfig:
             rprint(f"Deployment args for [blue]{self.key}[/]: [bright_black]{deploy_args.hex()}[/]")
 
             self.contract = self.container.deploy(*self.deployment_args_values(context), **kwargs)
-            self.abi_key = abi_key(self.contract.contract_type.dict()["abi"])
+            self.deployment_tx = self.contract.txn_hash
+            self.abi_key = context.abis.add_contract_type(self.contract.contract_type)
+            self.bytecode_key = self.compiled_bytecode_key()
+
+    def post_deploy(self, context: DeploymentContext):
+        pass
 
 
 @dataclass
@@ -119,16 +226,25 @@ class MinimalProxy(ContractConfig):
     impl: str = ""
     factory_func: str = "create_proxy"
 
-    def deploy(self, context: DeploymentContext):
-        if self.contract is not None:
+    def runs_compiled_code(self, context: DeploymentContext, code_at: Callable[[str], bytes]) -> bool:
+        # the code on chain is a stub delegating to the implementation, so the proxy runs the compiled code when it
+        # delegates to the implementation contract and that one does
+        impl = context[self.impl]
+        if not impl.has_contract():
+            return False
+        impl_address = impl.address().lower().removeprefix("0x")
+        return impl_address in code_at(self.address()).hex().lower() and impl.runs_compiled_code(context, code_at)
+
+    def deploy(self, context: DeploymentContext, nonce: int | None = None):
+        if self.has_contract():
             rprint(
-                f"[dark_orange bold]WARNING[/dark_orange bold]: Deployment will override contract [blue bold]{self.key}[/blue bold] at {self.contract}"  # noqa: E501
+                f"[dark_orange bold]WARNING[/dark_orange bold]: Deployment will override contract [blue bold]{self.key}[/blue bold] at {self.address()}"  # noqa: E501
             )
         if not self.deployable(context):
             raise Exception(f"Cant deploy contract {self} in current context")  # noqa: TRY002
         impl_contract = context[self.impl].contract
         print_args = self.deployment_args_repr(context)
-        kwargs = self.deployment_options(context)
+        kwargs = self.deployment_options(context, nonce)
         kwargs_str = ",".join(f"{k}={v}" for k, v in kwargs.items())
         rprint(
             f"Deploying Proxy [blue]{self.key}[/blue] <- {self.impl}.{self.factory_func}({', '.join(str(a) for a in print_args)}, {kwargs_str})"  # noqa: E501
@@ -137,4 +253,6 @@ class MinimalProxy(ContractConfig):
         if not context.dryrun:
             tx = impl_contract.invoke_transaction(self.factory_func, *self.deployment_args_values(context), **kwargs)
             self.contract = self.container.at(tx.return_value)
-            self.abi_key = abi_key(self.contract.contract_type.dict()["abi"])
+            self.deployment_tx = tx.txn_hash
+            self.abi_key = context.abis.add_contract_type(self.contract.contract_type)
+            self.bytecode_key = self.compiled_bytecode_key()
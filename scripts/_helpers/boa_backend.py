@@ -0,0 +1,234 @@
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import boa
+from boa.util.abi import Address
+from eth_abi import encode
+from vyper.compiler.output import build_abi_output
+
+from .basetypes import Environment
+
+# transaction options only meaningful for a real network
+IGNORED_TX_OPTIONS = {"nonce", "gas_price", "max_fee", "max_priority_fee", "required_confirmations"}
+
+
+def _abi_type(arg: dict) -> str:
+    if arg["type"].startswith("tuple"):
+        return f"({','.join(_abi_type(c) for c in arg['components'])}){arg['type'].removeprefix('tuple')}"
+    return arg["type"]
+
+
+def _args(args: tuple) -> list:
+    return [a.address if isinstance(a, BoaContract) else a for a in args]
+
+
+def _tx_options(options: dict[str, Any]) -> dict[str, Any]:
+    sender = options.pop("sender", None)
+    tx_options = {k: v for k, v in options.items() if k not in IGNORED_TX_OPTIONS}
+    return tx_options | ({"sender": str(sender)} if sender is not None else {})
+
+
+# in-process account, compares equal to its address like ape accounts do
+@dataclass(frozen=True, eq=False)
+class BoaAccount:
+    address: str
+
+    @property
+    def nonce(self) -> int:
+        return boa.env.evm.vm.state.get_nonce(Address(self.address).canonical_address)
+
+    def set_autosign(self, enabled: bool, passphrase: str | None = None):  # noqa: FBT001
+        pass
+
+    def __eq__(self, other):
+        return str(other).lower() == self.address.lower()
+
+    def __hash__(self):
+        return hash(self.address.lower())
+
+    def __str__(self):
+        return self.address
+
+
+@dataclass
+class BoaReceipt:
+    return_value: Any = None
+    txn_hash: str | None = None
+    block_number: int | None = None
+
+
+@dataclass
+class BoaBytecode:
+    bytecode: str
+
+
+@dataclass
+class BoaContractType:
+    name: str
+    abi: list[dict]
+    bytecode: str
+    runtime: str
+
+    @property
+    def deployment_bytecode(self):
+        return self
+
+    @property
+    def runtime_bytecode(self) -> BoaBytecode:
+        return BoaBytecode(self.runtime)
+
+    @property
+    def view_methods(self) -> dict[str, dict]:
+        return {e["name"]: e for e in self.abi if e["type"] == "function" and e["stateMutability"] in {"view", "pure"}}
+
+    def dict(self) -> dict[str, Any]:
+        return {"contractName": self.name, "abi": self.abi}
+
+
+class BoaConstructor:
+    def __init__(self, abi: list[dict]):
+        self.inputs = next((e["inputs"] for e in abi if e["type"] == "constructor"), [])
+
+    def encode_input(self, *args) -> bytes:
+        return encode([_abi_type(i) for i in self.inputs], _args(args))
+
+
+# the subset of ape's ContractInstance used by the deployment helpers
+class BoaContract:
+    def __init__(self, contract: Any, container: "BoaContainer"):
+        self._contract = contract
+        self.container = container
+
+    @property
+    def address(self) -> str:
+        return str(self._contract.address)
+
+    @property
+    def contract_type(self) -> BoaContractType:
+        return self.container.contract_type
+
+    txn_hash = None
+
+    def call_view_method(self, func: str, *args, **kwargs):
+        return getattr(self._contract, func)(*_args(args), **_tx_options(kwargs))
+
+    def invoke_transaction(self, func: str, *args, **kwargs) -> BoaReceipt:
+        return_value = getattr(self._contract, func)(*_args(args), **_tx_options(kwargs))
+        return BoaReceipt(return_value, block_number=boa.env.evm.patch.block_number)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in self.container.functions:
+            raise AttributeError(f"{self.container.name} has no method {name!r}")
+        if name in self.contract_type.view_methods:
+            return lambda *args, **kwargs: self.call_view_method(name, *args, **kwargs)
+        return lambda *args, **kwargs: self.invoke_transaction(name, *args, **kwargs)
+
+    def __str__(self):
+        return self.address
+
+    def __repr__(self):
+        return f"<{self.container.name} {self.address}>"
+
+
+class BoaContainer:
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+
+    @cached_property
+    def deployer(self):
+        return boa.load_partial(str(self.path))
+
+    @cached_property
+    def contract_type(self) -> BoaContractType:
+        compiler_data = self.deployer.compiler_data
+        return BoaContractType(
+            self.name,
+            build_abi_output(compiler_data),
+            "0x" + compiler_data.bytecode.hex(),
+            "0x" + compiler_data.bytecode_runtime.hex(),
+        )
+
+    @cached_property
+    def functions(self) -> set[str]:
+        return {e["name"] for e in self.contract_type.abi if e["type"] == "function"}
+
+    @property
+    def constructor(self) -> BoaConstructor:
+        return BoaConstructor(self.contract_type.abi)
+
+    def deploy(self, *args, **kwargs) -> BoaContract:
+        tx_options = _tx_options(kwargs)
+        with boa.env.prank(tx_options.pop("sender", boa.env.eoa)):
+            return BoaContract(self.deployer.deploy(*_args(args), **tx_options), self)
+
+    def at(self, address: str) -> BoaContract:
+        return BoaContract(self.deployer.at(address), self)
+
+
+class BoaProject:
+    def __init__(self, contracts_path: Path):
+        self.sources = {p.stem: p for p in sorted(contracts_path.rglob("*.vy"))}
+        self.containers: dict[str, BoaContainer] = {}
+
+    def __getattr__(self, name: str) -> BoaContainer:
+        if name.startswith("_") or name not in self.sources:
+            raise AttributeError(f"Contract {name!r} not found in project")
+        if name not in self.containers:
+            self.containers[name] = BoaContainer(name, self.sources[name])
+        return self.containers[name]
+
+
+# deploys to an in-process titanoboa environment, optionally forked from a live network. The boa environment and
+# cache dir are global, so they're only set while the backend is active
+class BoaBackend:
+    multicall = False
+    concurrent = False
+    persistent = False
+
+    def __init__(
+        self,
+        *,
+        fork_url: str | None = None,
+        owner: str | None = None,
+        contracts_path: Path = Path("contracts"),
+        cache_dir: str | None = ".cache/titanoboa",
+    ):
+        self.fork_url = fork_url
+        self.cache_dir = cache_dir
+        self.empty_chain = not fork_url
+        self.account = BoaAccount(str(owner)) if owner else None
+        self._project = BoaProject(contracts_path)
+
+    @contextmanager
+    def activate(self) -> Iterator["BoaBackend"]:
+        previous_cache = boa.interpret._disk_cache  # noqa: SLF001
+        with ExitStack() as stack:
+            if self.cache_dir:
+                boa.interpret.set_cache_dir(cache_dir=self.cache_dir)
+                stack.callback(setattr, boa.interpret, "_disk_cache", previous_cache)
+            if self.fork_url:
+                stack.enter_context(boa.swap_env(boa.Env()))
+                boa.env.fork(self.fork_url)
+            owner = self.account
+            self.account = owner or BoaAccount(str(boa.env.eoa))
+            stack.callback(setattr, self, "account", owner)
+            yield self
+
+    def project(self) -> BoaProject:
+        return self._project
+
+    def owner(self, env: Environment) -> BoaAccount:  # noqa: ARG002
+        return self.account
+
+    @staticmethod
+    def block_number() -> int:
+        return boa.env.evm.patch.block_number
+
+    @staticmethod
+    def code(address: str) -> bytes:
+        return bytes(boa.env.get_code(address))
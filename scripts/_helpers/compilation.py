@@ -0,0 +1,89 @@
+import hashlib
+import json
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import vyper
+from vyper.cli.vyper_compile import compile_files
+
+CACHE_DIR = Path.cwd() / ".cache" / "compilation"
+OUTPUT_FORMATS = ["abi_python", "bytecode"]
+
+IMPORT_PATTERN = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import\s+(\w+)|import\s+([\w.]+))", re.MULTILINE)
+
+
+def source_imports(path: Path, root_folder: Path) -> set[Path]:
+    # local interfaces imported by the source, builtin `vyper.interfaces` are covered by the vyper version
+    imports = set()
+    for module, name, dotted in IMPORT_PATTERN.findall(path.read_text(encoding="utf8")):
+        dotted_path = f"{module}.{name}" if module else dotted
+        if dotted_path.startswith("vyper."):
+            continue
+        if dotted_path.startswith("."):
+            level = len(dotted_path) - len(dotted_path.lstrip("."))
+            base = path.parent.joinpath(*[".."] * (level - 1))
+            candidate = base / dotted_path.lstrip(".").replace(".", "/")
+        else:
+            candidate = root_folder / dotted_path.replace(".", "/")
+        imports |= {p.resolve() for p in (candidate.with_suffix(".vy"), candidate.with_suffix(".json")) if p.exists()}
+    return imports
+
+
+def transitive_imports(path: Path, root_folder: Path) -> set[Path]:
+    found, stack = set(), [path.resolve()]
+    while stack:
+        for imported in source_imports(stack.pop(), root_folder):
+            if imported not in found:
+                found.add(imported)
+                if imported.suffix == ".vy":
+                    stack.append(imported)
+    return found
+
+
+def source_key(path: Path, root_folder: Path) -> str:
+    _hash = hashlib.sha256(vyper.__version__.encode("utf8"))
+    for p in [path.resolve(), *sorted(transitive_imports(path, root_folder))]:
+        _hash.update(str(p.relative_to(root_folder.resolve())).encode("utf8"))
+        _hash.update(hashlib.sha256(p.read_bytes()).digest())
+    return _hash.hexdigest()
+
+
+def _compile(path: Path, root_folder: Path) -> dict:
+    output = next(iter(compile_files([path], output_formats=OUTPUT_FORMATS, root_folder=root_folder).values()))
+    return {"abi": output["abi"], "bytecode": output["bytecode"]}
+
+
+def iter_compiled_sources(
+    paths: list[Path], root_folder: Path, cache_dir: Path = CACHE_DIR, max_workers: int | None = None
+) -> Iterator[tuple[Path, dict]]:
+    # each unique path is compiled once, outputs are cached on disk by source_key so unchanged sources are skipped.
+    # outputs are yielded as soon as they are available, cached ones first
+    paths = list(dict.fromkeys(paths))
+    keys = {p: source_key(p, root_folder) for p in paths}
+    missing = []
+    for path, key in keys.items():
+        cache_file = cache_dir / f"{key}.json"
+        if cache_file.exists():
+            yield path, json.loads(cache_file.read_text(encoding="utf8"))
+        else:
+            missing.append(path)
+
+    if missing:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_compile, path, root_folder): path for path in missing}
+            for future in as_completed(futures):
+                path, output = futures[future], future.result()
+                tmp_file = cache_dir / f"{keys[path]}.json.tmp"
+                tmp_file.write_text(json.dumps(output), encoding="utf8")
+                tmp_file.replace(cache_dir / f"{keys[path]}.json")
+                yield path, output
+
+
+def compile_sources(
+    paths: list[Path], root_folder: Path, cache_dir: Path = CACHE_DIR, max_workers: int | None = None
+) -> dict[Path, dict]:
+    outputs = dict(iter_compiled_sources(paths, root_folder, cache_dir, max_workers))
+    return {p: outputs[p] for p in dict.fromkeys(paths)}
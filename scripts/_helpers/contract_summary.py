@@ -0,0 +1,203 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from vyper.ast import parse_to_ast
+from vyper.ast.utils import ast_to_dict
+
+FUNCTIONS_BLACKLIST = ["__init__", "__default__"]
+
+
+@dataclass
+class StructSummary:
+    name: str
+    members: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class EventArg:
+    name: str
+    type: str
+    indexed: bool = False
+
+
+@dataclass
+class EventSummary:
+    name: str
+    args: list[EventArg] = field(default_factory=list)
+
+
+@dataclass
+class FunctionSummary:
+    name: str
+    args: list[tuple[str, str | None]]
+    return_type: str | None
+    decorators: list[str]
+
+
+@dataclass
+class GetterSummary:
+    name: str
+    args: list[tuple[str, str]]
+    return_type: str
+
+
+@dataclass
+class ContractSummary:
+    structs: list[StructSummary] = field(default_factory=list)
+    events: list[EventSummary] = field(default_factory=list)
+    functions: list[FunctionSummary] = field(default_factory=list)
+    getters: list[GetterSummary] = field(default_factory=list)
+
+    def external_names(self) -> set[str]:
+        return {g.name for g in self.getters} | {f.name for f in self.functions}
+
+
+def interface_sources(contracts_dir: Path = Path("contracts")) -> list[Path]:
+    # interfaces are generated for the protocol contracts, the auxiliary ones are mocks and test helpers
+    return sorted(contracts_dir.glob("*.vy"))
+
+
+def parse_ast(code: str) -> dict:
+    # only the syntax tree is needed, so the source is parsed without going through the compiler phases
+    return ast_to_dict(parse_to_ast(code))
+
+
+def nested_get(d: dict, *args, default=None):
+    if not args:
+        return default
+    for a in args[:-1]:
+        d = d.get(a) or {}
+    return d.get(args[-1], default)
+
+
+def is_external_function(node: dict) -> bool:
+    is_func = node["ast_type"] == "FunctionDef"
+    decorators = node.get("decorator_list", [])
+    return is_func and any(d.get("id") == "external" for d in decorators)
+
+
+def is_public_variable(node: dict) -> bool:
+    is_var = node["ast_type"] == "VariableDecl"
+    return is_var and node.get("is_public", False)
+
+
+def is_event(node: dict) -> bool:
+    return node["ast_type"] == "EventDef"
+
+
+def is_struct(node: dict) -> bool:
+    return node["ast_type"] == "StructDef"
+
+
+def get_arg_type(node: dict):  # noqa: PLR0911
+    match node["ast_type"]:
+        case "Name":
+            return node["id"]
+        case "Int":
+            return str(node["value"])
+        case "Index":
+            return f"[{get_arg_type(node['value'])}]"
+        case "Tuple":
+            return ", ".join(get_arg_type(e) for e in node["elements"])
+        case "Subscript":
+            return get_arg_type(node["value"]) + get_arg_type(node["slice"])
+        case "BinOp":
+            return get_arg_type(node["op"])(get_arg_type(node["left"]), get_arg_type(node["right"]))
+        case "Pow":
+            return lambda x, y: str(int(x) ** int(y))
+        case _:
+            return None
+
+
+def function_summary(node: dict) -> FunctionSummary:
+    arg_list = (node.get("args") or {}).get("args")
+    return_node = node.get("returns")
+    return FunctionSummary(
+        name=node["name"],
+        args=[(a["arg"], get_arg_type(a["annotation"]) if a.get("annotation") else None) for a in arg_list],
+        return_type=get_arg_type(return_node) if return_node else None,
+        decorators=[d["id"] for d in node.get("decorator_list", []) if "id" in d],
+    )
+
+
+def getter_summary(node: dict) -> GetterSummary:
+    # nested HashMaps take one argument per key
+    annotation = node["annotation"]
+    return_type = get_arg_type(annotation)
+    args = []
+    if annotation["ast_type"] == "Subscript":
+        while nested_get(annotation, "value", "id") == "HashMap":
+            elements = nested_get(annotation, "slice", "value", "elements")
+            key_type, return_type = (get_arg_type(e) for e in elements)
+            args.append((f"arg{len(args)}", key_type))
+            annotation = elements[-1]
+    return GetterSummary(name=nested_get(node, "target", "id"), args=args, return_type=return_type)
+
+
+def event_arg(node: dict) -> EventArg:
+    annotation = node["annotation"]
+    if annotation["ast_type"] == "Call":
+        indexed = annotation["func"]["id"] == "indexed"
+        return EventArg(node["target"]["id"], get_arg_type(annotation["args"][0]), indexed=indexed)
+    return EventArg(node["target"]["id"], get_arg_type(annotation))
+
+
+def summarize(ast: dict) -> ContractSummary:
+    # a single walk over the statement tree, members of structs and events are collected as their bodies are visited
+    summary = ContractSummary()
+    stack = [(ast, None)]
+    while stack:
+        node, parent = stack.pop()
+        child_parent = None
+        if is_struct(node):
+            child_parent = StructSummary(node["name"])
+            summary.structs.append(child_parent)
+        elif is_event(node):
+            child_parent = EventSummary(node["name"])
+            summary.events.append(child_parent)
+        elif is_public_variable(node):
+            summary.getters.append(getter_summary(node))
+        elif is_external_function(node) and node["name"] not in FUNCTIONS_BLACKLIST:
+            summary.functions.append(function_summary(node))
+        elif node["ast_type"] == "AnnAssign" and isinstance(parent, StructSummary):
+            parent.members.append((nested_get(node, "target", "id"), get_arg_type(node["annotation"])))
+        elif node["ast_type"] == "AnnAssign" and isinstance(parent, EventSummary):
+            parent.args.append(event_arg(node))
+        stack.extend((child, child_parent) for child in reversed(node.get("body", [])))
+    return summary
+
+
+def summarize_file(path: Path) -> ContractSummary:
+    return summarize(parse_ast(path.read_text(encoding="utf8")))
+
+
+def interface_code(summary: ContractSummary) -> str:
+    structs = ["\n".join([f"struct {s.name}:"] + [f"    {name}: {typ}" for name, typ in s.members]) for s in summary.structs]
+    events = [
+        "\n".join([f"event {e.name}:"] + [f"    {a.name}: " + (f"indexed({a.type})" if a.indexed else a.type) for a in e.args])
+        for e in summary.events
+    ]
+    getters = [
+        "\n".join(
+            [
+                "@view",
+                "@external",
+                f"def {g.name}({', '.join(f'{name}: {typ}' for name, typ in g.args)}) -> {g.return_type}:",
+                "    pass",
+            ]
+        )
+        for g in summary.getters
+    ]
+    functions = []
+    for f in summary.functions:
+        args_code = ", ".join(f"{name}: {typ}" if typ else name for name, typ in f.args)
+        return_code = f" -> {f.return_type}" if f.return_type else ""
+        functions.append("\n".join([f"@{d}" for d in f.decorators] + [f"def {f.name}({args_code}){return_code}:", "    pass"]))
+
+    return "\n\n".join(
+        [
+            "\n\n".join(["# Structs", *structs]),
+            "\n\n".join(["# Events", *events]),
+            "\n\n".join(["# Functions", *getters, *functions]),
+        ]
+    )
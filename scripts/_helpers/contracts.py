@@ -1,9 +1,9 @@
 from dataclasses import dataclass
 from functools import partial
 
-from ape import project
 from rich import print
 
+from .backend import project
 from .basetypes import ContractConfig, DeploymentContext, MinimalProxy
 from .transactions import check_different, check_owner, execute, execute_read
 
@@ -11,8 +11,8 @@ from .transactions import check_different, check_owner, execute, execute_read
 class GenericContract(ContractConfig):
     _address: str
 
-    def __init__(self, *, key: str, address: str, version: str | None = None, abi_key: str):
-        super().__init__(key, None, None, version=version, abi_key=abi_key)
+    def __init__(self, *, key: str, address: str, version: str | None = None, abi_key: str, bytecode_key: str | None = None):
+        super().__init__(key, None, None, version=version, abi_key=abi_key, bytecode_key=bytecode_key)
         self._address = address
 
     def address(self):
@@ -41,6 +41,7 @@ class CollateralVaultCoreV2(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         delegation_registry_key: str,
         collateral_vault_peripheral_key: str,
         address: str | None = None,
@@ -51,6 +52,7 @@ class CollateralVaultCoreV2(ContractConfig):
             project.CollateralVaultCoreV2,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={delegation_registry_key},
             deployment_args=[delegation_registry_key],
             config_deps={collateral_vault_peripheral_key: self.set_cvperiph},
@@ -73,6 +75,7 @@ class CryptoPunksVaultCore(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         nft_contract_key: str,
         delegation_registry_key: str,
         collateral_vault_peripheral_key: str,
@@ -84,6 +87,7 @@ class CryptoPunksVaultCore(ContractConfig):
             project.CryptoPunksVaultCore,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={nft_contract_key, delegation_registry_key},
             deployment_args=[nft_contract_key, delegation_registry_key],
             config_deps={collateral_vault_peripheral_key: self.set_cvperiph},
@@ -106,6 +110,7 @@ class CollateralVaultPeripheral(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         collateral_vault_core_key: str,
         punks_contract_key: str,
         punks_vault_core_key: str,
@@ -122,6 +127,7 @@ class CollateralVaultPeripheral(ContractConfig):
             project.CollateralVaultPeripheral,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={collateral_vault_core_key},
             deployment_args=[collateral_vault_core_key],
             config_deps={
@@ -162,6 +168,7 @@ class LendingPoolCore(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         token_key: str,
         lending_pool_peripheral_key: str,
         address: str | None = None,
@@ -172,6 +179,7 @@ class LendingPoolCore(ContractConfig):
             project.LendingPoolCore,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={token_key},
             deployment_args=[token_key],
             config_deps={lending_pool_peripheral_key: self.set_lpperiph},
@@ -194,6 +202,7 @@ class LendingPoolLock(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         token_key: str,
         lending_pool_peripheral_key: str,
         address: str | None = None,
@@ -204,6 +213,7 @@ class LendingPoolLock(ContractConfig):
             project.LendingPoolLock,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={token_key},
             deployment_args=[token_key],
             config_deps={lending_pool_peripheral_key: self.set_lpperiph},
@@ -226,6 +236,7 @@ class ERC20(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         name: str,
         symbol: str,
         decimals: int,
@@ -238,6 +249,7 @@ class ERC20(ContractConfig):
             project.WETH9Mock,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_args=[name, symbol, decimals, int(supply)],
         )
         if address:
@@ -252,6 +264,7 @@ class CryptoPunks(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -260,6 +273,7 @@ class CryptoPunks(ContractConfig):
             project.CryptoPunksMarketMock,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             nft=True,
         )
         if address:
@@ -274,6 +288,7 @@ class DelegationRegistry(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -282,6 +297,7 @@ class DelegationRegistry(ContractConfig):
             project.DelegationRegistryMock,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
         )
         if address:
             self.load_contract(address)
@@ -305,6 +321,7 @@ class LendingPoolPeripheral(ContractConfig):
         max_capital_efficiency: int,
         whitelisted: bool,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -313,6 +330,7 @@ class LendingPoolPeripheral(ContractConfig):
             project.LendingPoolPeripheral,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={lending_pool_core_key, lending_pool_lock_key, token_key},
             deployment_args=[
                 lending_pool_core_key,
@@ -360,6 +378,7 @@ class LoansCore(ContractConfig):
         version: str | None = None,
         loans_peripheral_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -368,6 +387,7 @@ class LoansCore(ContractConfig):
             project.LoansCore,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             config_deps={loans_peripheral_key: self.set_loansperiph},
         )
         self.loans_peripheral_key = loans_peripheral_key
@@ -396,6 +416,7 @@ class LoansPeripheral(ContractConfig):
         accrual_period: int = 24 * 60 * 60,
         is_payable: bool,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -404,6 +425,7 @@ class LoansPeripheral(ContractConfig):
             project.Loans,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={loans_core_key, lending_pool_peripheral_key, collateral_vault_peripheral_key, genesis_key},
             deployment_args=[
                 accrual_period,
@@ -457,6 +479,7 @@ class LiquidationsCore(ContractConfig):
         version: str | None = None,
         liquidations_peripheral_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -465,6 +488,7 @@ class LiquidationsCore(ContractConfig):
             project.LiquidationsCore,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             config_deps={liquidations_peripheral_key: self.set_liquidationsperiph},
         )
         self.liquidations_peripheral_key = liquidations_peripheral_key
@@ -499,6 +523,7 @@ class LiquidationsPeripheral(ContractConfig):
         nftx_vault_factory_key: str | None = None,
         nftx_marketplace_zap_key: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         _tokens_keys = token_keys.split(",")
@@ -511,6 +536,7 @@ class LiquidationsPeripheral(ContractConfig):
             project.LiquidationsPeripheral,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={liquidations_core_key, weth_contract_key},
             deployment_args=[
                 liquidations_core_key,
@@ -621,6 +647,7 @@ class LiquidityControls(ContractConfig):
         max_loans_pool_share: int = 1500,
         max_collection_borrowable_amount_enabled: bool = False,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -629,6 +656,7 @@ class LiquidityControls(ContractConfig):
             project.LiquidityControls,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_args=[
                 max_pool_share_enabled,
                 max_pool_share,
@@ -652,6 +680,7 @@ class Genesis(ContractConfig):
         version: str | None = None,
         genesis_owner: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -660,6 +689,7 @@ class Genesis(ContractConfig):
             project.GenesisPass,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_args=[genesis_owner],
         )
         if address:
@@ -676,6 +706,7 @@ class CollateralVaultOTCImpl(ContractConfig):
         punks_contract_key: str,
         delegation_registry_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -684,6 +715,7 @@ class CollateralVaultOTCImpl(ContractConfig):
             project.CollateralVaultOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={punks_contract_key, delegation_registry_key},
             deployment_args=[punks_contract_key, delegation_registry_key],
         )
@@ -702,6 +734,7 @@ class CollateralVaultOTC(MinimalProxy):
         loans_key: str,
         liquidations_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -710,6 +743,7 @@ class CollateralVaultOTC(MinimalProxy):
             project.CollateralVaultOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             impl=implementation_key,
             deployment_deps={implementation_key},
             config_deps={
@@ -742,6 +776,7 @@ class LendingPoolEthOTCImpl(ContractConfig):
         version: str | None = None,
         weth_token_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -750,6 +785,7 @@ class LendingPoolEthOTCImpl(ContractConfig):
             project.LendingPoolEthOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={weth_token_key},
             deployment_args=[weth_token_key],
         )
@@ -765,6 +801,7 @@ class LendingPoolERC20OTCImpl(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
         token_key: str,
     ):
@@ -774,6 +811,7 @@ class LendingPoolERC20OTCImpl(ContractConfig):
             project.LendingPoolERC20OTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             deployment_deps={token_key},
             deployment_args=[token_key],
         )
@@ -796,6 +834,7 @@ class LendingPoolOTC(MinimalProxy):
         liquidations_key: str,
         loans_key: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -804,6 +843,7 @@ class LendingPoolOTC(MinimalProxy):
             project.LendingPoolEthOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             impl=implementation_key,
             deployment_deps={implementation_key},
             deployment_args=[protocol_wallet_fees, protocol_fees_share, lender],
@@ -836,6 +876,7 @@ class LiquidationsOTCImpl(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -844,6 +885,7 @@ class LiquidationsOTCImpl(ContractConfig):
             project.LiquidationsOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
         )
         if address:
             self.load_contract(address)
@@ -863,6 +905,7 @@ class LiquidationsOTC(MinimalProxy):
         grace_period_duration: int = 2 * 86400,
         max_penalty_fee: str,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -871,6 +914,7 @@ class LiquidationsOTC(MinimalProxy):
             project.LiquidationsOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             impl=implementation_key,
             deployment_deps={implementation_key, loans_key, lending_pool_key, collateral_vault_key},
             deployment_args=[grace_period_duration, loans_key, lending_pool_key, collateral_vault_key],
@@ -885,8 +929,7 @@ class LiquidationsOTC(MinimalProxy):
             erc20_contract_address = execute_read(context, self.lending_pool_key, "erc20TokenContract")
             execute(context, self.key, "setMaxPenaltyFee", erc20_contract_address, self.max_penalty_fee)
 
-    def deploy(self, context: DeploymentContext):
-        super().deploy(context)
+    def post_deploy(self, context: DeploymentContext):
         self.set_max_penalty_fee(context)
 
 
@@ -898,6 +941,7 @@ class LoansOTCImpl(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -906,6 +950,7 @@ class LoansOTCImpl(ContractConfig):
             project.LoansOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
         )
         if address:
             self.load_contract(address)
@@ -919,6 +964,7 @@ class LoansOTCPunksFixedImpl(ContractConfig):
         key: str,
         version: str | None = None,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -927,6 +973,7 @@ class LoansOTCPunksFixedImpl(ContractConfig):
             project.LoansOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
         )
         if address:
             self.load_contract(address)
@@ -947,6 +994,7 @@ class LoansOTC(MinimalProxy):
         genesis_key: str,
         is_payable: bool,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -955,6 +1003,7 @@ class LoansOTC(MinimalProxy):
             project.LoansOTC,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             impl=implementation_key,
             deployment_deps={implementation_key, lending_pool_key, collateral_vault_key, genesis_key},
             deployment_args=[interest_accrual_period, lending_pool_key, collateral_vault_key, genesis_key, is_payable],
@@ -1001,6 +1050,7 @@ class LoansOTCPunksFixed(MinimalProxy):
         genesis_key: str,
         is_payable: bool,
         abi_key: str,
+        bytecode_key: str | None = None,
         address: str | None = None,
     ):
         super().__init__(
@@ -1009,6 +1059,7 @@ class LoansOTCPunksFixed(MinimalProxy):
             project.LoansOTCPunksFixed,
             version=version,
             abi_key=abi_key,
+            bytecode_key=bytecode_key,
             impl=implementation_key,
             deployment_deps={implementation_key, lending_pool_key, collateral_vault_key, genesis_key},
             deployment_args=[interest_accrual_period, lending_pool_key, collateral_vault_key, genesis_key, is_payable],
@@ -1,21 +1,29 @@
-import json
 import logging
 import os
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-from ape import accounts
+from rich import print as rprint
+from rich.markup import escape
 
-from . import contracts as contracts_module
+from .backend import ApeBackend, using_backend
 from .basetypes import (
     ContractConfig,
     DeploymentContext,
     Environment,
 )
 from .dependency import DependencyManager
+from .journal import DeploymentJournal
+from .multicall import prefetch_reads
+from .repository import ConfigRepository
+from .transactions import transaction_id
+from .txqueue import QueuedTransaction, TransactionQueue
 
 ENV = Environment[os.environ.get("ENV", "local")]
+CONTRACT_PREFETCH_WORKERS = 16
 
 
 logger = logging.getLogger(__name__)
@@ -23,139 +31,275 @@ logger.setLevel(logging.WARNING)
 warnings.filterwarnings("ignore")
 
 
-def load_contracts(env: Environment) -> list[ContractConfig]:
-    config_file = Path.cwd() / "configs" / env.name / "pools.json"
-    with config_file.open(encoding="utf8") as f:
-        config = json.load(f)
+class DeploymentError(Exception):
+    pass
 
-    contract_configs = {
-        f"{pool_id.lower()}.{key}": c for pool_id, pool in config["pools"].items() for key, c in pool["contracts"].items()
-    } | {f"common.{k}": v for k, v in config["common"].items()}
 
-    return [
-        contracts_module.__dict__[c["contract_def"]](
-            key=key, address=c.get("contract"), abi_key=c.get("abi_key"), **c.get("properties", {})
-        )
-        for key, c in contract_configs.items()
-    ]
-
-
-def store_contracts(env: Environment, contracts: list[ContractConfig]):
-    config_file = Path.cwd() / "configs" / env.name / "pools.json"
-    with config_file.open(encoding="utf8") as f:
-        config = json.load(f)
-
-    contracts_dict = {c.key: c for c in contracts}
-
-    contract_configs = {
-        f"{pool_id.lower()}.{key}": c for pool_id, pool in config["pools"].items() for key, c in pool["contracts"].items()
-    } | {f"common.{k}": v for k, v in config["common"].items()}
-
-    for key, c in contract_configs.items():
-        if key in contracts_dict:
-            c["contract"] = contracts_dict[key].address()
-            if contracts_dict[key].abi_key:
-                c["abi_key"] = contracts_dict[key].abi_key
-            if contracts_dict[key].version:
-                c["version"] = contracts_dict[key].version
-
-    with config_file.open(mode="w", encoding="utf8") as f:
-        f.write(json.dumps(config, indent=4, sort_keys=True))
-
-
-def load_nft_contracts(env: Environment) -> list[ContractConfig]:
-    config_file = Path.cwd() / "configs" / env.name / "collections.json"
-    with config_file.open(encoding="utf8") as f:
-        config = json.load(f)
-
-    return [
-        contracts_module.__dict__[c.get("contract_def", "ERC721")](
-            key=key,
-            address=c.get("contract_address"),
-            abi_key=c.get("abi_key"),
-        )
-        for key, c in config.items()
-    ]
-
-
-def store_nft_contracts(env: Environment, contracts: list[ContractConfig]):
-    config_file = Path.cwd() / "configs" / env.name / "collections.json"
-    with config_file.open(encoding="utf8") as f:
-        config = json.load(f)
-
-    contracts_dict = {c.key: c for c in contracts}
-
-    for key, c in config.items():
-        if key in contracts_dict:
-            c["contract_address"] = contracts_dict[key].address()
-
-    with config_file.open(mode="w", encoding="utf8") as f:
-        f.write(json.dumps(config, indent=2, sort_keys=True))
-
-
-def load_configs(env: Environment) -> dict:
-    config_file = Path.cwd() / "configs" / env.name / "pools.json"
-    with config_file.open(encoding="utf8") as f:
-        config = json.load(f)
-
-    _configs = config.get("configs", {})
-    return {f"configs.{k}": v for k, v in _configs.items()}
+def journal_path(env: Environment, chain_key: str) -> Path:
+    # a journal only applies to the chain it was written on, eg not to a restarted local node
+    return Path.cwd() / ".cache" / "deployments" / f"{env.name}-{chain_key}.jsonl"
 
 
 class DeploymentManager:
-    def __init__(self, env: Environment):
+    def __init__(self, env: Environment, *, prefetch: bool = False, scope: set[str] | None = None, backend: Any = None):
         self.env = env
-        match env:
-            case Environment.local:
-                self.owner = accounts[0]
-            case Environment.dev:
-                self.owner = accounts.load("devacc")
-            case Environment.int:
-                self.owner = accounts.load("intacc")
-            case Environment.prod:
-                self.owner = accounts.load("prodacc")
-        self.context = DeploymentContext(self._get_contracts(), self.env, self.owner, self._get_configs())
+        self.scope = scope
+        self.backend = backend or ApeBackend()
+        self.owner = self.backend.owner(env)
+        self.repository = ConfigRepository(env)
+        self.save_state = True
+        # contract containers are resolved through the active backend when the configs are loaded
+        with using_backend(self.backend):
+            contracts = self._get_contracts()
+        self.context = DeploymentContext(contracts, self.env, self.owner, self._get_configs(), backend=self.backend)
+        self.prefetch: list[Future] = self.prefetch_contracts() if prefetch else []
 
     def _get_contracts(self) -> dict[str, ContractConfig]:
-        contracts = load_contracts(self.env)
-        nfts = load_nft_contracts(self.env)
+        keys = self.repository.scoped_keys(self.scope) if self.scope else None
+        contracts = self.repository.load_contracts(keys)
+        nfts = self.repository.load_nft_contracts(keys)
         all_contracts = contracts + nfts
 
-        # always deploy everything in local
-        if self.env == Environment.local:
+        # always deploy everything in local or on an empty in-process chain
+        if self.env == Environment.local or self.backend.empty_chain:
             for contract in all_contracts:
                 contract.contract = None
 
         return {c.key: c for c in all_contracts}
 
+    def prefetch_contracts(self, keys: set[str] | None = None) -> list[Future]:
+        # contracts are resolved in background threads, accessing one still pending resolves it in the caller thread
+        pending = [c for k, c in self.context.contracts.items() if c.contract_pending() and (keys is None or k in keys)]
+        executor = ThreadPoolExecutor(max_workers=CONTRACT_PREFETCH_WORKERS)
+        futures = [executor.submit(c.resolve_contract) for c in pending]
+        for contract, future in zip(pending, futures):
+            future.add_done_callback(partial(self._report_prefetch, contract))
+        executor.shutdown(wait=False)
+        return futures
+
+    @staticmethod
+    def _report_prefetch(contract: ContractConfig, future: Future):
+        # the contract is resolved again, and the error raised, when it's accessed
+        if future.exception() is not None:
+            rprint(f"[dark_orange bold]WARNING[/] Prefetching {contract.key} failed: {escape(str(future.exception()))}")
+
     def _get_configs(self) -> dict[str, Any]:
-        return load_configs(self.env)
+        return self.repository.configs()
 
     def _save_state(self):
-        nft_contracts = [c for c in self.context.contracts.values() if c.nft]
-        contracts = [c for c in self.context.contracts.values() if not c.nft]
-        store_nft_contracts(self.env, nft_contracts)
-        store_contracts(self.env, contracts)
+        self.repository.save(list(self.context.contracts.values()))
+        self.context.abis.save()
+
+    def _replay_journal(self):
+        journal = self.context.journal
+        if not journal.entries:
+            return
+        deployed = journal.deployed()
+        missing = sorted(k for k, entry in deployed.items() if not self.backend.code(entry["address"]))
+        if missing:
+            rprint(
+                f"[dark_orange bold]WARNING[/] No code on chain for {', '.join(missing)}, "
+                f"discarding {journal.path} as it was written on another chain"
+            )
+            journal.remove()
+            return
+        # the journal is the only record of these deployments until the config files are saved
+        self.repository.apply_deployments(deployed)
+        scoped = {k: entry for k, entry in deployed.items() if k in self.context.contracts}
+        for key, entry in scoped.items():
+            contract = self.context.contracts[key]
+            contract.load_contract(entry["address"])
+            contract.abi_key = entry.get("abi_key")
+            contract.bytecode_key = entry.get("bytecode_key")
+            contract.deployment_tx = entry.get("tx")
+        rprint(
+            f"Resuming from {journal.path}: {len(scoped)} contracts deployed ({len(deployed) - len(scoped)} outside the "
+            f"scope), {len(journal.completed_setters())} config transactions done"
+        )
+
+    def _is_deployed(self, contract: ContractConfig) -> bool:
+        return self.context.journal is not None and contract.key in self.context.journal.deployed()
+
+    def _deploy_contract(self, contract: ContractConfig, nonce: int | None = None):
+        contract.deploy(self.context, nonce)
+        self._record_deployment(contract, nonce)
+
+    def _record_deployment(self, contract: ContractConfig, nonce: int | None = None):
+        if self.context.journal is not None:
+            self.context.journal.record(
+                "deploy",
+                key=contract.key,
+                address=contract.address(),
+                tx=contract.deployment_tx,
+                nonce=nonce,
+                abi_key=contract.abi_key,
+                bytecode_key=contract.bytecode_key,
+            )
+
+    def _post_deploy_contract(self, contract: ContractConfig):
+        journal = self.context.journal
+        if journal is not None and contract.key in journal.post_deployed():
+            return
+        contract.post_deploy(self.context)
+        if journal is not None:
+            journal.record("post_deploy", key=contract.key)
+
+    def _deploy_sequential(self, dependency_manager: DependencyManager):
+        for contract in dependency_manager.build_contract_deploy_set():
+            if contract.deployable(self.context):
+                if not self._is_deployed(contract):
+                    self._deploy_contract(contract)
+                self._post_deploy_contract(contract)
+
+    def _deploy_parallel(self, dependency_manager: DependencyManager):
+        levels = dependency_manager.build_contract_deploy_levels()
+        for i, level in enumerate(levels):
+            deployable = [c for c in level if c.deployable(self.context)]
+            contracts = [c for c in deployable if not self._is_deployed(c)]
+            rprint(f"Deploying level {i + 1} out of {len(levels)}: {', '.join(c.key for c in contracts)}")
+
+            if self.context.dryrun:
+                for contract in contracts:
+                    self._deploy_contract(contract)
+            else:
+                self._deploy_level(contracts)
+
+            for contract in deployable:
+                self._post_deploy_contract(contract)
+
+    def _deploy_level(self, contracts: list[ContractConfig]):
+        # every deployment of the level is sent without waiting for the previous one, through a queue assigning the
+        # nonces and filling the ones left by deployments failing before being broadcasted
+        if not contracts:
+            return
+        queue = TransactionQueue(
+            self.owner, self.owner.nonce, max_workers=max(len(contracts), 1), gas_options=self.context.gas_options()
+        )
+        sent = [(c, queue.submit(c.key, partial(self._send_deployment, c))) for c in contracts]
+        queue.wait()
+        # the journal is only written from the main thread
+        for contract, transaction in sent:
+            if transaction.error is None:
+                self._record_deployment(contract, transaction.nonce)
+        if queue.failed():
+            queue.report()
+            raise DeploymentError(f"{len(queue.failed())} deployments failed: {', '.join(t.label for t in queue.failed())}")
+
+    def _send_deployment(self, contract: ContractConfig, nonce: int) -> Any:
+        contract.deploy(self.context, nonce)
+        return contract.contract
+
+    def _execute_dependency_txs(self, dependencies_tx: set):
+        journal = self.context.journal
+        queue = self.context.queue
+        completed = journal.completed_setters() if journal is not None else set()
+        queued: dict[str, list[QueuedTransaction]] = {}
+        for dependency_tx in dependencies_tx:
+            tx_id = transaction_id(dependency_tx)
+            if tx_id in completed:
+                rprint(f"Skipping {tx_id}, already done in a previous run")
+                continue
+            self.context.current_setter = tx_id
+            failed, sent = len(self.context.failed), len(queue.transactions) if queue is not None else 0
+            dependency_tx(self.context)
+            if len(self.context.failed) > failed:
+                continue
+            if queue is not None:
+                queued[tx_id] = queue.transactions[sent:]
+            else:
+                self._complete_setter(tx_id)
+        self.context.current_setter = None
+
+        if queue is not None:
+            rprint(f"Waiting for {len(queue.transactions)} configuration transactions")
+            queue.wait()
+            queue.report()
+            # failed transactions include the ones whose nonce was filled, their setters are retried by the next run
+            self.context.failed += [t.label for t in queue.failed()]
+            for tx_id, transactions in queued.items():
+                if all(t.error is None for t in transactions):
+                    self._complete_setter(tx_id)
+            self.context.queue = None
+
+    def _complete_setter(self, tx_id: str):
+        if self.context.journal is not None:
+            self.context.journal.record("config", setter=tx_id)
+
+    def changed_contracts(self) -> set[str]:
+        unknown = sorted(k for k, c in self.context.contracts.items() if self._bytecode_unknown(c))
+        if unknown:
+            rprint(
+                f"[dark_orange bold]WARNING[/] No bytecode fingerprint stored for {', '.join(unknown)}, changes can't be "
+                "detected until it's backfilled with `--backfill-bytecode-keys`"
+            )
+        return {k for k, c in self.context.contracts.items() if c.deployable(self.context) and c.bytecode_changed()}
+
+    def _bytecode_unknown(self, contract: ContractConfig) -> bool:
+        return contract.deployable(self.context) and contract.has_contract() and contract.bytecode_key is None
+
+    def backfill_bytecode_keys(self, *, save_state=True) -> set[str]:
+        # contracts deployed before fingerprints were stored get the one of the current compilation when their code on
+        # chain matches it, the others are left unknown
+        backfilled = set()
+        for key, contract in self.context.contracts.items():
+            if self._bytecode_unknown(contract) and contract.runs_compiled_code(self.context, self.backend.code):
+                contract.bytecode_key = contract.compiled_bytecode_key()
+                backfilled.add(key)
+        unknown = sorted(k for k, c in self.context.contracts.items() if self._bytecode_unknown(c))
+        rprint(f"Backfilled {len(backfilled)} bytecode fingerprints, {len(unknown)} don't match the compiled code")
+        for key in unknown:
+            rprint(f"  {key} at {self.context.contracts[key].address()}")
+        if save_state and self.backend.persistent:
+            self._save_state()
+        return backfilled
 
-    def deploy(self, changes: set[str], *, dryrun=False, save_state=True):
+    def deploy(self, changes: set[str], *, dryrun=False, save_state=True, parallel=False, detect_changes=True):
         self.owner.set_autosign(True)
         self.context.dryrun = dryrun
+        self.context.failed = []
+        # an in-process chain is gone once the process exits, so its state isn't stored
+        save_state = save_state and self.backend.persistent
+        parallel = parallel and self.backend.concurrent
+        self.save_state = save_state
+        self.context.reads.block = self.backend.block_number()
+        # without saving the state, eg rehearsing on a fork, a journal would be replayed by the next run against the
+        # live network
+        if save_state and not dryrun:
+            self.context.journal = DeploymentJournal.open(journal_path(self.env, self.backend.chain_key()))
+            self._replay_journal()
+        if detect_changes:
+            detected_changes = self.changed_contracts()
+            if detected_changes:
+                rprint(f"Contracts with changed bytecode: {', '.join(sorted(detected_changes))}")
+            changes = set(changes) | detected_changes
         dependency_manager = DependencyManager(self.context, changes)
-        contracts_to_deploy = dependency_manager.build_contract_deploy_set()
         dependencies_tx = dependency_manager.build_transaction_set()
 
-        for contract in contracts_to_deploy:
-            if contract.deployable(self.context):
-                contract.deploy(self.context)
+        if parallel:
+            self._deploy_parallel(dependency_manager)
+        else:
+            self._deploy_sequential(dependency_manager)
 
         if save_state and not dryrun:
             self._save_state()
 
-        for dependency_tx in dependencies_tx:
-            dependency_tx(self.context)
+        prefetch_reads(self.context, dependency_manager.build_read_set())
+        if parallel and not dryrun:
+            self.context.queue = TransactionQueue(self.owner, self.owner.nonce, gas_options=self.context.gas_options())
+        self._execute_dependency_txs(dependencies_tx)
 
+        failed = self.context.failed
         if save_state and not dryrun:
             self._save_state()
-
-    def deploy_all(self, *, dryrun=False, save_state=True):
-        self.deploy(self.context.contract.keys(), dryrun=dryrun, save_state=save_state)
+            # the journal is only needed until the state is stored in the config files, or to skip the setters that
+            # completed when rerunning after a failure
+            if not failed:
+                self.context.journal.remove()
+        self.context.journal = None
+
+        rprint(f"Chain reads: {self.context.reads.summary()}")
+        if failed:
+            raise DeploymentError(f"{len(failed)} transactions failed: {', '.join(failed)}")
+
+    def deploy_all(self, *, dryrun=False, save_state=True, parallel=False):
+        self.deploy(self.context.contracts.keys(), dryrun=dryrun, save_state=save_state, parallel=parallel)
@@ -0,0 +1,138 @@
+import logging
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from threading import Lock
+from typing import Any
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BATCH_WRITE_SIZE = 25  # dynamodb limit for BatchWriteItem
+# botocore already retries connection errors, anything left is reported as a failed write
+WRITE_ERRORS = (ClientError, BotoCoreError)
+RETRYABLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+}
+
+
+@dataclass
+class TableCounts:
+    written: int = 0
+    failed: int = 0
+    retries: int = 0
+
+
+@dataclass
+class DynamoWriter:
+    resource: Any
+    max_workers: int = 8
+    max_attempts: int = 6
+    base_delay: float = 0.1
+    counts: dict[str, TableCounts] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = Lock()
+
+    def update_items(self, table_name: str, key_name: str, items: dict[str, dict]):
+        # attributes are SET on each item so that attributes not published are kept, which can't be done in batches
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {key: executor.submit(self._update_item, table_name, key_name, key, item) for key, item in items.items()}
+        for key, future in futures.items():
+            try:
+                future.result()
+                self._count(table_name, written=1)
+            except WRITE_ERRORS:
+                logger.exception(f"Error writing {key_name}={key} to {table_name}")  # noqa: G004
+                self._count(table_name, failed=1)
+
+    def put_items(self, table_name: str, items: list[dict]):
+        batches = [items[i : i + BATCH_WRITE_SIZE] for i in range(0, len(items), BATCH_WRITE_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._put_batch, table_name, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                unprocessed = future.result()
+            except WRITE_ERRORS:
+                logger.exception(f"Error writing batch to {table_name}")  # noqa: G004
+                self._count(table_name, failed=len(batch))
+                continue
+            self._count(table_name, written=len(batch) - unprocessed, failed=unprocessed)
+
+    def read_items(self, table_name: str, key_name: str) -> dict[str, dict]:
+        # every item in the table by key, without the key attribute
+        table = self.resource.Table(table_name)
+        items, scan_kwargs = {}, {}
+        while True:
+            response = self._with_retries(table_name, partial(table.scan, **scan_kwargs))
+            for item in response["Items"]:
+                items[item.pop(key_name)] = item
+            if "LastEvaluatedKey" not in response:
+                return items
+            scan_kwargs = {"ExclusiveStartKey": response["LastEvaluatedKey"]}
+
+    def report(self):
+        for table_name, c in self.counts.items():
+            logger.info(f"{table_name}: {c.written} written, {c.failed} failed, {c.retries} retries")  # noqa: G004
+
+    def failed(self, table_name: str | None = None) -> int:
+        return sum(c.failed for name, c in self.counts.items() if table_name in {None, name})
+
+    def _update_item(self, table_name: str, key_name: str, key: str, item: dict):
+        indexed_attrs = list(enumerate(item.items()))
+        update_expr = ", ".join(f"#k{i}=:v{i}" for i, (k, v) in indexed_attrs)
+        attrs = {f"#k{i}": k for i, (k, v) in indexed_attrs}
+        values = {f":v{i}": v for i, (k, v) in indexed_attrs}
+        table = self.resource.Table(table_name)
+        self._with_retries(
+            table_name,
+            partial(
+                table.update_item,
+                Key={key_name: key},
+                UpdateExpression=f"SET {update_expr}",
+                ExpressionAttributeNames=attrs,
+                ExpressionAttributeValues=values,
+            ),
+        )
+
+    def _put_batch(self, table_name: str, batch: list[dict]) -> int:
+        request_items = {table_name: [{"PutRequest": {"Item": item}} for item in batch]}
+        for attempt in range(self.max_attempts):
+            response = self._with_retries(table_name, partial(self.resource.batch_write_item, RequestItems=request_items))
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return 0
+            if attempt < self.max_attempts - 1:
+                self._retry(table_name, attempt)
+        return len(request_items.get(table_name, []))
+
+    def _with_retries(self, table_name: str, request: Callable[[], Any]) -> Any:
+        for attempt in range(self.max_attempts):
+            try:
+                return request()
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in RETRYABLE_ERRORS or attempt == self.max_attempts - 1:
+                    raise
+                self._retry(table_name, attempt)
+        return None
+
+    def _count(self, table_name: str, written: int = 0, failed: int = 0, retries: int = 0):
+        # writes to the same table can be running in several threads
+        with self._lock:
+            table_counts = self.counts.setdefault(table_name, TableCounts())
+            table_counts.written += written
+            table_counts.failed += failed
+            table_counts.retries += retries
+
+    def _retry(self, table_name: str, attempt: int):
+        self._count(table_name, retries=1)
+        # exponential backoff with full jitter
+        time.sleep(random.uniform(0, self.base_delay * 2**attempt))
@@ -0,0 +1,108 @@
+from collections import defaultdict, deque
+
+
+class DependencyCycleError(Exception):
+    def __init__(self, path: list[str]):
+        super().__init__(f"Dependency cycle found: {' -> '.join(path)}")
+        self.path = path
+
+
+# edges map each node to the set of nodes that depend on it
+class DependencyGraph:
+    def __init__(self, edges: dict[str, set[str]]):
+        self.edges = edges
+        self.order = topological_sort(edges)
+        self._sources: set[str] = set()
+        self._closure: set[str] = set()
+
+    def closure(self, sources: set[str]) -> set[str]:
+        # the previous closure is extended when sources only grew, otherwise it's computed again
+        if not self._sources <= sources:
+            self._sources, self._closure = set(), set()
+        new_sources = sources - self._sources
+        self._closure |= reachable(self.edges, new_sources, visited=self._closure)
+        self._sources = set(sources)
+        return set(self._closure)
+
+    def levels(self, nodes: set[str]) -> list[list[str]]:
+        return deployment_levels(self.edges, self.order, nodes)
+
+
+def topological_sort(dependencies: dict[str, set[str]]) -> list[str]:
+    nodes = set(dependencies.keys()) | {w for v in dependencies.values() for w in v}
+    in_degree = dict.fromkeys(nodes, 0)
+    for dependents in dependencies.values():
+        for d in dependents:
+            in_degree[d] += 1
+
+    queue = deque(sorted(n for n, degree in in_degree.items() if degree == 0))
+    order = []
+    while queue:
+        n = queue.popleft()
+        order.append(n)
+        for d in sorted(dependencies.get(n, ())):
+            in_degree[d] -= 1
+            if in_degree[d] == 0:
+                queue.append(d)
+
+    if len(order) < len(nodes):
+        raise DependencyCycleError(find_cycle(dependencies, {n for n, degree in in_degree.items() if degree > 0}))
+    return order
+
+
+def find_cycle(dependencies: dict[str, set[str]], nodes: set[str]) -> list[str]:
+    # every node left over by Kahn's algorithm has a predecessor also left over, so walking back must loop
+    predecessors = defaultdict(list)
+    for n in nodes:
+        for d in dependencies.get(n, ()):
+            if d in nodes:
+                predecessors[d].append(n)
+
+    path = [min(nodes)]
+    seen = {path[0]: 0}
+    while True:
+        n = min(predecessors[path[-1]])
+        if n in seen:
+            cycle = path[seen[n] :] + [n]
+            return cycle[::-1]
+        seen[n] = len(path)
+        path.append(n)
+
+
+def reachable(dependencies: dict[str, set[str]], sources: set[str], visited: set[str] | None = None) -> set[str]:
+    visited = visited if visited is not None else set()
+    found = set()
+    stack = [n for n in sources if n not in visited]
+    while stack:
+        n = stack.pop()
+        if n in visited or n in found:
+            continue
+        found.add(n)
+        stack.extend(d for d in dependencies.get(n, ()) if d not in visited and d not in found)
+    return found
+
+
+def deployment_levels(dependencies: dict[str, set[str]], order: list[str], nodes: set[str]) -> list[list[str]]:
+    # nodes only depend on nodes from previous levels, deps outside of nodes are already deployed
+    level = {}
+    for n in order:
+        if n not in nodes:
+            continue
+        level.setdefault(n, 0)
+        for d in dependencies.get(n, ()):
+            if d in nodes:
+                level[d] = max(level.get(d, 0), level[n] + 1)
+    levels = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for n in order:
+        if n in level:
+            levels[level[n]].append(n)
+    return levels
+
+
+def groupby_first(tuples: set[tuple], extended_keys: set[str] | None = None) -> dict[str, set[str]]:
+    res = defaultdict(set)
+    for k in extended_keys or set():
+        res[k] = set()
+    for k, v in tuples:
+        res[k].add(v)
+    return dict(res)
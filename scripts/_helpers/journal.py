@@ -0,0 +1,66 @@
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+
+def _parse_line(line: bytes) -> dict[str, Any] | None:
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+
+@dataclass
+class DeploymentJournal:
+    path: Path
+    entries: list[dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._lock = Lock()
+
+    @classmethod
+    def open(cls, path: Path) -> "DeploymentJournal":
+        entries = []
+        if path.exists():
+            with path.open(mode="rb+") as f:
+                complete = 0
+                for line in f:
+                    # a crash while appending can leave the last line incomplete, it's dropped so the next entries
+                    # aren't appended to it
+                    entry = _parse_line(line)
+                    if entry is None:
+                        f.truncate(complete)
+                        break
+                    entries.append(entry)
+                    complete += len(line)
+        return cls(path, entries)
+
+    def record(self, kind: str, **data):
+        entry = {"kind": kind} | data
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open(mode="a", encoding="utf8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries.append(entry)
+
+    def deployed(self) -> dict[str, dict[str, Any]]:
+        return {e["key"]: e for e in self.entries if e["kind"] == "deploy"}
+
+    def post_deployed(self) -> set[str]:
+        return {e["key"] for e in self.entries if e["kind"] == "post_deploy"}
+
+    def completed_setters(self) -> set[str]:
+        # a setter is only recorded once every transaction it sent was confirmed
+        return {e["setter"] for e in self.entries if e["kind"] == "config"}
+
+    def remove(self):
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.entries = []
@@ -0,0 +1,102 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+
+def canonical(value: Any) -> Any:
+    # dynamodb returns every number as a Decimal, so numbers are compared by value whatever type they were written with
+    if value is None or isinstance(value, bool | str):
+        return value
+    if isinstance(value, int | float | Decimal):
+        return str(Decimal(str(value)).normalize())
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [canonical(v) for v in value]
+    return str(value)
+
+
+def content_hash(value: Any) -> str:
+    json_dump = json.dumps(canonical(value), sort_keys=True)
+    return hashlib.sha1(json_dump.encode("utf8")).hexdigest()
+
+
+def record_hashes(record: dict) -> dict[str, str]:
+    return {k: content_hash(v) for k, v in record.items()}
+
+
+def manifest_path(env: str) -> Path:
+    return Path.cwd() / ".cache" / "publish" / f"{env}-manifest.json"
+
+
+# content hashes of every attribute published to each table, by table and record key. Publishing compares against it
+# instead of reading the tables, so it only holds while the tables are written by publish alone
+@dataclass
+class PublishManifest:
+    path: Path
+    tables: dict[str, dict[str, dict[str, str]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # the tables are published from several threads
+        self._lock = Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "PublishManifest":
+        tables = json.loads(path.read_text(encoding="utf8")) if path.exists() else {}
+        return cls(path, tables)
+
+    def published(self, table: str) -> dict[str, dict[str, str]] | None:
+        return self.tables.get(table)
+
+    def replace(self, table: str, published: dict[str, dict[str, str]]):
+        with self._lock:
+            self.tables[table] = published
+
+    def record(self, table: str, updates: dict[str, dict]):
+        # written attributes replace the recorded ones, the others are kept as they are kept in the table
+        with self._lock:
+            hashes = self.tables.setdefault(table, {})
+            for key, attrs in updates.items():
+                hashes.setdefault(key, {}).update(record_hashes(attrs))
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self.path.write_text(json.dumps(self.tables, indent=2, sort_keys=True) + "\n", encoding="utf8")
+
+
+@dataclass
+class TableDiff:
+    added: dict[str, dict] = field(default_factory=dict)
+    changed: dict[str, dict] = field(default_factory=dict)
+    removed: set[str] = field(default_factory=set)
+
+    def updates(self) -> dict[str, dict]:
+        # only the changed attributes of each record need to be written
+        return self.added | self.changed
+
+    def summary(self) -> list[str]:
+        lines = [f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"]
+        lines += [f"+ {key}" for key in sorted(self.added)]
+        lines += [f"~ {key}: {', '.join(sorted(attrs))}" for key, attrs in sorted(self.changed.items())]
+        lines += [f"- {key} (not deleted)" for key in sorted(self.removed)]
+        return lines
+
+
+def table_diff(published: dict[str, dict[str, str]], records: dict[str, dict]) -> TableDiff:
+    # `published` holds the content hashes of the attributes of each stored record, from the manifest or from reading
+    # the table. Attributes of a stored item that aren't published are ignored
+    diff = TableDiff(removed=set(published) - set(records))
+    for key, record in records.items():
+        if key not in published:
+            diff.added[key] = record
+            continue
+        stored = published[key]
+        changed = {k: v for k, v in record.items() if stored.get(k) != content_hash(v)}
+        if changed:
+            diff.changed[key] = changed
+    return diff
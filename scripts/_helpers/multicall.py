@@ -0,0 +1,82 @@
+from typing import Any
+
+from ape import Contract, networks
+from rich import print
+from rich.markup import escape
+
+from .basetypes import DeploymentContext
+
+# https://www.multicall3.com, deployed at the same address in mainnet and most testnets
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_BATCH_SIZE = 100
+
+# aggregate3 is declared as view so that ape performs an eth_call instead of sending a transaction
+MULTICALL3_ABI = [
+    {
+        "type": "function",
+        "name": "aggregate3",
+        "stateMutability": "view",
+        "inputs": [
+            {
+                "name": "calls",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+            }
+        ],
+        "outputs": [
+            {
+                "name": "returnData",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+            }
+        ],
+    }
+]
+
+
+def multicall_available() -> bool:
+    return bool(networks.provider.get_code(MULTICALL3_ADDRESS))
+
+
+def prefetch_reads(context: DeploymentContext, reads: set[tuple[str, str]]):
+    if not reads or not context.backend.multicall or not multicall_available():
+        return
+
+    ecosystem = networks.provider.network.ecosystem
+    calls = []
+    for contract_key, getter in sorted(reads):
+        contract = context.contracts[contract_key].contract
+        if contract is None or getter not in contract.contract_type.view_methods:
+            continue
+        abi = contract.contract_type.view_methods[getter]
+        calldata = ecosystem.get_method_selector(abi) + ecosystem.encode_calldata(abi)
+        calls.append(((contract_key, getter), abi, (contract.address, True, calldata)))
+
+    multicall = Contract(MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    print(f"Prefetching {len(calls)} config values using multicall")
+    for i in range(0, len(calls), MULTICALL3_BATCH_SIZE):
+        batch = calls[i : i + MULTICALL3_BATCH_SIZE]
+        try:
+            results = multicall.aggregate3([call for _, _, call in batch])
+        except Exception as e:
+            # the values not prefetched are read one by one by the setters
+            print(f"[dark_orange bold]WARNING[/] Prefetching {len(batch)} config values failed: {escape(str(e))}")
+            continue
+        for ((contract_key, getter), abi, _), result in zip(batch, results):
+            if not result.success:
+                print(f"[dark_orange bold]WARNING[/] Prefetch of [blue]{escape(contract_key)}[/].{getter} failed")
+                continue
+            address = context.contracts[contract_key].address()
+            context.reads.put(context.reads.key(address, getter, ()), _decode_output(ecosystem, abi, result.returnData))
+
+
+def _decode_output(ecosystem, abi, data: bytes) -> Any:
+    output = ecosystem.decode_returndata(abi, data)
+    return output[0] if isinstance(output, tuple | list) and len(output) == 1 else output
@@ -0,0 +1,134 @@
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from ape import convert
+from ape.types import AddressType
+from rich import print as rprint
+from rich.markup import escape
+from rich.progress import Progress
+
+from .basetypes import ContractConfig, Environment
+from .txqueue import TransactionQueue
+
+OWNERSHIP_READ_WORKERS = 16
+OWNERSHIP_FUNCTIONS = {"propose": "proposeOwner", "claim": "claimOwnership"}
+
+
+def summary_path(env: Environment, action: str) -> Path:
+    return Path.cwd() / ".cache" / "ownership" / f"{env.name}-{action}.json"
+
+
+# outcome of each contract in a rotation, rewritten after every confirmation so that an interrupted run can be inspected
+@dataclass
+class RotationSummary:
+    path: Path
+    action: str
+    target: str
+    contracts: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = Lock()
+
+    @classmethod
+    def load(cls, path: Path, action: str, target: str) -> "RotationSummary":
+        summary = cls(path, action, target)
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf8"))
+            # a summary for another target belongs to a different rotation
+            if data.get("target") == target:
+                summary.contracts = data["contracts"]
+        return summary
+
+    def record(self, key: str, status: str, **data):
+        with self._lock:
+            self.contracts[key] = {"status": status} | data
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            content = {"action": self.action, "target": self.target, "contracts": self.contracts}
+            tmp_path.write_text(json.dumps(content, indent=2, sort_keys=True, default=str) + "\n", encoding="utf8")
+            tmp_path.replace(self.path)
+
+    def counts(self) -> dict[str, int]:
+        counts = {}
+        for entry in self.contracts.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+    def report(self):
+        for key, entry in sorted(self.contracts.items()):
+            if entry["status"] == "failed":
+                rprint(f"[bold red]FAILED[/] {escape(key)}: {escape(str(entry.get('error')))}")
+        totals = ", ".join(f"{n} {status}" for status, n in sorted(self.counts().items()))
+        rprint(f"{self.action} {self.target}: {totals}. Summary written to {self.path}")
+
+
+def _ownership_state(contract: ContractConfig) -> tuple[str, str]:
+    return contract.contract.owner(), contract.contract.proposedOwner()
+
+
+def _pending_status(action: str, target: str, owner: str, proposed_owner: str) -> str | None:
+    # None when the contract still needs a transaction, otherwise the reason it is skipped
+    if owner == target:
+        return "owned"
+    if action == "propose" and proposed_owner == target:
+        return "proposed"
+    if action == "claim" and proposed_owner != target:
+        return "not proposed"
+    return None
+
+
+def rotate_ownership(
+    contracts: dict[str, ContractConfig],
+    sender: Any,
+    action: str,
+    target: str,
+    summary_file: Path,
+    *,
+    gas_price: str = "28 gwei",
+    max_workers: int = 16,
+) -> RotationSummary:
+    func_name = OWNERSHIP_FUNCTIONS[action]
+    target = convert(target, AddressType)
+    candidates = {k: c for k, c in sorted(contracts.items()) if c.has_contract() and hasattr(c.contract, func_name)}
+    summary = RotationSummary.load(summary_file, action, target)
+
+    # checking the current state first lets re-runs skip every contract already done
+    with ThreadPoolExecutor(max_workers=OWNERSHIP_READ_WORKERS) as executor:
+        states = dict(zip(candidates, executor.map(_ownership_state, candidates.values())))
+    pending = {}
+    for key, (owner, proposed_owner) in states.items():
+        status = _pending_status(action, target, owner, proposed_owner)
+        if status is None:
+            pending[key] = candidates[key]
+        else:
+            summary.record(key, "skipped", reason=status)
+
+    rprint(f"{len(pending)} contracts to {action}, {len(candidates) - len(pending)} skipped")
+    queue = TransactionQueue(sender, sender.nonce, max_workers=max_workers, gas_options={"gas_price": convert(gas_price, int)})
+    with Progress() as progress:
+        task = progress.add_task(f"{action} {target}", total=len(pending))
+
+        def record_result(key: str, nonce: int, future: Future):
+            if future.exception() is None:
+                summary.record(key, "confirmed", nonce=nonce, txn_hash=getattr(future.result(), "txn_hash", None))
+            else:
+                summary.record(key, "failed", nonce=nonce, error=str(future.exception()))
+            progress.advance(task)
+
+        for key, contract in pending.items():
+            func = getattr(contract.contract, func_name)
+            args = [target] if action == "propose" else []
+            transaction = queue.submit(
+                key,
+                lambda nonce, func=func, args=args: func(*args, sender=sender, nonce=nonce, **queue.gas_options),
+            )
+            transaction.future.add_done_callback(partial(record_result, key, transaction.nonce))
+        queue.wait()
+
+    summary.report()
+    return summary
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from . import contracts as contracts_module
+from .basetypes import ContractConfig, Environment
+
+
+@dataclass
+class ConfigFile:
+    path: Path
+    data: dict[str, Any]
+    indent: int
+    dirty: bool = False
+
+    @classmethod
+    def load(cls, path: Path, indent: int) -> "ConfigFile":
+        with path.open(encoding="utf8") as f:
+            return cls(path, json.load(f), indent)
+
+    def save(self):
+        if not self.dirty:
+            return
+        # written to a temporary file in the same directory so the rename is atomic
+        with tempfile.NamedTemporaryFile(
+            mode="w", encoding="utf8", dir=self.path.parent, prefix=f".{self.path.name}.", delete=False
+        ) as f:
+            f.write(json.dumps(self.data, indent=self.indent, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        Path(f.name).chmod(self.path.stat().st_mode)
+        Path(f.name).replace(self.path)
+        self.dirty = False
+
+
+def contract_state(contract: ContractConfig) -> dict[str, Any]:
+    if contract.nft:
+        return {"contract_address": contract.address()}
+    state = {"contract": contract.address()}
+    if contract.abi_key:
+        state["abi_key"] = contract.abi_key
+    if contract.version:
+        state["version"] = contract.version
+    if contract.bytecode_key:
+        state["bytecode_key"] = contract.bytecode_key
+    return state
+
+
+# pools.json and collections.json are parsed once and their contract entries indexed by key (eg `eth-grails.loans`),
+# the config files are only rewritten on `save`, contracts deployed by an interrupted run are recovered from the
+# deployment journal
+class ConfigRepository:
+    def __init__(self, env: Environment, base_path: Path | None = None):
+        self.env = env
+        base_path = base_path or Path.cwd()
+        config_dir = base_path / "configs" / env.name
+        self.pools = ConfigFile.load(config_dir / "pools.json", indent=4)
+        self.collections = ConfigFile.load(config_dir / "collections.json", indent=2)
+
+        self.contract_entries = {
+            f"{pool_id.lower()}.{key}": c
+            for pool_id, pool in self.pools.data["pools"].items()
+            for key, c in pool["contracts"].items()
+        } | {f"common.{k}": v for k, v in self.pools.data["common"].items()}
+        self.nft_entries = dict(self.collections.data.items())
+
+    def configs(self) -> dict[str, Any]:
+        return {f"configs.{k}": v for k, v in self.pools.data.get("configs", {}).items()}
+
+    def scoped_keys(self, scope: set[str]) -> set[str]:
+        # each scope item is a pool id (eg `usdc`) or a key prefix (eg `eth-grails.loans`), the selected contracts
+        # are extended with every contract and collection they reference, transitively
+        pool_ids = {pool_id.lower() for pool_id in self.pools.data["pools"]}
+        selected = set()
+        for item in (s.lower() for s in scope):
+            if item in pool_ids:
+                selected |= {k for k in self.contract_entries if k.split(".", 1)[0] == item}
+            else:
+                selected |= {k for k in self.contract_entries if k.startswith(item)}
+
+        keys, stack = set(), list(selected)
+        while stack:
+            key = stack.pop()
+            if key in keys:
+                continue
+            keys.add(key)
+            stack.extend(self._references(key) - keys)
+        return keys
+
+    def _references(self, key: str) -> set[str]:
+        properties = self.contract_entries.get(key, {}).get("properties", {})
+        values = [v for p in properties.values() for v in (p if isinstance(p, list) else [p])]
+        return {v for v in values if isinstance(v, str) and (v in self.contract_entries or v in self.nft_entries)}
+
+    def load_contracts(self, keys: set[str] | None = None) -> list[ContractConfig]:
+        return [
+            contracts_module.__dict__[c["contract_def"]](
+                key=key,
+                address=c.get("contract"),
+                abi_key=c.get("abi_key"),
+                bytecode_key=c.get("bytecode_key"),
+                **c.get("properties", {}),
+            )
+            for key, c in self.contract_entries.items()
+            if keys is None or key in keys
+        ]
+
+    def load_nft_contracts(self, keys: set[str] | None = None) -> list[ContractConfig]:
+        return [
+            contracts_module.__dict__[c.get("contract_def", "ERC721")](
+                key=key,
+                address=c.get("contract_address"),
+                abi_key=c.get("abi_key"),
+            )
+            for key, c in self.nft_entries.items()
+            if keys is None or key in keys
+        ]
+
+    def apply_deployments(self, deployed: dict[str, dict[str, Any]]):
+        # deploy entries of the journal, including the contracts outside the loaded scope
+        for key, entry in deployed.items():
+            if key in self.nft_entries:
+                state = {"contract_address": entry["address"]}
+            else:
+                state = {"contract": entry["address"]} | {k: entry[k] for k in ("abi_key", "bytecode_key") if entry.get(k)}
+            self._apply(key, state)
+
+    def save(self, contracts: list[ContractConfig] | None = None):
+        for contract in contracts or []:
+            self._apply(contract.key, contract_state(contract))
+        self.pools.save()
+        self.collections.save()
+
+    def _apply(self, key: str, state: dict[str, Any]) -> dict[str, Any]:
+        if key in self.contract_entries:
+            entry, config_file = self.contract_entries[key], self.pools
+        elif key in self.nft_entries:
+            entry, config_file = self.nft_entries[key], self.collections
+        else:
+            return {}
+        patch = {k: v for k, v in state.items() if entry.get(k) != v or k not in entry}
+        if patch:
+            entry.update(patch)
+            config_file.dirty = True
+        return patch
@@ -1,19 +1,20 @@
-from functools import wraps
+from collections.abc import Callable
+from functools import partial, wraps
 from typing import Any
 
 from rich import print
 from rich.markup import escape
 
-from .basetypes import ContractConfig, DeploymentContext
+from .basetypes import ContractConfig, DeploymentContext, Environment
 
 
 def check_owner(f):
     @wraps(f)
     def wrapper(self, context, *args, **kwargs):
-        if not hasattr(self, "__is_deployer_owner"):
-            self.__is_deployer_owner = is_deployer_owner(context, self.key)
+        is_deployer_owner(context, self.key)
         return f(self, context, *args, **kwargs)
 
+    wrapper.config_reads = (*getattr(f, "config_reads", ()), "owner")
     return wrapper
 
 
@@ -24,16 +25,41 @@ def check_different(getter: str, value_property: Any):
             value = getattr(self, value_property)
             expected_value = context[value] if value in context else value  # noqa: SIM401
             if isinstance(expected_value, ContractConfig):
+                if not expected_value.address() and not context.dryrun:
+                    setter = f"{self.key}.{getter}"
+                    if context.env == Environment.local or (context.backend is not None and context.backend.empty_chain):
+                        # an external contract that isn't deployed on a local or empty chain
+                        print(f"[dark_orange bold]WARNING[/] {escape(str(expected_value))} has no address, skipping {setter}")
+                    else:
+                        print(f"[bold red]Can't set {setter}, {escape(str(expected_value))} has no address")
+                        context.failed.append(setter)
+                    return lambda *_: None
                 expected_value = expected_value.address()
             if not is_config_needed(context, self.key, getter, expected_value):
                 return lambda *_: None
             return f(self, context, *args, **kwargs)
 
+        wrapper.config_reads = (*getattr(f, "config_reads", ()), getter)
         return wrapper
 
     return check_if_needed
 
 
+def transaction_id(tx: Callable) -> str:
+    func = tx.func if isinstance(tx, partial) else tx
+    kwargs = tx.keywords if isinstance(tx, partial) else {}
+    kwargs_str = ", ".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    return f"{func.__self__.key}.{func.__name__}({kwargs_str})"
+
+
+def transaction_reads(tx: Callable) -> set[tuple[str, str]]:
+    func = tx.func if isinstance(tx, partial) else tx
+    contract = getattr(func, "__self__", None)
+    if not isinstance(contract, ContractConfig):
+        return set()
+    return {(contract.key, getter) for getter in getattr(func, "config_reads", ())}
+
+
 def is_deployer_owner(context: DeploymentContext, contract: str) -> bool:
     if not context[contract].address():
         return True
@@ -62,7 +88,19 @@ def execute_read(context: DeploymentContext, contract: str, func: str, *args, op
     args_values = [context[c] if c in context else c for c in args]  # noqa: SIM401
     args_values = [v.address() if isinstance(v, ContractConfig) else v for v in args_values]
 
-    result = contract_instance.call_view_method(func, *args_values, **(options or {}))
+    if options:
+        result = contract_instance.call_view_method(func, *args_values, **options)
+        print(f"= {result}")
+        return result
+
+    read_key = context.reads.key(contract_instance.address, func, tuple(args_values))
+    cached, result = context.reads.lookup(read_key)
+    if cached:
+        print(f"= {result} [bright_black](cached)[/]")
+        return result
+
+    result = contract_instance.call_view_method(func, *args_values)
+    context.reads.put(read_key, result)
     print(f"= {result}")
     return result
 
@@ -75,7 +113,34 @@ def execute(context: DeploymentContext, contract: str, func: str, *args, options
         function = getattr(contract_instance, func)
         args_values = [context[c] if c in context else c for c in args]  # noqa: SIM401
         args_values = [v.address() if isinstance(v, ContractConfig) else v for v in args_values]
+        tx_options = {"sender": context.owner} | context.gas_options() | (options or {})
+        on_confirm = partial(record_execute, context, contract, func, args, setter=context.current_setter)
+        # the values read until the transaction is mined are stale too, eg a transaction that timed out but was mined
+        context.reads.invalidate(contract_instance.address)
+        if context.queue is not None:
+            label = f"{contract}.{func}({', '.join(str(a) for a in args)})"
+            context.queue.submit(label, partial(function, *args_values, **tx_options), on_confirm=on_confirm)
+            return
         try:
-            function(*args_values, **({"sender": context.owner} | context.gas_options() | (options or {})))
+            on_confirm(function(*args_values, **tx_options))
         except Exception as e:
             print(f"[bold red]Error executing {contract}.{func} with arguments {args_values}: {e}")
+            context.failed.append(f"{contract}.{func}")
+
+
+def record_execute(
+    context: DeploymentContext, contract: str, func: str, args: tuple, receipt: Any, *, setter: str | None = None
+):
+    # reads are only stale once the transaction is mined, invalidating them earlier would let them be cached again
+    context.reads.invalidate(context.contracts[contract].address(), getattr(receipt, "block_number", None))
+    if context.journal is None:
+        return
+    context.journal.record(
+        "execute",
+        setter=setter,
+        contract=contract,
+        func=func,
+        args=list(args),
+        tx=receipt.txn_hash,
+        nonce=receipt.transaction.nonce,
+    )
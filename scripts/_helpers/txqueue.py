@@ -0,0 +1,84 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+from rich import print as rprint
+from rich.markup import escape
+
+
+@dataclass
+class QueuedTransaction:
+    label: str
+    nonce: int
+    future: Future
+    receipt: Any = None
+    error: Exception | None = None
+
+    @property
+    def txn_hash(self) -> str | None:
+        return getattr(self.receipt, "txn_hash", None)
+
+
+@dataclass
+class TransactionQueue:
+    account: Any
+    nonce: int
+    max_workers: int = 16
+    gas_options: dict[str, Any] = field(default_factory=dict)
+    transactions: list[QueuedTransaction] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._lock = Lock()
+
+    def next_nonce(self) -> int:
+        with self._lock:
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    def submit(self, label: str, send: Callable[..., Any], on_confirm: Callable | None = None) -> QueuedTransaction:
+        # nonces are assigned locally in submission order, so sending doesn't wait for the previous receipt
+        nonce = self.next_nonce()
+        future = self._executor.submit(self._send, send, nonce, on_confirm)
+        transaction = QueuedTransaction(label, nonce, future)
+        self.transactions.append(transaction)
+        return transaction
+
+    def _send(self, send: Callable[..., Any], nonce: int, on_confirm: Callable | None):
+        try:
+            receipt = send(nonce=nonce)
+        except Exception:
+            self._fill_nonce(nonce)
+            raise
+        if on_confirm is not None:
+            on_confirm(receipt)
+        return receipt
+
+    def _fill_nonce(self, nonce: int):
+        # a transaction that failed before being broadcasted would leave a gap blocking every later nonce
+        with suppress(Exception):
+            self.account.transfer(self.account, 0, nonce=nonce, **self.gas_options)
+
+    def wait(self) -> list[QueuedTransaction]:
+        for transaction in self.transactions:
+            try:
+                transaction.receipt = transaction.future.result()
+            except Exception as e:
+                transaction.error = e
+        self._executor.shutdown()
+        return self.transactions
+
+    def failed(self) -> list[QueuedTransaction]:
+        return [t for t in self.transactions if t.error is not None]
+
+    def report(self):
+        for t in self.transactions:
+            if t.error is None:
+                rprint(f"[green]OK[/]     nonce={t.nonce} {escape(t.label)} {t.txn_hash}")
+            else:
+                rprint(f"[bold red]FAILED[/] nonce={t.nonce} {escape(t.label)}: {escape(str(t.error))}")
+        rprint(f"{len(self.transactions) - len(self.failed())} transactions succeeded, {len(self.failed())} failed")
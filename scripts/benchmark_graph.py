@@ -0,0 +1,92 @@
+# ruff: noqa: T201
+
+import random
+import time
+from contextlib import contextmanager
+
+import click
+
+from scripts._helpers.graph import DependencyGraph, groupby_first
+
+COMMON_CONTRACTS = {
+    "common.weth": set(),
+    "common.usdc": set(),
+    "common.delegation_registry": set(),
+    "common.genesis": set(),
+    "common.collateral_vault_otc_impl": {"common.delegation_registry"},
+    "common.lending_pool_eth_otc_impl": {"common.weth"},
+    "common.lending_pool_usdc_otc_impl": {"common.usdc"},
+    "common.liquidations_otc_impl": set(),
+    "common.loans_otc_impl": set(),
+}
+
+# mirrors the deployment dependencies of a non-otc pool in pools.json
+POOL_CONTRACTS = {
+    "collateral_vault_core": {"common.delegation_registry"},
+    "collateral_vault_peripheral": {"collateral_vault_core"},
+    "cryptopunks_vault_core": {"common.delegation_registry"},
+    "lending_pool_core": {"token"},
+    "lending_pool_lock": {"token"},
+    "lending_pool": {"lending_pool_core", "lending_pool_lock", "token"},
+    "loans_core": set(),
+    "loans": {"loans_core", "lending_pool", "collateral_vault_peripheral", "common.genesis"},
+    "liquidations_core": set(),
+    "liquidations_peripheral": {"liquidations_core", "common.weth"},
+    "liquidity_controls": set(),
+}
+
+
+def synthetic_dependencies(contracts: int) -> dict[str, set[str]]:
+    pools = max(1, (contracts - len(COMMON_CONTRACTS)) // len(POOL_CONTRACTS))
+    edges = {(dep, key) for key, deps in COMMON_CONTRACTS.items() for dep in deps}
+    for i in range(pools):
+        token = random.choice(["common.weth", "common.usdc"])
+        for key, deps in POOL_CONTRACTS.items():
+            for dep in deps:
+                dep_key = token if dep == "token" else dep if dep.startswith("common.") else f"pool-{i}.{dep}"
+                edges.add((dep_key, f"pool-{i}.{key}"))
+    keys = set(COMMON_CONTRACTS) | {f"pool-{i}.{k}" for i in range(pools) for k in POOL_CONTRACTS}
+    return groupby_first(edges, keys)
+
+
+@contextmanager
+def timed(label: str):
+    start = time.perf_counter()
+    yield
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:10.2f} ms")
+
+
+@click.command()
+@click.option("-n", "--contracts", type=int, default=10_000, help="Approximate number of contracts")
+@click.option("--seed", type=int, default=0)
+def main(contracts: int, seed: int):
+    random.seed(seed)
+    with timed("build synthetic config"):
+        dependencies = synthetic_dependencies(contracts)
+    print(f"{len(dependencies)} contracts, {sum(len(v) for v in dependencies.values())} dependencies")
+
+    with timed("topological sort"):
+        graph = DependencyGraph(dependencies)
+
+    changed = {"common.weth"}
+    with timed("closure of common.weth"):
+        deployment_set = graph.closure(changed)
+
+    with timed("levels of closure"):
+        levels = graph.levels(deployment_set)
+    print(f"{len(deployment_set)} contracts to deploy in {len(levels)} levels")
+
+    pool_key = next(k for k in dependencies if k.endswith(".lending_pool_core"))
+    with timed("incremental closure adding one pool"):
+        graph.closure(changed | {pool_key})
+
+    with timed("rebuild graph and closure"):
+        DependencyGraph(dependencies).closure(changed | {pool_key})
+
+    with timed("levels of everything"):
+        levels = graph.levels(set(dependencies))
+    print(f"{len(dependencies)} contracts in {len(levels)} levels")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,12 +23,25 @@ def gas_cost(context):  # noqa: ARG001
 
 
 @click.command(cls=ConnectedProviderCommand)
-def cli(network):
+@click.option("--parallel", is_flag=True, default=False, help="Deploy levels and send config transactions concurrently")
+@click.option("--scope", multiple=True, help="Only load these pool ids or key prefixes (and their dependencies)")
+@click.option(
+    "--backfill-bytecode-keys",
+    "backfill",
+    is_flag=True,
+    default=False,
+    help="Store the bytecode fingerprint of contracts whose code on chain matches the compiled one, and exit",
+)
+def cli(network, *, parallel: bool, scope: tuple[str, ...], backfill: bool):
     print(f"Connected to {network}")
 
-    dm = DeploymentManager(ENV)
+    dm = DeploymentManager(ENV, scope=set(scope))
     dm.context.gas_func = gas_cost
 
+    if backfill:
+        dm.backfill_bytecode_keys()
+        return
+
     changes = set()
     # changes |= {
     #     # "configs.max_penalty_fee_weth",
@@ -36,6 +49,6 @@ def cli(network):
     #     # "common.nftx_marketplace_zap",
     # }
 
-    dm.deploy(changes, dryrun=True)
+    dm.deploy(changes, dryrun=True, parallel=parallel)
 
     print("Done")
@@ -1,22 +1,29 @@
 import copy
-import hashlib
 import json
 import logging
 import os
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from decimal import Decimal
 from pathlib import Path
+from threading import Lock
 
 import boto3
 import click
-from botocore.exceptions import ClientError
 from click.exceptions import BadParameter
-from vyper.cli.vyper_compile import compile_files
+
+from ._helpers.abi_registry import AbiRegistry, abi_cache_path, abi_key
+from ._helpers.compilation import iter_compiled_sources
+from ._helpers.dynamodb import DynamoWriter
+from ._helpers.manifest import PublishManifest, manifest_path, record_hashes, table_diff
 
 env = os.environ.get("ENV", "dev")
 collections_table = f"collections-{env}"
 pools_table = f"pool-configs-{env}"
 abis_table = f"abis-{env}"
-dynamodb = boto3.resource("dynamodb")
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -75,63 +82,23 @@ def write_content_to_file(filename: Path, data: str):
         f.write(data)
 
 
-def write_collections_to_dynamodb(data: dict):
-    """Write collections to dynamodb collections table"""
-    try:
-        table = dynamodb.Table(collections_table)
-
-        for collection_key, collection_data in data.items():
-            indexed_attrs = list(enumerate(collection_data.items()))
-            update_expr = ", ".join(f"#k{i}=:v{i}" for i, (k, v) in indexed_attrs)
-            attrs = {f"#k{i}": k for i, (k, v) in indexed_attrs}
-            values = {f":v{i}": dynamo_type(v) for i, (k, v) in indexed_attrs}
-
-            table.update_item(
-                Key={"collection_key": collection_key},
-                UpdateExpression=f"SET {update_expr}",
-                ExpressionAttributeNames=attrs,
-                ExpressionAttributeValues=values,
-            )
+TABLE_KEYS = {collections_table: "collection_key", pools_table: "pool_id", abis_table: "abi_key"}
 
-    except ClientError:
-        logger.exception("Error writing to collections table")
 
+def write_collections_to_dynamodb(writer: DynamoWriter, data: dict):
+    """Write collections to dynamodb collections table"""
+    items = {collection_key: dynamo_type(collection_data) for collection_key, collection_data in data.items()}
+    writer.update_items(collections_table, "collection_key", items)
 
-def write_pools_to_dynamodb(data: dict):
-    """Write pools to dynamodb pools table"""
-    try:
-        table = dynamodb.Table(pools_table)
-
-        for pool_id, pool_data in data["pools"].items():
-            indexed_attrs = list(enumerate(pool_data.items()))
-            update_expr = ", ".join(f"#k{i}=:v{i}" for i, (k, v) in indexed_attrs)
-            attrs = {f"#k{i}": k for i, (k, v) in indexed_attrs}
-            values = {f":v{i}": v for i, (k, v) in indexed_attrs}
-
-            table.update_item(
-                Key={"pool_id": pool_id},
-                UpdateExpression=f"SET {update_expr}",
-                ExpressionAttributeNames=attrs,
-                ExpressionAttributeValues=values,
-            )
 
-    except ClientError:
-        logger.exception("Error writing to pools table")
+def write_pools_to_dynamodb(writer: DynamoWriter, data: dict):
+    """Write pools to dynamodb pools table"""
+    writer.update_items(pools_table, "pool_id", data)
 
 
-def write_abis_to_dynamodb(data: dict):
+def write_abis_to_dynamodb(writer: DynamoWriter, data: dict):
     """Write abis to dynamodb abis table"""
-    try:
-        table = dynamodb.Table(abis_table)
-
-        for abi_key, abi in data.items():
-            table.update_item(
-                Key={"abi_key": abi_key},
-                UpdateExpression="SET abi=:v",
-                ExpressionAttributeValues={":v": abi},
-            )
-    except ClientError:
-        logger.exception("Error writing to abis table")
+    writer.put_items(abis_table, [{"abi_key": abi_key} | item for abi_key, item in data.items()])
 
 
 def dynamo_type(val):
@@ -142,15 +109,10 @@ def dynamo_type(val):
     return val
 
 
-def abi_key(abi: list) -> str:
-    json_dump = json.dumps(abi, sort_keys=True)
-    _hash = hashlib.sha1(json_dump.encode("utf8"))
-    return _hash.hexdigest()
-
-
 def normalized_pool_configs(pools, abis):
     pools = copy.deepcopy(pools)
     common = pools.get("common", {})
+    abi_keys = {contract_def: abi_key(abi) for contract_def, abi in abis.items()}
 
     for pool_id, pool_config in pools["pools"].items():
         contracts = pool_config["contracts"]
@@ -177,12 +139,13 @@ def normalized_pool_configs(pools, abis):
                 continue
 
             contract_def = contract.get("contract_def")
-            if contract_def and contract_def in abis:
-                contract["abi_key"] = abi_key(abis[contract_def])
+            if contract_def and contract_def in abi_keys:
+                contract["abi_key"] = abi_keys[contract_def]
             else:
                 logger.warning(f"no abi found for {pool_id=} {contract_key=} {contract_def=}")  # noqa: G004
 
             contract.pop("abi", None)
+            contract.pop("bytecode_key", None)
             contract.pop("properties", None)
             contract.pop("alias", None)
 
@@ -190,6 +153,86 @@ def normalized_pool_configs(pools, abis):
     return {"pools": pools["pools"]}
 
 
+class StageTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: dict[str, list[float]] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                stage = self.stages.setdefault(name, [start, end, 0.0])
+                stage[0], stage[1], stage[2] = min(stage[0], start), max(stage[1], end), stage[2] + end - start
+
+    def report(self):
+        # stages overlap, busy is the time spent in the stage and span is from its first start to its last end
+        for name, (start, end, busy) in self.stages.items():
+            logger.info(
+                f"{name:<24} busy {busy:8.2f}s  span {start - self.start:8.2f}s - {end - self.start:8.2f}s"  # noqa: G004
+            )
+        logger.info(f"{'total':<24} {time.perf_counter() - self.start:8.2f}s")  # noqa: G004
+
+
+class DynamoPublisher:
+    """Write records that differ from the last publish to dynamodb, each table in the background as soon as it's ready"""
+
+    def __init__(self, timings: StageTimings, *, dry_run: bool, force: bool, refresh: bool = False):
+        self.timings = timings
+        self.dry_run = dry_run
+        self.force = force
+        self.refresh = refresh
+        self.writer = DynamoWriter(boto3.resource("dynamodb"))
+        self.manifest = PublishManifest.load(manifest_path(env))
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.futures: list[Future] = []
+
+    def submit(self, table: str, records: dict, write_func: Callable[[DynamoWriter, dict], None]):
+        self.futures.append(self.executor.submit(self._publish, table, records, write_func))
+
+    def _published(self, table: str) -> dict[str, dict[str, str]]:
+        if self.force:
+            return {}
+        published = None if self.refresh else self.manifest.published(table)
+        if published is None:
+            # tables without a manifest yet, or refreshed, are read once to rebuild it
+            with self.timings.stage(f"read {table}"):
+                items = self.writer.read_items(table, TABLE_KEYS[table])
+            published = {key: record_hashes(item) for key, item in items.items()}
+            self.manifest.replace(table, published)
+        return published
+
+    def _publish(self, table: str, records: dict, write_func: Callable[[DynamoWriter, dict], None]) -> tuple:
+        # only the changed attributes of each record are written
+        diff = table_diff(self._published(table), records)
+        if not self.dry_run and diff.updates():
+            with self.timings.stage(f"upload {table}"):
+                write_func(self.writer, diff.updates())
+            # a table with failed writes isn't recorded, so its records are compared and written again by the next publish
+            if not self.writer.failed(table):
+                self.manifest.record(table, diff.updates())
+        return table, diff
+
+    def wait(self):
+        for future in self.futures:
+            table, diff = future.result()
+            for line in diff.summary():
+                logger.info(f"{table}: {line}")  # noqa: G004
+        self.executor.shutdown()
+        self.manifest.save()
+        if self.dry_run:
+            return
+
+        self.writer.report()
+        if self.writer.failed():
+            raise click.ClickException(f"{self.writer.failed()} items failed to be written to dynamodb")
+
+
 @click.command()
 @click.option(
     "--write-to-cloud",
@@ -205,62 +248,80 @@ def normalized_pool_configs(pools, abis):
     default="",
     help="Default output directory for files",
 )
-def cli(*, write_to_cloud: bool = False, output_directory: str = ""):
+@click.option("--dry-run", "dry_run", is_flag=True, default=False, help="Show what would be published and exit")
+@click.option(
+    "--force", is_flag=True, default=False, help="Publish every record, even the ones matching what was last published"
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="Compare against the content of the tables instead of the last publish manifest, eg after editing them by hand",
+)
+def cli(
+    *,
+    write_to_cloud: bool = False,
+    output_directory: str = "",
+    dry_run: bool = False,
+    force: bool = False,
+    refresh: bool = False,
+):
     """Build contract (abi and bytecode) files and write to cloud or local directory"""
 
+    timings = StageTimings()
+
     # vyper contracts base location
     project_path = Path.cwd() / "contracts"
     output_directory = Path(output_directory)
-    if write_to_cloud and env == "local":
+    if write_to_cloud and env == "local" and not dry_run:
         raise BadParameter("Cannot write to cloud in local environment")
 
     # get contract addresses config file
     pools = json.loads(read_file(Path.cwd() / "configs" / env / "pools.json"))
     nfts = json.loads(read_file(Path.cwd() / "configs" / env / "collections.json"))
 
-    if not write_to_cloud:
-        # Check if directory exists and if not create it
-        Path(f"{output_directory}/abi").mkdir(parents=True, exist_ok=True)
-        Path(f"{output_directory}/bytecode").mkdir(parents=True, exist_ok=True)
+    # collections don't depend on compilation, so they are published while compiling
+    publisher = DynamoPublisher(timings, dry_run=dry_run, force=force, refresh=refresh) if write_to_cloud or dry_run else None
+    if publisher is not None:
+        publisher.submit(collections_table, nfts, write_collections_to_dynamodb)
 
     logger.info("Compiling contract files")
-    compiled_contracts = {
-        contract_def: compiled
-        for contract_def, path in contract_def_to_path.items()
-        for compiled in compile_files(
-            [project_path / f"{path}.vy"], output_formats=["abi_python", "bytecode"], root_folder="."
-        ).values()
-    }
-
-    abis = {k: v["abi"] for k, v in compiled_contracts.items()}
-    bytecodes = {k: v["bytecode"] for k, v in compiled_contracts.items()}
-    abis_by_key = {abi_key(abi): abi for abi in abis.values()}
-
-    # write individual abi and bytecode files
-    if not write_to_cloud:
-        logger.info("Publishing abi and bytecode files")
-        for contract_def in contract_def_to_path:
-            abi_path = Path(output_directory) / "abi" / f"{contract_def}.json"
-            binary_path = Path(output_directory) / "bytecode" / f"{contract_def}.bin"
-
-            write_content_to_file(abi_path, json.dumps(abis[contract_def]))
-            write_content_to_file(binary_path, bytecodes[contract_def])
+    contract_defs_by_path = defaultdict(list)
+    for contract_def, path in contract_def_to_path.items():
+        contract_defs_by_path[project_path / f"{path}.vy"].append(contract_def)
+
+    # abi files are written to the output directory with the local files, otherwise kept in the shared cache
+    abi_registry = AbiRegistry(abi_cache_path() if publisher is not None else output_directory / "abi")
+    abis, bytecodes = {}, {}
+    with timings.stage("compile"):
+        for path, compiled in iter_compiled_sources(list(contract_defs_by_path), Path.cwd()):
+            for contract_def in contract_defs_by_path[path]:
+                abis[contract_def] = compiled["abi"]
+                bytecodes[contract_def] = compiled["bytecode"]
+                abi_registry.add(contract_def, compiled["abi"])
 
     # add abis and abi_keys to pool contracts
-    pools = normalized_pool_configs(pools, abis)
-
-    # write collections and pools files and push to dynamo tables
-
-    if write_to_cloud:
-        logger.info("Publishing collections and pools to dynamodb")
-        write_collections_to_dynamodb(nfts)
-        write_pools_to_dynamodb(pools)
-
-        logger.info("Publishing abis to dynamodb")
-        write_abis_to_dynamodb(abis_by_key)
-
-    else:
-        write_content_to_file(output_directory / "pools.json", json.dumps(pools, indent=2, sort_keys=True))
-        write_content_to_file(output_directory / "collections.json", json.dumps(nfts, indent=2, sort_keys=True))
-
+    with timings.stage("normalize pools"):
+        pools = normalized_pool_configs(pools, abis)
+
+    if publisher is not None:
+        # every abi in a single submission, so they are written in full batches
+        abi_records = {key: {"abi": abi} for key, abi in abi_registry.abis.items()}
+        publisher.submit(abis_table, abi_records, write_abis_to_dynamodb)
+        publisher.submit(pools_table, pools["pools"], write_pools_to_dynamodb)
+        publisher.wait()
+
+    elif not dry_run:
+        # write content addressed abi files, individual bytecode files and collections and pools files
+        logger.info("Publishing abi and bytecode files")
+        with timings.stage("write files"):
+            Path(f"{output_directory}/bytecode").mkdir(parents=True, exist_ok=True)
+            for contract_def in contract_def_to_path:
+                binary_path = Path(output_directory) / "bytecode" / f"{contract_def}.bin"
+                write_content_to_file(binary_path, bytecodes[contract_def])
+            write_content_to_file(output_directory / "pools.json", json.dumps(pools, indent=2, sort_keys=True))
+            write_content_to_file(output_directory / "collections.json", json.dumps(nfts, indent=2, sort_keys=True))
+
+    abi_registry.save()
+    timings.report()
     logger.info("Done")
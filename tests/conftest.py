@@ -0,0 +1,8 @@
+from .conftest_base import warm_compile_cache
+
+
+def pytest_configure(config):
+    # with xdist, compile every contract once in the controller before the workers start, so that they all load the
+    # compiled artifacts from the shared cache instead of compiling them again each
+    if not hasattr(config, "workerinput") and config.getoption("numprocesses", None):
+        warm_compile_cache()
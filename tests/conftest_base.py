@@ -1,53 +1,164 @@
+import contextlib
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
+from importlib.metadata import version
 from itertools import starmap
+from pathlib import Path
+from weakref import WeakKeyDictionary, ref
 
 import boa
 import pytest
 import vyper
+from boa.contracts.vyper.compiler_utils import anchor_compiler_settings
 from boa.contracts.vyper.event import Event, RawEvent
-from boa.contracts.vyper.vyper_contract import VyperContract
+from boa.contracts.vyper.vyper_contract import VyperContract, VyperDeployer
+from vyper.cli.vyper_compile import get_interface_codes
+from vyper.compiler.phases import CompilerData
 from web3 import Web3
 
-# boa.interpret.set_cache_dir(cache_dir=".cache/titanoboa")  # noqa: ERA001
-
+from scripts._helpers.compilation import source_key  # noqa: PLC2701
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
+COMPILE_CACHE_DIR = Path(".cache/compiled-contracts")
+CONTRACT_SOURCES = ["contracts/**/*.vy", "tests/stubs/*.vy"]
+
+
+def _compiler_data(path: Path) -> CompilerData:
+    source_code = path.read_text(encoding="utf8")
+    interface_codes = get_interface_codes(Path(), {str(path): source_code})[str(path)]
+    data = CompilerData(source_code, str(path), interface_codes=interface_codes)
+    with anchor_compiler_settings(data):
+        _ = data.bytecode, data.bytecode_runtime
+    return data
+
+
+def compiled_key(path: Path) -> str:
+    # pickled CompilerData is only valid for the boa and vyper versions that produced it
+    versions = f"titanoboa=={version('titanoboa')} vyper=={vyper.__version__}"
+    return hashlib.sha256(f"{source_key(path, Path.cwd())} {versions}".encode()).hexdigest()
+
+
+def _cached_compiler_data(path: Path) -> CompilerData:
+    # unlike boa's own cache, the key covers the imported interfaces, and files are replaced atomically so that
+    # concurrent workers never read a partial artifact
+    cache_file = COMPILE_CACHE_DIR / f"{compiled_key(path)}.pickle"
+    with contextlib.suppress(FileNotFoundError):
+        return pickle.loads(cache_file.read_bytes())
+    data = _compiler_data(path)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp_file.write_bytes(pickle.dumps(data))
+    tmp_file.replace(cache_file)
+    return data
+
+
+def load_partial(filename: str) -> VyperDeployer:
+    return VyperDeployer(_cached_compiler_data(Path(filename)), filename=filename)
+
+
+def _warm(path: Path):
+    # sources failing to compile are reported by the tests loading them
+    with contextlib.suppress(Exception):
+        _cached_compiler_data(path)
+
+
+def warm_compile_cache(max_workers: int | None = None):
+    paths = sorted(p for pattern in CONTRACT_SOURCES for p in Path().glob(pattern))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_warm, paths))
+
 
 def get_last_event(contract: VyperContract, name: str | None = None):
-    matching_events = [e for e in contract.get_logs() if isinstance(e, Event) and (name is None or name == e.event_type.name)]
-    return EventWrapper(matching_events[-1])
+    return event_store(contract).events(name)[-1]
 
 
-def get_events(contract: VyperContract, name: str | None = None):
-    return [
-        EventWrapper(e) for e in contract.get_logs() if isinstance(e, Event) and (name is None or name == e.event_type.name)
-    ]
+def get_events(contract: VyperContract, name: str | None = None, **filters):
+    return event_store(contract).events(name, **filters)
+
+
+# logs of the last transaction of a contract, indexed by event name from the topic hash alone so that only the events a
+# test asks for get decoded. Decoded events are kept until the contract runs another transaction
+class EventStore:
+    def __init__(self, contract: VyperContract):
+        # the store is the value of a weak-keyed dict, a strong reference would keep its contract alive
+        self._contract = ref(contract)
+        self._computation = None
+        self._entries = []
+        self._by_name: dict[str, list[int]] = {}
+        self._decoded: dict[int, EventWrapper] = {}
+
+    @property
+    def contract(self) -> VyperContract:
+        return self._contract()
+
+    def _index(self):
+        computation = self.contract._computation
+        if computation is self._computation:
+            return
+        self._computation = computation
+        self._entries = sorted(computation.get_raw_log_entries()) if computation is not None else []
+        self._by_name = {}
+        self._decoded = {}
+        for i, (_, address, topics, _) in enumerate(self._entries):
+            logger = self.contract.env.lookup_contract(address)
+            event_type = getattr(logger, "event_for", {}).get(topics[0]) if topics else None
+            if event_type is not None:
+                self._by_name.setdefault(event_type.name, []).append(i)
+
+    def _event(self, i: int) -> "EventWrapper":
+        if i not in self._decoded:
+            entry = self._entries[i]
+            self._decoded[i] = EventWrapper(self.contract.env.lookup_contract(entry[1]).decode_log(entry))
+        return self._decoded[i]
+
+    def events(self, name: str | None = None, **filters) -> list["EventWrapper"]:
+        self._index()
+        indices = self._by_name.get(name, []) if name is not None else sorted(i for v in self._by_name.values() for i in v)
+        events = (self._event(i) for i in indices)
+        return [e for e in events if all(getattr(e, k) == v for k, v in filters.items())]
+
+
+_event_stores: WeakKeyDictionary[VyperContract, EventStore] = WeakKeyDictionary()
+
+
+def event_store(contract: VyperContract) -> EventStore:
+    if contract not in _event_stores:
+        _event_stores[contract] = EventStore(contract)
+    return _event_stores[contract]
 
 
 class EventWrapper:
     def __init__(self, event: Event):
         self.event = event
         self.event_name = event.event_type.name
+        self._formatted = {}
 
     def __getattr__(self, name):
-        if name in self.args_dict:
-            return self.args_dict[name]
-        raise AttributeError(f"No attr {name} in {self.event_name}. Event data is {self.event}")
+        if name.startswith("__") or name not in self._raw_args:
+            raise AttributeError(f"No attr {name} in {self.event_name}. Event data is {self.event}")
+        if name not in self._formatted:
+            self._formatted[name] = self._format_value(self._raw_args[name], self.event.event_type.arguments[name])
+        return self._formatted[name]
 
     @cached_property
-    def args_dict(self):
-        print(f"{self.event=} {self.event.event_type.arguments=}")
-        args = self.event.event_type.arguments.keys()
-        indexed = self.event.event_type.indexed
-        topic_values = (v for v in self.event.topics)
-        args_values = (v for v in self.event.args)
-        _args = [(arg, next(topic_values) if indexed[i] else next(args_values)) for i, arg in enumerate(args)]
+    def _raw_args(self):
+        topic_values = iter(self.event.topics)
+        args_values = iter(self.event.args)
+        return {
+            arg: next(topic_values) if indexed else next(args_values)
+            for arg, indexed in zip(self.event.event_type.arguments, self.event.event_type.indexed)
+        }
 
-        return {k: self._format_value(v, self.event.event_type.arguments[k]) for k, v in _args}
+    @cached_property
+    def args_dict(self):
+        return {k: getattr(self, k) for k in self._raw_args}
 
-    def _format_value(self, v, _type):  # noqa: PLR6301
-        print(f"_format_value {v=} {_type=} {type(v).__name__=} {type(_type)=}")
+    @staticmethod
+    def _format_value(v, _type):
         if isinstance(_type, vyper.semantics.types.primitives.AddressT):
             return Web3.to_checksum_address(v)
         if isinstance(_type, vyper.semantics.types.primitives.BytesT):
@@ -59,7 +170,6 @@ class EventWrapper:
 def checksummed(obj, vyper_type=None):
     if vyper_type is None and hasattr(obj, "_vyper_type"):
         vyper_type = obj._vyper_type
-    print(f"checksummed {obj=} {vyper_type=} {type(obj).__name__=} {type(vyper_type)=}")
 
     if isinstance(vyper_type, vyper.codegen.types.types.DArrayType):
         return [checksummed(x, vyper_type.subtype) for x in obj]
@@ -7,7 +7,8 @@ from boa.environment import Env
 from eth_account import Account
 from web3 import Web3
 
-from ..conftest_base import ZERO_ADDRESS, get_last_event
+from ..conftest_base import ZERO_ADDRESS, get_last_event, load_partial
+from .fork_state import fork_state_rpc
 
 LOAN_AMOUNT = Web3.to_wei(0.1, "ether")
 
@@ -48,115 +49,115 @@ def boa_rawevent_patch():
 
 @pytest.fixture(scope="session")
 def erc20_contract_def():
-    return boa.load_partial("tests/stubs/ERC20.vy")
+    return load_partial("tests/stubs/ERC20.vy")
 
 
 @pytest.fixture(scope="session")
 def erc721_contract_def():
-    return boa.load_partial("contracts/auxiliary/token/ERC721.vy")
+    return load_partial("contracts/auxiliary/token/ERC721.vy")
 
 
 @pytest.fixture(scope="session")
 def cryptopunks_market_contract_def():
-    return boa.load_partial("tests/stubs/CryptoPunksMarketStub.vy")
+    return load_partial("tests/stubs/CryptoPunksMarketStub.vy")
 
 
 @pytest.fixture(scope="session")
 def wpunks_contract_def():
-    return boa.load_partial("tests/stubs/WrappedPunkStub.vy")
+    return load_partial("tests/stubs/WrappedPunkStub.vy")
 
 
 @pytest.fixture(scope="session")
 def delegation_registry_contract_def():
-    return boa.load_partial("contracts/auxiliary/delegate/DelegationRegistryMock.vy")
+    return load_partial("contracts/auxiliary/delegate/DelegationRegistryMock.vy")
 
 
 @pytest.fixture(scope="session")
 def genesis_contract_def():
-    return boa.load_partial("contracts/GenesisPass.vy")
+    return load_partial("contracts/GenesisPass.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_core_contract_def():
-    return boa.load_partial("contracts/CollateralVaultCoreV2.vy")
+    return load_partial("contracts/CollateralVaultCoreV2.vy")
 
 
 @pytest.fixture(scope="session")
 def cryptopunks_vault_core_contract_def():
-    return boa.load_partial("contracts/CryptoPunksVaultCore.vy")
+    return load_partial("contracts/CryptoPunksVaultCore.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_peripheral_contract_def():
-    return boa.load_partial("contracts/CollateralVaultPeripheral.vy")
+    return load_partial("contracts/CollateralVaultPeripheral.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_otc_contract_def():
-    return boa.load_partial("contracts/CollateralVaultOTC.vy")
+    return load_partial("contracts/CollateralVaultOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def lending_pool_core_contract_def():
-    return boa.load_partial("contracts/LendingPoolCore.vy")
+    return load_partial("contracts/LendingPoolCore.vy")
 
 
 @pytest.fixture(scope="session")
 def lending_pool_lock_contract_def():
-    return boa.load_partial("contracts/LendingPoolLock.vy")
+    return load_partial("contracts/LendingPoolLock.vy")
 
 
 @pytest.fixture(scope="session")
 def lending_pool_peripheral_contract_def():
-    return boa.load_partial("contracts/LendingPoolPeripheral.vy")
+    return load_partial("contracts/LendingPoolPeripheral.vy")
 
 
 @pytest.fixture(scope="session")
 def lending_pool_eth_otc_contract_def():
-    return boa.load_partial("contracts/LendingPoolEthOTC.vy")
+    return load_partial("contracts/LendingPoolEthOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def lending_pool_erc20_otc_contract_def():
-    return boa.load_partial("contracts/LendingPoolERC20OTC.vy")
+    return load_partial("contracts/LendingPoolERC20OTC.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_core_contract_def():
-    return boa.load_partial("contracts/LoansCore.vy")
+    return load_partial("contracts/LoansCore.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_peripheral_contract_def():
-    return boa.load_partial("contracts/Loans.vy")
+    return load_partial("contracts/Loans.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_otc_contract_def():
-    return boa.load_partial("contracts/LoansOTC.vy")
+    return load_partial("contracts/LoansOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_core_contract_def():
-    return boa.load_partial("contracts/LiquidationsCore.vy")
+    return load_partial("contracts/LiquidationsCore.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_peripheral_contract_def():
-    return boa.load_partial("contracts/LiquidationsPeripheral.vy")
+    return load_partial("contracts/LiquidationsPeripheral.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_otc_contract_def():
-    return boa.load_partial("contracts/LiquidationsOTC.vy")
+    return load_partial("contracts/LiquidationsOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidity_controls_contract_def():
-    return boa.load_partial("contracts/LiquidityControls.vy")
+    return load_partial("contracts/LiquidityControls.vy")
 
 
-@pytest.fixture(scope="module", autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def forked_env():
     old_env = boa.env
     new_env = Env()
@@ -165,11 +166,12 @@ def forked_env():
     new_env._profiled_contracts = old_env._profiled_contracts
 
     with boa.swap_env(new_env):
-        fork_uri = os.environ["BOA_FORK_RPC_URL"]
-        disable_cache = os.environ.get("BOA_FORK_NO_CACHE")
-        kw = {"cache_file": None} if disable_cache else {}
         blkid = 19820759
-        boa.env.fork(fork_uri, block_identifier=blkid, **kw)
+        if os.environ.get("BOA_FORK_NO_CACHE"):
+            boa.env.fork(os.environ["BOA_FORK_RPC_URL"], block_identifier=blkid, cache_file=None)
+        else:
+            # replayed from the recorded fork state, only what's missing is fetched from BOA_FORK_RPC_URL and recorded
+            boa.env.fork_rpc(fork_state_rpc(blkid), block_identifier=blkid, cache_file=None)
         yield
 
         old_env._cached_call_profiles = new_env._cached_call_profiles
@@ -177,7 +179,7 @@ def forked_env():
         old_env._profiled_contracts = new_env._profiled_contracts
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def accounts(forked_env):
     _accounts = [boa.env.generate_address() for _ in range(10)]
     for account in _accounts:
@@ -185,44 +187,44 @@ def accounts(forked_env):
     return _accounts
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def owner_account(forked_env):
     return Account.create()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def not_owner_account(forked_env):
     return Account.create()
 
 
-@pytest.fixture(scope="module", autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def contract_owner(accounts, owner_account):
     boa.env.eoa = owner_account.address
     boa.env.set_balance(owner_account.address, 10**21)
     return owner_account.address
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def not_contract_owner(not_owner_account):
     return not_owner_account.address
 
 
-@pytest.fixture(scope="module")  # noqa: FURB118
+@pytest.fixture(scope="session")  # noqa: FURB118
 def investor(accounts):
     return accounts[1]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def borrower(accounts):
     yield accounts[2]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def protocol_wallet(accounts):
     yield accounts[3]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def erc20_contract(contract_owner, accounts, erc20_contract_def):
     erc20 = erc20_contract_def.at("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
     for account in accounts:
@@ -231,7 +233,7 @@ def erc20_contract(contract_owner, accounts, erc20_contract_def):
     return erc20
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_contract(contract_owner, accounts, erc20_contract_def):
     erc20 = erc20_contract_def.at("0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48")
     holder = "0x99C9fc46f92E8a1c0deC1b1747d010903E884bE1"
@@ -242,49 +244,49 @@ def usdc_contract(contract_owner, accounts, erc20_contract_def):
     return erc20
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def erc721_contract(contract_owner, erc721_contract_def):
     with boa.env.prank(contract_owner):
         return erc721_contract_def.deploy()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cryptopunks_market_contract(contract_owner, cryptopunks_market_contract_def):
     return cryptopunks_market_contract_def.at("0xb47e3cd837dDF8e4c57F05d70Ab865de6e193BBB")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def wpunks_contract(contract_owner, wpunks_contract_def):
     return wpunks_contract_def.at("0xb7F7F6C52F2e2fdb1963Eab30438024864c313F6")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def hashmasks_contract(contract_owner, erc721_contract_def):
     return erc721_contract_def.at("0xC2C747E0F7004F9E8817Db2ca4997657a7746928")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def otherdeed_for_otherside_contract(contract_owner, erc721_contract_def):
     return erc721_contract_def.at("0x34d85c9CDeB23FA97cb08333b511ac86E1C4E258")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def delegation_registry_contract(contract_owner, delegation_registry_contract_def):
     return delegation_registry_contract_def.at("0x00000000000076A84feF008CDAbe6409d2FE638B")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def genesis_contract(contract_owner, genesis_contract_def):
     return genesis_contract_def.deploy(contract_owner)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def collateral_vault_core_contract(contract_owner, delegation_registry_contract, collateral_vault_core_contract_def):
     with boa.env.prank(contract_owner):
         return collateral_vault_core_contract_def.deploy(delegation_registry_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cryptopunks_vault_core_contract(
     cryptopunks_market_contract, delegation_registry_contract, cryptopunks_vault_core_contract_def
 ):
@@ -293,22 +295,22 @@ def cryptopunks_vault_core_contract(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def collateral_vault_peripheral_contract(collateral_vault_core_contract, collateral_vault_peripheral_contract_def):
     return collateral_vault_peripheral_contract_def.deploy(collateral_vault_core_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def lending_pool_core_contract(erc20_contract, lending_pool_core_contract_def):
     return lending_pool_core_contract_def.deploy(erc20_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def lending_pool_lock_contract(erc20_contract, lending_pool_lock_contract_def):
     return lending_pool_lock_contract_def.deploy(erc20_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def lending_pool_peripheral_contract(
     lending_pool_core_contract,
     lending_pool_lock_contract,
@@ -327,17 +329,17 @@ def lending_pool_peripheral_contract(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_lending_pool_core_contract(usdc_contract, lending_pool_core_contract_def):
     return lending_pool_core_contract_def.deploy(usdc_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_lending_pool_lock_contract(usdc_contract, lending_pool_lock_contract_def):
     return lending_pool_lock_contract_def.deploy(usdc_contract)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_lending_pool_peripheral_contract(
     usdc_lending_pool_core_contract,
     usdc_lending_pool_lock_contract,
@@ -356,7 +358,7 @@ def usdc_lending_pool_peripheral_contract(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def lending_pool_peripheral_contract_aux(
     lending_pool_core_contract,
     lending_pool_lock_contract,
@@ -375,12 +377,12 @@ def lending_pool_peripheral_contract_aux(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def loans_core_contract(loans_core_contract_def):
     return loans_core_contract_def.deploy()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def loans_peripheral_contract(
     loans_core_contract,
     lending_pool_peripheral_contract,
@@ -398,12 +400,12 @@ def loans_peripheral_contract(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_loans_core_contract(loans_core_contract_def):
     return loans_core_contract_def.deploy()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_loans_peripheral_contract(
     usdc_loans_core_contract,
     usdc_lending_pool_peripheral_contract,
@@ -421,12 +423,12 @@ def usdc_loans_peripheral_contract(
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def liquidations_core_contract(liquidations_core_contract_def):
     return liquidations_core_contract_def.deploy()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def liquidations_peripheral_contract(liquidations_core_contract, erc20_contract, liquidations_peripheral_contract_def):
     liquidations_peripheral_contract = liquidations_peripheral_contract_def.deploy(
         liquidations_core_contract,
@@ -441,7 +443,7 @@ def liquidations_peripheral_contract(liquidations_core_contract, erc20_contract,
     return liquidations_peripheral_contract
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def liquidity_controls_contract(liquidity_controls_contract_def):
     return liquidity_controls_contract_def.deploy(
         False,
@@ -454,7 +456,7 @@ def liquidity_controls_contract(liquidity_controls_contract_def):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_liquidity_controls_contract(liquidity_controls_contract_def):
     return liquidity_controls_contract_def.deploy(
         False,
@@ -467,12 +469,12 @@ def usdc_liquidity_controls_contract(liquidity_controls_contract_def):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def test_collaterals(erc721_contract):
     return [(erc721_contract.address, k, LOAN_AMOUNT // 5) for k in range(5)]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cryptopunk_collaterals(cryptopunks_market_contract, borrower):
     result = []
     for k in range(5):
@@ -572,3 +574,57 @@ def usdc_contracts_config(
     usdc_loans_core_contract.setLoansPeripheral(usdc_loans_peripheral_contract, sender=contract_owner)
     usdc_loans_peripheral_contract.setLiquidationsPeripheralAddress(liquidations_peripheral_contract, sender=contract_owner)
     usdc_loans_peripheral_contract.setLiquidityControlsAddress(usdc_liquidity_controls_contract, sender=contract_owner)
+
+
+@pytest.fixture(scope="session")
+def protocol_snapshot(
+    collateral_vault_core_contract,
+    collateral_vault_peripheral_contract,
+    cryptopunks_vault_core_contract,
+    lending_pool_core_contract,
+    lending_pool_lock_contract,
+    lending_pool_peripheral_contract,
+    lending_pool_peripheral_contract_aux,
+    usdc_lending_pool_core_contract,
+    usdc_lending_pool_lock_contract,
+    usdc_lending_pool_peripheral_contract,
+    loans_core_contract,
+    loans_peripheral_contract,
+    usdc_loans_core_contract,
+    usdc_loans_peripheral_contract,
+    liquidations_core_contract,
+    liquidations_peripheral_contract,
+    liquidity_controls_contract,
+    usdc_liquidity_controls_contract,
+    erc20_contract,
+    usdc_contract,
+    wpunks_contract,
+    hashmasks_contract,
+    otherdeed_for_otherside_contract,
+    genesis_contract,
+    test_collaterals,
+    cryptopunk_collaterals,
+    not_contract_owner,
+    investor,
+    borrower,
+    protocol_wallet,
+):
+    # every session fixture changing the chain state is created here, before the first anchor is taken, as one created
+    # inside an anchor would be reverted while still cached. The contracts aren't wired together: modules request
+    # contracts_config or usdc_contracts_config, from their first test or from a given test on, and the wiring is
+    # reverted with the module
+    pass
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_snapshot(protocol_snapshot):
+    # reverts the state changed by the module fixtures, e.g. contracts_config or the otc contracts wired into the shared
+    # protocol
+    with boa.env.anchor():
+        yield
+
+
+@pytest.fixture(autouse=True)
+def revert_test_state(module_snapshot):
+    with boa.env.anchor():
+        yield
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from boa.rpc import RPC, EthereumRPC
+
+
+class ForkStateMissingError(Exception):
+    pass
+
+
+# on-disk store of every rpc response a fork needs, keyed by the hash of the request, so that a run recorded once against
+# an rpc can be replayed offline. Each response is its own file written atomically, so several workers can record and
+# replay concurrently
+class ForkStateStore:
+    def __init__(self, path: Path):
+        self.path = path
+
+    @staticmethod
+    def key(method: str, params) -> str:
+        request = json.dumps({"method": method, "params": params}, sort_keys=True)
+        return hashlib.sha256(request.encode("utf8")).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key[2:]}.json"
+
+    def get(self, method: str, params):
+        try:
+            return json.loads(self._file(self.key(method, params)).read_text(encoding="utf8"))
+        except FileNotFoundError:
+            raise ForkStateMissingError(
+                f"{method}({params}) isn't in the fork state at {self.path}, set BOA_FORK_RPC_URL to record it"
+            ) from None
+
+    def put(self, method: str, params, result):
+        file = self._file(self.key(method, params))
+        if file.exists():
+            return
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(result), encoding="utf8")
+        tmp_file.replace(file)
+
+
+# replays the fork state from the store, fetching and recording whatever is missing when an rpc is available
+class ForkStateRPC(RPC):
+    def __init__(self, store: ForkStateStore, rpc: EthereumRPC | None = None):
+        self.store = store
+        self._rpc = rpc
+
+    @property
+    def identifier(self) -> str:
+        return f"fork-state:{self.store.path}"
+
+    @property
+    def name(self) -> str:
+        return self._rpc.name if self._rpc else f"fork state at {self.store.path}"
+
+    def fetch(self, method: str, params):
+        (result,) = self.fetch_multi([(method, params)])
+        return result
+
+    def fetch_multi(self, payloads: list):
+        results = {}
+        missing = []
+        for i, (method, params) in enumerate(payloads):
+            try:
+                results[i] = self.store.get(method, params)
+            except ForkStateMissingError:
+                if self._rpc is None:
+                    raise
+                missing.append(i)
+
+        if missing:
+            fetched = self._rpc.fetch_multi([payloads[i] for i in missing])
+            for i, result in zip(missing, fetched):
+                self.store.put(*payloads[i], result)
+                results[i] = result
+
+        return [results[i] for i in range(len(payloads))]
+
+
+# tracked with the tests, recorded by `make fork-state`
+FORK_STATE_DIR = Path(__file__).parent / "fork-state"
+
+
+def fork_state_rpc(block_identifier: int) -> ForkStateRPC:
+    base_path = Path(os.environ.get("BOA_FORK_STATE_DIR", FORK_STATE_DIR))
+    # BOA_FORK_OFFLINE replays the recorded state only, even when an rpc is configured
+    rpc_url = None if os.environ.get("BOA_FORK_OFFLINE") else os.environ.get("BOA_FORK_RPC_URL")
+    return ForkStateRPC(ForkStateStore(base_path / str(block_identifier)), EthereumRPC(rpc_url) if rpc_url else None)
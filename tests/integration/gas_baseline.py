@@ -0,0 +1,47 @@
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+BASELINE_FILE = Path(__file__).parent / "gas_baseline.json"
+
+
+def updating_baseline() -> bool:
+    return bool(os.environ.get("UPDATE_GAS_BASELINE"))
+
+
+# committed gas used by each benchmarked path, a benchmark fails when it costs more than `threshold` over its baseline.
+# When UPDATE_GAS_BASELINE is set the measured values are written back instead
+@dataclass
+class GasBaseline:
+    path: Path
+    threshold: float
+    gas: dict[str, int]
+    measured: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "GasBaseline":
+        data = json.loads(path.read_text(encoding="utf8"))
+        return cls(path, data["threshold"], data["gas"])
+
+    def check(self, name: str, gas_used: int):
+        self.measured[name] = gas_used
+        if updating_baseline():
+            return
+        if name not in self.gas:
+            pytest.fail(f"no gas baseline for {name}, record it with `make gas-baseline`")
+
+        expected = self.gas[name]
+        assert gas_used <= expected * (
+            1 + self.threshold
+        ), f"{name} used {gas_used} gas, {gas_used / expected - 1:.2%} over its baseline of {expected}"
+
+    def save(self):
+        # merged with the file as it is now, so that runs recording different benchmarks don't drop each other's values
+        gas = self.load(self.path).gas | self.measured
+        content = {"threshold": self.threshold, "gas": dict(sorted(gas.items()))}
+        tmp_file = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(content, indent=2) + "\n", encoding="utf8")
+        tmp_file.replace(self.path)
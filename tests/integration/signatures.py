@@ -0,0 +1,94 @@
+import boa
+from eth_abi import encode
+from eth_account import Account
+from eth_account.messages import HexBytes, SignableMessage
+from eth_utils import keccak
+
+
+def create_signature(
+    *,
+    collaterals,
+    delegations,
+    amount,
+    interest,
+    maturity,
+    deadline,
+    nonce,
+    genesis_token,
+    borrower,
+    signer,
+    verifier,
+    domain_name="Zharta",
+    domain_version="1",
+    chain_id=None,
+):
+    # Can't use eth_account.messages.encode_structured_data (as of 0.5.9) because dynamic arrays are not correctly hashed:
+    # https://github.com/ethereum/eth-account/blob/v0.5.9/eth_account/_utils/structured_data/hashing.py#L236
+    # Probably fixed (https://github.com/ethereum/eth-account/commit/e6c3136bd30d2ec4738c2ca32329d2d119539f1a) so it can be
+    # used when brownie allows eth-account==0.7.0
+    domain_type_def = "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+    reserve_type_def = "ReserveMessageContent(address borrower,uint256 amount,uint256 interest,uint256 maturity,Collateral[] collaterals,bool delegations,uint256 deadline,uint256 nonce,uint256 genesisToken)"  # noqa: E501
+    collateral_type_def = "Collateral(address contractAddress,uint256 tokenId,uint256 amount)"
+
+    domain_type_hash = keccak(text=domain_type_def)
+    reserve_type_hash = keccak(text=reserve_type_def + collateral_type_def)
+    collateral_type_hash = keccak(text=collateral_type_def)
+
+    domain_instance = encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [
+            domain_type_hash,
+            keccak(text=domain_name),
+            keccak(text=domain_version),
+            chain_id if chain_id is not None else boa.env.evm.chain.chain_id,
+            verifier.address,
+        ],
+    )
+    domain_hash = keccak(domain_instance)
+
+    struct_instance = encode(
+        [
+            "bytes32",
+            "address",
+            "uint256",
+            "uint256",
+            "uint256",
+            "bytes32",
+            "bool",
+            "uint256",
+            "uint256",
+            "uint256",
+        ],
+        [
+            reserve_type_hash,
+            borrower,
+            amount,
+            interest,
+            maturity,
+            keccak(
+                encode(
+                    ["bytes32"] * len(collaterals),
+                    [
+                        keccak(
+                            encode(
+                                ["bytes32", "address", "uint256", "uint256"],
+                                [collateral_type_hash, c[0], c[1], int(c[2])],
+                            )
+                        )
+                        for c in collaterals
+                    ],
+                )
+            ),
+            delegations,
+            deadline,
+            nonce,
+            genesis_token,
+        ],
+    )
+
+    message_hash = keccak(struct_instance)
+    signed_message = Account.sign_message(
+        SignableMessage(HexBytes(b"\x01"), domain_hash, message_hash),
+        private_key=signer.key,
+    )
+    return (signed_message.v, signed_message.r, signed_message.s)
@@ -0,0 +1,425 @@
+import os
+
+import boa
+import pytest
+from web3 import Web3
+
+from .gas_baseline import BASELINE_FILE, GasBaseline, updating_baseline
+from .signatures import create_signature
+
+COLLATERAL_COUNTS = [1, 10, 100]
+
+MATURITY_PERIOD = 30 * 24 * 60 * 60
+VALIDATION_PERIOD = 30 * 60 * 60
+LOAN_AMOUNT = Web3.to_wei(0.1, "ether")
+LOAN_INTEREST = 250  # 2.5% in parts per 10000
+INTEREST_ACCRUAL_PERIOD = 24 * 60 * 60
+PROTOCOL_FEES_SHARE = 2500  # parts per 10000, e.g. 2.5% is 250 parts per 10000
+GRACE_PERIOD_DURATION = 5
+
+
+@pytest.fixture(scope="module")
+def gas_baseline():
+    # every worker would write the file, so the baseline is recorded in a single process
+    if updating_baseline() and os.environ.get("PYTEST_XDIST_WORKER"):
+        pytest.fail("record the gas baseline without xdist, with `make gas-baseline`")
+    baseline = GasBaseline.load(BASELINE_FILE)
+    yield baseline
+    if updating_baseline():
+        baseline.save()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(contracts_config):
+    pass
+
+
+@pytest.fixture(scope="module")
+def lending_pool_otc_contract(erc20_contract, lending_pool_eth_otc_contract_def, contract_owner, investor, protocol_wallet):
+    with boa.env.prank(contract_owner):
+        contract = lending_pool_eth_otc_contract_def.deploy(erc20_contract)
+        proxy_address = contract.create_proxy(protocol_wallet, PROTOCOL_FEES_SHARE, investor)
+        return lending_pool_eth_otc_contract_def.at(proxy_address)
+
+
+@pytest.fixture(scope="module")
+def collateral_vault_otc_contract(
+    collateral_vault_otc_contract_def, cryptopunks_market_contract, delegation_registry_contract, contract_owner
+):
+    with boa.env.prank(contract_owner):
+        contract = collateral_vault_otc_contract_def.deploy(cryptopunks_market_contract, delegation_registry_contract)
+        proxy_address = contract.create_proxy()
+        return collateral_vault_otc_contract_def.at(proxy_address)
+
+
+@pytest.fixture(scope="module")
+def loans_otc_contract(
+    loans_otc_contract_def, contract_owner, lending_pool_otc_contract, collateral_vault_otc_contract, genesis_contract
+):
+    with boa.env.prank(contract_owner):
+        contract = loans_otc_contract_def.deploy()
+        proxy_address = contract.create_proxy(
+            INTEREST_ACCRUAL_PERIOD, lending_pool_otc_contract, collateral_vault_otc_contract, genesis_contract, True
+        )
+        return loans_otc_contract_def.at(proxy_address)
+
+
+@pytest.fixture(scope="module")
+def liquidations_otc_contract(
+    liquidations_otc_contract_def, contract_owner, loans_otc_contract, lending_pool_otc_contract, collateral_vault_otc_contract
+):
+    with boa.env.prank(contract_owner):
+        contract = liquidations_otc_contract_def.deploy()
+        proxy_address = contract.create_proxy(
+            GRACE_PERIOD_DURATION, loans_otc_contract, lending_pool_otc_contract, collateral_vault_otc_contract
+        )
+        return liquidations_otc_contract_def.at(proxy_address)
+
+
+@pytest.fixture(scope="module")
+def otc_protocol(
+    lending_pool_otc_contract, liquidations_otc_contract, loans_otc_contract, collateral_vault_otc_contract, contract_owner
+):
+    with boa.env.prank(contract_owner):
+        lending_pool_otc_contract.setLoansPeripheralAddress(loans_otc_contract)
+        lending_pool_otc_contract.setLiquidationsPeripheralAddress(liquidations_otc_contract)
+        collateral_vault_otc_contract.setLiquidationsPeripheralAddress(liquidations_otc_contract)
+        collateral_vault_otc_contract.setLoansAddress(loans_otc_contract)
+        loans_otc_contract.setLiquidationsPeripheralAddress(liquidations_otc_contract)
+    return loans_otc_contract
+
+
+def gas_used(contract) -> int:
+    return contract._computation.net_gas_used
+
+
+def timestamp() -> int:
+    # the fork's block time, which unlike the wall clock doesn't change the gas used between runs
+    return boa.env.evm.patch.timestamp
+
+
+def borrower_collaterals(erc721_contract, vault, borrower, count: int) -> list[tuple]:
+    # minted by boa.env.eoa, the contract owner
+    for k in range(count):
+        erc721_contract.mint(borrower, k)
+    erc721_contract.setApprovalForAll(vault, True, sender=borrower)
+    return [(erc721_contract.address, k, LOAN_AMOUNT // count) for k in range(count)]
+
+
+def vault_collaterals(erc721_contract, vault, count: int) -> list[tuple]:
+    for k in range(count):
+        erc721_contract.mint(vault, k)
+    return [(erc721_contract.address, k, LOAN_AMOUNT // count) for k in range(count)]
+
+
+def reserve(loans_contract, owner_account, borrower, collaterals, *, method="reserveEth", maturity=None) -> int:
+    maturity = maturity or timestamp() + MATURITY_PERIOD
+    deadline = timestamp() + VALIDATION_PERIOD
+    v, r, s = create_signature(
+        collaterals=collaterals,
+        delegations=False,
+        amount=LOAN_AMOUNT,
+        interest=LOAN_INTEREST,
+        maturity=maturity,
+        deadline=deadline,
+        nonce=0,
+        genesis_token=0,
+        borrower=borrower,
+        signer=owner_account,
+        verifier=loans_contract,
+    )
+    return getattr(loans_contract, method)(
+        LOAN_AMOUNT, LOAN_INTEREST, maturity, collaterals, False, deadline, 0, 0, v, r, s, sender=borrower
+    )
+
+
+def defaulted_loan(loans_core_contract, loans_peripheral_contract, borrower, collaterals) -> int:
+    loans_address = loans_peripheral_contract.address
+    maturity = timestamp() + MATURITY_PERIOD
+    loan_id = loans_core_contract.addLoan(borrower, LOAN_AMOUNT, LOAN_INTEREST, maturity, collaterals, sender=loans_address)
+    loans_core_contract.updateLoanStarted(borrower, loan_id, sender=loans_address)
+    loans_core_contract.updateDefaultedLoan(borrower, loan_id, sender=loans_address)
+    return loan_id
+
+
+@pytest.mark.parametrize("method", ["reserve", "reserveEth"])
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_reserve(
+    gas_baseline,
+    loans_peripheral_contract,
+    lending_pool_peripheral_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    method,
+    collateral_count,
+):
+    lending_pool_peripheral_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_core_contract, borrower, collateral_count)
+
+    reserve(loans_peripheral_contract, owner_account, borrower, collaterals, method=method)
+
+    gas_baseline.check(f"Loans.{method}[{collateral_count}]", gas_used(loans_peripheral_contract))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_pay(
+    gas_baseline,
+    loans_peripheral_contract,
+    lending_pool_peripheral_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    collateral_count,
+):
+    lending_pool_peripheral_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_core_contract, borrower, collateral_count)
+    loan_id = reserve(loans_peripheral_contract, owner_account, borrower, collaterals)
+    boa.env.time_travel(seconds=14 * 86400)
+    payable_amount = loans_peripheral_contract.getLoanPayableAmount(borrower, loan_id, timestamp())
+
+    loans_peripheral_contract.pay(loan_id, sender=borrower, value=payable_amount)
+
+    gas_baseline.check(f"Loans.pay[{collateral_count}]", gas_used(loans_peripheral_contract))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_settle_default(
+    gas_baseline,
+    loans_peripheral_contract,
+    lending_pool_peripheral_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    collateral_count,
+):
+    lending_pool_peripheral_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_core_contract, borrower, collateral_count)
+    loan_id = reserve(loans_peripheral_contract, owner_account, borrower, collaterals, maturity=timestamp() + 10)
+    boa.env.time_travel(seconds=15)
+
+    loans_peripheral_contract.settleDefault(borrower, loan_id, sender=contract_owner)
+
+    gas_baseline.check(f"Loans.settleDefault[{collateral_count}]", gas_used(loans_peripheral_contract))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_otc_reserve_eth(
+    gas_baseline,
+    otc_protocol,
+    lending_pool_otc_contract,
+    collateral_vault_otc_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    collateral_count,
+):
+    lending_pool_otc_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_otc_contract, borrower, collateral_count)
+
+    reserve(otc_protocol, owner_account, borrower, collaterals)
+
+    gas_baseline.check(f"LoansOTC.reserveEth[{collateral_count}]", gas_used(otc_protocol))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_otc_pay(
+    gas_baseline,
+    otc_protocol,
+    lending_pool_otc_contract,
+    collateral_vault_otc_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    collateral_count,
+):
+    lending_pool_otc_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_otc_contract, borrower, collateral_count)
+    loan_id = reserve(otc_protocol, owner_account, borrower, collaterals)
+    boa.env.time_travel(seconds=14 * 86400)
+    payable_amount = otc_protocol.getLoanPayableAmount(borrower, loan_id, timestamp())
+
+    otc_protocol.pay(loan_id, sender=borrower, value=payable_amount)
+
+    gas_baseline.check(f"LoansOTC.pay[{collateral_count}]", gas_used(otc_protocol))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_loans_otc_settle_default(
+    gas_baseline,
+    otc_protocol,
+    lending_pool_otc_contract,
+    collateral_vault_otc_contract,
+    erc721_contract,
+    owner_account,
+    contract_owner,
+    investor,
+    borrower,
+    collateral_count,
+):
+    lending_pool_otc_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_otc_contract, borrower, collateral_count)
+    loan_id = reserve(otc_protocol, owner_account, borrower, collaterals, maturity=timestamp() + 10)
+    boa.env.time_travel(seconds=15)
+
+    otc_protocol.settleDefault(borrower, loan_id, sender=contract_owner)
+
+    gas_baseline.check(f"LoansOTC.settleDefault[{collateral_count}]", gas_used(otc_protocol))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_liquidations_add_liquidation(
+    gas_baseline,
+    liquidations_peripheral_contract,
+    loans_peripheral_contract,
+    loans_core_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    erc20_contract,
+    contract_owner,
+    borrower,
+    collateral_count,
+):
+    collaterals = vault_collaterals(erc721_contract, collateral_vault_core_contract, collateral_count)
+    loan_id = defaulted_loan(loans_core_contract, loans_peripheral_contract, borrower, collaterals)
+
+    liquidations_peripheral_contract.addLiquidation(borrower, loan_id, erc20_contract)
+
+    gas_baseline.check(
+        f"LiquidationsPeripheral.addLiquidation[{collateral_count}]", gas_used(liquidations_peripheral_contract)
+    )
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_liquidations_pay_grace_period(
+    gas_baseline,
+    liquidations_peripheral_contract,
+    loans_peripheral_contract,
+    loans_core_contract,
+    lending_pool_peripheral_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    erc20_contract,
+    contract_owner,
+    borrower,
+    collateral_count,
+):
+    collaterals = vault_collaterals(erc721_contract, collateral_vault_core_contract, collateral_count)
+    lending_pool_peripheral_contract.depositEth(sender=contract_owner, value=LOAN_AMOUNT * 2)
+    lending_pool_peripheral_contract.sendFundsEth(contract_owner, LOAN_AMOUNT, sender=loans_peripheral_contract.address)
+    loan_id = defaulted_loan(loans_core_contract, loans_peripheral_contract, borrower, collaterals)
+    liquidations_peripheral_contract.addLiquidation(borrower, loan_id, erc20_contract)
+    grace_period_price = sum(liquidations_peripheral_contract.getLiquidation(c[0], c[1])[9] for c in collaterals)
+
+    liquidations_peripheral_contract.payLoanLiquidationsGracePeriod(
+        loan_id, erc20_contract, sender=borrower, value=grace_period_price
+    )
+
+    gas_baseline.check(
+        f"LiquidationsPeripheral.payLoanLiquidationsGracePeriod[{collateral_count}]",
+        gas_used(liquidations_peripheral_contract),
+    )
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_liquidations_buy_nft_lender_period(
+    gas_baseline,
+    liquidations_peripheral_contract,
+    loans_peripheral_contract,
+    loans_core_contract,
+    lending_pool_peripheral_contract,
+    collateral_vault_core_contract,
+    erc721_contract,
+    erc20_contract,
+    contract_owner,
+    borrower,
+    collateral_count,
+):
+    collaterals = vault_collaterals(erc721_contract, collateral_vault_core_contract, collateral_count)
+    lending_pool_peripheral_contract.depositEth(sender=contract_owner, value=LOAN_AMOUNT * 2)
+    lending_pool_peripheral_contract.sendFundsEth(contract_owner, LOAN_AMOUNT, sender=loans_peripheral_contract.address)
+    loan_id = defaulted_loan(loans_core_contract, loans_peripheral_contract, borrower, collaterals)
+    liquidations_peripheral_contract.addLiquidation(borrower, loan_id, erc20_contract)
+    grace_period_maturity = liquidations_peripheral_contract.getLiquidation(erc721_contract, 0)[4]
+    boa.env.time_travel(seconds=grace_period_maturity - timestamp() + 1)
+
+    # every collateral of the loan is bought, one transaction each
+    total_gas = 0
+    for collateral_address, token_id, _ in collaterals:
+        price = liquidations_peripheral_contract.getLiquidation(collateral_address, token_id)[10]
+        liquidations_peripheral_contract.buyNFTLenderPeriod(collateral_address, token_id, sender=contract_owner, value=price)
+        total_gas += gas_used(liquidations_peripheral_contract)
+
+    gas_baseline.check(f"LiquidationsPeripheral.buyNFTLenderPeriod[{collateral_count}]", total_gas)
+
+
+def test_lending_pool_deposit(
+    gas_baseline, lending_pool_peripheral_contract, lending_pool_core_contract, erc20_contract, investor
+):
+    erc20_contract.approve(lending_pool_core_contract, Web3.to_wei(1, "ether"), sender=investor)
+
+    lending_pool_peripheral_contract.deposit(Web3.to_wei(1, "ether"), sender=investor)
+
+    gas_baseline.check("LendingPoolPeripheral.deposit", gas_used(lending_pool_peripheral_contract))
+
+
+def test_lending_pool_withdraw(
+    gas_baseline, lending_pool_peripheral_contract, lending_pool_core_contract, erc20_contract, investor
+):
+    erc20_contract.approve(lending_pool_core_contract, Web3.to_wei(1, "ether"), sender=investor)
+    lending_pool_peripheral_contract.deposit(Web3.to_wei(1, "ether"), sender=investor)
+
+    lending_pool_peripheral_contract.withdraw(Web3.to_wei(1, "ether"), sender=investor)
+
+    gas_baseline.check("LendingPoolPeripheral.withdraw", gas_used(lending_pool_peripheral_contract))
+
+
+def test_lending_pool_deposit_eth(gas_baseline, lending_pool_peripheral_contract, investor):
+    lending_pool_peripheral_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+
+    gas_baseline.check("LendingPoolPeripheral.depositEth", gas_used(lending_pool_peripheral_contract))
+
+
+def test_lending_pool_withdraw_eth(gas_baseline, lending_pool_peripheral_contract, investor):
+    lending_pool_peripheral_contract.depositEth(sender=investor, value=Web3.to_wei(1, "ether"))
+
+    lending_pool_peripheral_contract.withdrawEth(Web3.to_wei(1, "ether"), sender=investor)
+
+    gas_baseline.check("LendingPoolPeripheral.withdrawEth", gas_used(lending_pool_peripheral_contract))
+
+
+@pytest.mark.parametrize("collateral_count", COLLATERAL_COUNTS)
+def test_collateral_vault_otc_store_collateral(
+    gas_baseline,
+    otc_protocol,
+    collateral_vault_otc_contract,
+    erc721_contract,
+    erc20_contract,
+    contract_owner,
+    borrower,
+    collateral_count,
+):
+    collaterals = borrower_collaterals(erc721_contract, collateral_vault_otc_contract, borrower, collateral_count)
+
+    # the collaterals of a loan are stored one call each, as the loans contract does when reserving it
+    total_gas = 0
+    for collateral_address, token_id, _ in collaterals:
+        collateral_vault_otc_contract.storeCollateral(
+            borrower, collateral_address, token_id, erc20_contract, False, sender=otc_protocol.address
+        )
+        total_gas += gas_used(collateral_vault_otc_contract)
+
+    gas_baseline.check(f"CollateralVaultOTC.storeCollateral[{collateral_count}]", total_gas)
@@ -2,6 +2,8 @@ import boa
 import pytest
 from eth_account import Account
 
+from ..conftest_base import load_partial
+
 
 @pytest.fixture(scope="session")
 def accounts():
@@ -50,19 +52,19 @@ def protocol_wallet(accounts):
 
 @pytest.fixture(scope="session")
 def erc721_contract(contract_owner):
-    return boa.load("contracts/auxiliary/token/ERC721.vy")
+    return load_partial("contracts/auxiliary/token/ERC721.vy").deploy()
 
 
 @pytest.fixture(scope="session")
 def lendingpool_eth_otc_contract():
-    return boa.load_partial("contracts/LendingPoolEthOTC.vy")
+    return load_partial("contracts/LendingPoolEthOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def lendingpool_erc20_otc_contract():
-    return boa.load_partial("contracts/LendingPoolERC20OTC.vy")
+    return load_partial("contracts/LendingPoolERC20OTC.vy")
 
 
 @pytest.fixture(scope="session")
 def weth9_contract():
-    return boa.load_partial("contracts/auxiliary/token/WETH9Mock.vy")
+    return load_partial("contracts/auxiliary/token/WETH9Mock.vy")
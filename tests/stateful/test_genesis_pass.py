@@ -4,6 +4,8 @@ from boa.test import strategy
 from hypothesis import strategies as st
 from hypothesis.stateful import RuleBasedStateMachine, initialize, invariant, rule, run_state_machine_as_test
 
+from ..conftest_base import load_partial
+
 
 @pytest.fixture
 def owner():
@@ -12,7 +14,7 @@ def owner():
 
 @pytest.fixture
 def genesis_contract(owner):
-    return boa.load("contracts/GenesisPass.vy", owner)
+    return load_partial("contracts/GenesisPass.vy").deploy(owner)
 
 
 class StatefulGenesisPass(RuleBasedStateMachine):
@@ -4,6 +4,8 @@ import boa
 import pytest
 from eth_account import Account
 
+from ..conftest_base import load_partial
+
 
 @pytest.fixture(scope="session", autouse=True)
 def boa_env():
@@ -58,97 +60,97 @@ def protocol_wallet(accounts):
 
 @pytest.fixture(scope="session")
 def erc721_contract():
-    return boa.load_partial("contracts/auxiliary/token/ERC721.vy")
+    return load_partial("contracts/auxiliary/token/ERC721.vy")
 
 
 @pytest.fixture(scope="session")
 def weth9_contract():
-    return boa.load_partial("contracts/auxiliary/token/WETH9Mock.vy")
+    return load_partial("contracts/auxiliary/token/WETH9Mock.vy")
 
 
 @pytest.fixture(scope="session")
 def cryptopunks_contract():
-    return boa.load_partial("contracts/auxiliary/token/CryptoPunksMarketMock.vy")
+    return load_partial("contracts/auxiliary/token/CryptoPunksMarketMock.vy")
 
 
 @pytest.fixture(scope="session")
 def delegation_registry_contract():
-    return boa.load_partial("contracts/auxiliary/delegate/DelegationRegistryMock.vy")
+    return load_partial("contracts/auxiliary/delegate/DelegationRegistryMock.vy")
 
 
 @pytest.fixture(scope="session")
 def genesis_contract():
-    return boa.load_partial("contracts/GenesisPass.vy")
+    return load_partial("contracts/GenesisPass.vy")
 
 
 @pytest.fixture(scope="session")
 def lendingpool_eth_otc_contract():
-    return boa.load_partial("contracts/LendingPoolEthOTC.vy")
+    return load_partial("contracts/LendingPoolEthOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def lendingpool_erc20_otc_contract():
-    return boa.load_partial("contracts/LendingPoolERC20OTC.vy")
+    return load_partial("contracts/LendingPoolERC20OTC.vy")
 
 
 @pytest.fixture(scope="session")
 def lendingpool_core_contract():
-    return boa.load_partial("contracts/LendingPoolCore.vy")
+    return load_partial("contracts/LendingPoolCore.vy")
 
 
 @pytest.fixture(scope="session")
 def lendingpool_lock_contract():
-    return boa.load_partial("contracts/LendingPoolLock.vy")
+    return load_partial("contracts/LendingPoolLock.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_peripheral_contract():
-    return boa.load_partial("contracts/CollateralVaultPeripheral.vy")
+    return load_partial("contracts/CollateralVaultPeripheral.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_core_contract():
-    return boa.load_partial("contracts/CollateralVaultCoreV2.vy")
+    return load_partial("contracts/CollateralVaultCoreV2.vy")
 
 
 @pytest.fixture(scope="session")
 def cryptopunks_vault_core_contract():
-    return boa.load_partial("contracts/CryptoPunksVaultCore.vy")
+    return load_partial("contracts/CryptoPunksVaultCore.vy")
 
 
 @pytest.fixture(scope="session")
 def collateral_vault_otc_contract():
-    return boa.load_partial("contracts/CollateralVaultOTC.vy")
+    return load_partial("contracts/CollateralVaultOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_core_contract():
-    return boa.load_partial("contracts/LoansCore.vy")
+    return load_partial("contracts/LoansCore.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_peripheral_contract():
-    return boa.load_partial("contracts/Loans.vy")
+    return load_partial("contracts/Loans.vy")
 
 
 @pytest.fixture(scope="session")
 def loans_otc_contract():
-    return boa.load_partial("contracts/LoansOTC.vy")
+    return load_partial("contracts/LoansOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_otc_contract():
-    return boa.load_partial("contracts/LiquidationsOTC.vy")
+    return load_partial("contracts/LiquidationsOTC.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_core_contract():
-    return boa.load_partial("contracts/LiquidationsCore.vy")
+    return load_partial("contracts/LiquidationsCore.vy")
 
 
 @pytest.fixture(scope="session")
 def liquidations_peripheral_contract():
-    return boa.load_partial("contracts/LiquidationsPeripheral.vy")
+    return load_partial("contracts/LiquidationsPeripheral.vy")
 
 
 @pytest.fixture(scope="module")
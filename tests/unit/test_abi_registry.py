@@ -0,0 +1,65 @@
+import json
+from dataclasses import dataclass, field
+
+from scripts._helpers import abi_registry  # noqa: PLC2701
+from scripts._helpers.abi_registry import AbiRegistry, abi_key  # noqa: PLC2701
+
+ABI = [{"type": "function", "name": "owner", "inputs": [], "outputs": [{"type": "address", "name": ""}]}]
+
+
+# returns a new abi on every call, as ape and boa contract types do
+@dataclass
+class FakeContractType:
+    name: str
+    abi: list
+    dumps: list[int] = field(default_factory=list)
+
+    def dict(self):
+        self.dumps.append(1)
+        return {"abi": json.loads(json.dumps(self.abi))}
+
+
+def test_key_depends_on_content_only():
+    assert abi_key(ABI) == abi_key(json.loads(json.dumps(ABI)))
+    assert abi_key(ABI) != abi_key([*ABI, {"type": "fallback"}])
+
+
+def test_key_memoized_by_identity(monkeypatch):
+    abi = json.loads(json.dumps(ABI))
+    key = abi_key(abi)
+    monkeypatch.setattr(abi_registry.json, "dumps", lambda *_, **__: "unused")
+
+    assert abi_key(abi) == key
+
+
+def test_key_memo_bounded(monkeypatch):
+    monkeypatch.setattr(abi_registry, "ABI_KEYS_MEMO_SIZE", 4)
+
+    for i in range(10):
+        abi_key([{"type": "function", "name": f"f{i}"}])
+
+    assert len(abi_registry._abi_keys) <= 4
+
+
+def test_contract_type_hashed_once(tmp_path):
+    registry = AbiRegistry(tmp_path)
+    contract_type = FakeContractType("Loans", ABI)
+
+    keys = {registry.add_contract_type(contract_type) for _ in range(3)}
+
+    assert keys == {abi_key(ABI)}
+    assert len(contract_type.dumps) == 1
+    assert registry.key_for("Loans") == abi_key(ABI)
+
+
+def test_saved_once_per_content(tmp_path):
+    registry = AbiRegistry(tmp_path)
+    registry.add("LoansOTC", ABI)
+    registry.add("LoansOTCPunks", json.loads(json.dumps(ABI)))
+    registry.save()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["index.json", f"{abi_key(ABI)}.json"])
+
+    reloaded = AbiRegistry(tmp_path)
+    assert reloaded.abi_for("LoansOTCPunks") == ABI
+    assert reloaded.abi_for("missing") is None
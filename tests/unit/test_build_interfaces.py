@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from scripts import build_interfaces
+
+CONTRACT = """
+value: public(uint256)
+
+@external
+def set_value(value: uint256):
+    self.value = value
+"""
+
+
+@pytest.fixture
+def run(tmp_path):
+    (tmp_path / "interfaces").mkdir()
+    source = tmp_path / "Value.vy"
+    source.write_text(CONTRACT, encoding="utf8")
+
+    def run(*args) -> str:
+        arguments = [str(source), "-o", str(tmp_path / "interfaces"), "--state-file", str(tmp_path / "state.json"), *args]
+        result = CliRunner().invoke(build_interfaces.main, arguments)
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    return run
+
+
+def test_generates_missing_interfaces(run, tmp_path):
+    output = run()
+
+    assert "Generating 1 interfaces, 0 up to date" in output
+    assert "def set_value(value: uint256):" in (tmp_path / "interfaces" / "IValue.vy").read_text(encoding="utf8")
+
+
+def test_skips_up_to_date_interfaces(run):
+    run()
+
+    assert "Generating 0 interfaces, 1 up to date" in run()
+    assert "Generating 1 interfaces, 0 up to date" in run("--force")
+
+
+def test_regenerates_on_source_changes(run, tmp_path):
+    run()
+    (tmp_path / "Value.vy").write_text(CONTRACT + "\n@external\ndef reset():\n    self.value = 0\n", encoding="utf8")
+
+    assert "Generating 1 interfaces, 0 up to date" in run()
+    assert "def reset():" in (tmp_path / "interfaces" / "IValue.vy").read_text(encoding="utf8")
+
+
+def test_regenerates_interfaces_changed_by_hand(run, tmp_path):
+    run()
+    interface = tmp_path / "interfaces" / "IValue.vy"
+    generated = interface.read_text(encoding="utf8")
+    interface.write_text("# edited\n", encoding="utf8")
+
+    assert "Generating 1 interfaces, 0 up to date" in run()
+    assert interface.read_text(encoding="utf8") == generated
+
+
+def test_state_tracks_the_generator(tmp_path):
+    source, output = tmp_path / "Value.vy", tmp_path / "IValue.vy"
+    source.write_text(CONTRACT, encoding="utf8")
+    state = build_interfaces.interface_state(source, output)
+
+    assert state["output"] is None
+    assert state["generator"] == build_interfaces.file_hash(Path(build_interfaces.__file__))
+    assert {"source", "summary", "vyper"} <= state.keys()
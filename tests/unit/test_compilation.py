@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+
+import pytest
+
+from scripts._helpers import compilation  # noqa: PLC2701
+
+INTERFACE = """
+@external
+def value() -> uint256:
+    pass
+"""
+
+CHANGED_INTERFACE = """
+@external
+def value() -> uint256:
+    pass
+
+@external
+def other():
+    pass
+"""
+
+CONTRACT = """
+from interfaces import IValue
+
+stored: public(uint256)
+
+@external
+def read(source: address) -> uint256:
+    return IValue(source).value()
+"""
+
+
+@pytest.fixture
+def sources(tmp_path):
+    (tmp_path / "interfaces").mkdir()
+    (tmp_path / "interfaces" / "IValue.vy").write_text(dedent(INTERFACE), encoding="utf8")
+    (tmp_path / "Reader.vy").write_text(dedent(CONTRACT), encoding="utf8")
+    (tmp_path / "Other.vy").write_text("x: public(uint256)\n", encoding="utf8")
+    return tmp_path
+
+
+def test_source_key_covers_the_imported_interfaces(sources):
+    reader = sources / "Reader.vy"
+    key = compilation.source_key(reader, sources)
+
+    assert compilation.transitive_imports(reader, sources) == {(sources / "interfaces" / "IValue.vy").resolve()}
+    (sources / "Other.vy").write_text("y: public(uint256)\n", encoding="utf8")
+    assert compilation.source_key(reader, sources) == key
+
+    (sources / "interfaces" / "IValue.vy").write_text(dedent(CHANGED_INTERFACE), encoding="utf8")
+    assert compilation.source_key(reader, sources) != key
+
+
+def test_source_key_ignores_builtin_interfaces(sources):
+    path = sources / "Token.vy"
+    path.write_text("from vyper.interfaces import ERC20\n\nx: public(uint256)\n", encoding="utf8")
+
+    assert compilation.transitive_imports(path, sources) == set()
+
+
+def test_unchanged_sources_are_read_from_the_cache(sources, monkeypatch):
+    cache_dir = sources / "cache"
+    paths = [sources / "Reader.vy", sources / "Other.vy", sources / "Reader.vy"]
+    outputs = compilation.compile_sources(paths, sources, cache_dir, max_workers=1)
+
+    assert list(outputs) == [sources / "Reader.vy", sources / "Other.vy"]
+    assert {e["name"] for e in outputs[sources / "Reader.vy"]["abi"]} == {"stored", "read"}
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+    def compile_in_process(path, root_folder):
+        return {"abi": [], "bytecode": f"recompiled {path.name}"}
+
+    # compiling in the test process, the cached sources don't reach it
+    monkeypatch.setattr(compilation, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(compilation, "_compile", compile_in_process)
+    assert compilation.compile_sources(paths, sources, cache_dir) == outputs
+
+    (sources / "interfaces" / "IValue.vy").write_text(dedent(CHANGED_INTERFACE), encoding="utf8")
+    recompiled = compilation.compile_sources(paths, sources, cache_dir)
+    assert recompiled[sources / "Reader.vy"]["bytecode"] == "recompiled Reader.vy"
+    assert recompiled[sources / "Other.vy"] == outputs[sources / "Other.vy"]
@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import pytest
+
+import ape_console_extras as console
+from scripts._helpers.basetypes import ContractConfig, DeploymentContext, Environment  # noqa: PLC2701
+
+
+@dataclass
+class FakeContract:
+    address: str
+    owner_address: str = "0x01"
+
+    def owner(self):
+        return self.owner_address
+
+    def __call__(self, *args):
+        return ("called", *args)
+
+    def __repr__(self):
+        return f"<Loans {self.address}>"
+
+
+# counts the contracts fetched from the chain
+@dataclass
+class FakeContainer:
+    resolved: list[str] = field(default_factory=list)
+    contract_type: SimpleNamespace = field(default_factory=lambda: SimpleNamespace(name="Loans"))
+
+    def at(self, address):
+        self.resolved.append(address)
+        return FakeContract(address)
+
+
+def lazy_config(key: str, address: str) -> ContractConfig:
+    contract = ContractConfig(key, None, FakeContainer())
+    contract.load_contract(address)
+    return contract
+
+
+def test_contract_resolved_once_on_first_use():
+    config = lazy_config("eth-grails.loans", "0x10")
+    lazy = console.LazyContract(config)
+
+    assert lazy.address == "0x10"
+    assert repr(lazy) == "<Loans 0x10 (not loaded)>"
+    assert config.container.resolved == []
+
+    assert lazy.owner() == "0x01"
+    assert lazy("arg") == ("called", "arg")
+    assert config.container.resolved == ["0x10"]
+    assert repr(lazy) == "<Loans 0x10>"
+
+
+def test_private_attributes_not_forwarded():
+    config = lazy_config("eth-grails.loans", "0x10")
+
+    with pytest.raises(AttributeError):
+        _ = console.LazyContract(config)._private
+
+    assert config.container.resolved == []
+
+
+def test_namespace_built_without_resolving_contracts(monkeypatch):
+    contracts = {"eth-grails.loans": lazy_config("eth-grails.loans", "0x10")}
+    context = DeploymentContext(contracts, Environment.local, "0x01", {"configs.max-penalty": 100})
+    dm = SimpleNamespace(context=context, owner="0x01")
+    monkeypatch.setattr(console, "deployment_manager", lambda: dm)
+
+    namespace = console.console_namespace.__wrapped__()
+
+    assert set(namespace) == {"dm", "owner", "eth_grails_loans", "configs_max_penalty"}
+    assert namespace["configs_max_penalty"] == 100
+    assert contracts["eth-grails.loans"].container.resolved == []
+
+
+def test_dunder_lookups_dont_build_the_namespace(monkeypatch):
+    def fail():
+        raise AssertionError("namespace built")
+
+    monkeypatch.setattr(console, "console_namespace", fail)
+
+    assert not hasattr(console, "__wrapped__")
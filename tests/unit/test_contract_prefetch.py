@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from threading import Event
+
+from scripts._helpers import deployment  # noqa: PLC2701
+from scripts._helpers.basetypes import ContractConfig, DeploymentContext, Environment  # noqa: PLC2701
+from scripts._helpers.deployment import DeploymentManager  # noqa: PLC2701
+
+
+# fetches contracts slowly, failing the first `failures` attempts
+@dataclass
+class FakeContainer:
+    failures: int = 0
+    resolved: list[str] = field(default_factory=list)
+
+    def at(self, address):
+        time.sleep(0.01)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError(f"can't fetch {address}")
+        self.resolved.append(address)
+        return f"contract at {address}"
+
+
+def lazy_config(key: str, address: str, container: FakeContainer) -> ContractConfig:
+    contract = ContractConfig(key, None, container)
+    contract.load_contract(address)
+    return contract
+
+
+def manager(contracts: dict[str, ContractConfig]) -> DeploymentManager:
+    # only the context is needed to prefetch, without loading the config files and accounts
+    dm = DeploymentManager.__new__(DeploymentManager)
+    dm.context = DeploymentContext(contracts, Environment.dev, "0xowner")
+    return dm
+
+
+def test_contracts_resolved_in_the_background():
+    container = FakeContainer()
+    contracts = {k: lazy_config(k, f"0x{i}", container) for i, k in enumerate(["pool", "loans", "vault"])}
+    contracts["deployed"] = ContractConfig("deployed", "contract at 0x9", container)
+
+    wait(manager(contracts).prefetch_contracts({"pool", "loans", "deployed"}))
+
+    assert sorted(container.resolved) == ["0x0", "0x1"]
+    assert not contracts["pool"].contract_pending()
+    assert contracts["vault"].contract_pending()
+
+
+def test_contract_resolved_once_by_concurrent_accesses():
+    container = FakeContainer()
+    contract = lazy_config("pool", "0x1", container)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resolved = list(executor.map(lambda _: contract.contract, range(8)))
+
+    assert resolved == ["contract at 0x1"] * 8
+    assert container.resolved == ["0x1"]
+
+
+def test_failed_prefetch_reported_and_resolved_on_access(monkeypatch):
+    warnings, reported = [], Event()
+
+    def report(message):
+        warnings.append(message)
+        reported.set()
+
+    monkeypatch.setattr(deployment, "rprint", report)
+    container = FakeContainer(failures=1)
+    contracts = {"pool": lazy_config("pool", "0x1", container)}
+
+    [future] = manager(contracts).prefetch_contracts()
+    # the failure is reported from a callback of the prefetch thread
+    assert reported.wait(timeout=5)
+
+    assert isinstance(future.exception(), ConnectionError)
+    assert warnings == ["[dark_orange bold]WARNING[/] Prefetching pool failed: can't fetch 0x1"]
+    assert contracts["pool"].contract_pending()
+    assert contracts["pool"].contract == "contract at 0x1"
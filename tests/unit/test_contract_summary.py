@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+from vyper.compiler.output import build_abi_output
+
+from scripts._helpers import contract_summary as cs  # noqa: PLC2701
+
+from ..conftest_base import load_partial
+
+# the interfaces are generated for the same sources as `make interfaces`, every contract is summarized
+INTERFACE_SOURCES = cs.interface_sources()
+CONTRACTS = sorted(Path("contracts").rglob("*.vy"))
+
+
+@pytest.mark.parametrize("contract_path", INTERFACE_SOURCES, ids=[c.stem for c in INTERFACE_SOURCES])
+def test_interface_matches_committed(contract_path):
+    summary = cs.summarize_file(contract_path)
+    interface_file = Path("interfaces") / f"I{contract_path.name}"
+    assert cs.interface_code(summary) == interface_file.read_text(encoding="utf8")
+
+
+@pytest.mark.parametrize("contract_path", CONTRACTS, ids=[str(c.relative_to("contracts").with_suffix("")) for c in CONTRACTS])
+def test_summary_matches_abi(contract_path):
+    summary = cs.summarize_file(contract_path)
+    abi = build_abi_output(load_partial(str(contract_path)).compiler_data)
+
+    functions = {e["name"] for e in abi if e["type"] == "function"} - set(cs.FUNCTIONS_BLACKLIST)
+    events = {e["name"]: [i["name"] for i in e["inputs"]] for e in abi if e["type"] == "event"}
+    assert summary.external_names() == functions
+    assert {e.name: [a.name for a in e.args] for e in summary.events} == events
+
+
+def test_predicates_dont_modify_nodes():
+    ast = cs.parse_ast("x: public(uint256)\n\n@external\ndef f():\n    pass\n")
+    variable, function = ast["body"]
+
+    assert cs.is_public_variable(variable)
+    assert not cs.is_external_function(variable)
+    assert cs.is_external_function(function)
+    assert not cs.is_public_variable(function)
+    assert variable["ast_type"] == "VariableDecl"
+    assert function["ast_type"] == "FunctionDef"
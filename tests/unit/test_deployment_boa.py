@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import boa
+import pytest
+
+from scripts._helpers.backend import ApeBackend, active_backend  # noqa: PLC2701
+from scripts._helpers.basetypes import Environment  # noqa: PLC2701
+from scripts._helpers.boa_backend import BoaBackend  # noqa: PLC2701
+from scripts._helpers.deployment import DeploymentManager  # noqa: PLC2701
+
+
+def read_config_files() -> dict[str, bytes]:
+    return {p.name: p.read_bytes() for p in sorted((Path.cwd() / "configs" / "dev").iterdir()) if p.is_file()}
+
+
+@pytest.fixture(scope="module")
+def config_files():
+    return read_config_files()
+
+
+@pytest.fixture(scope="module")
+def deployment(config_files):
+    with BoaBackend().activate() as backend, boa.env.anchor():
+        dm = DeploymentManager(Environment.dev, backend=backend)
+        dm.deploy_all()
+        yield dm
+
+
+def test_deploys_every_deployable_contract(deployment):
+    contracts = deployment.context.contracts.values()
+    assert all(c.has_contract() for c in contracts if c.deployable(deployment.context))
+
+
+def test_contracts_owned_by_deployer(deployment):
+    for contract in deployment.context.contracts.values():
+        if contract.has_contract() and "owner" in contract.contract.contract_type.view_methods:
+            assert contract.contract.owner() == deployment.owner
+
+
+def test_config_dependencies_set(deployment):
+    contracts = deployment.context.contracts
+    lending_pool_core = contracts["usdc.lending_pool_core"].contract
+    assert lending_pool_core.lendingPoolPeripheral() == contracts["usdc.lending_pool"].address()
+
+
+def test_proxies_deployed_from_implementation(deployment):
+    contracts = deployment.context.contracts
+    loans = contracts["deadpool.loans"].contract
+    assert loans.lendingPoolContract() == contracts["deadpool.lending_pool"].address()
+
+
+def test_abi_keys_registered(deployment):
+    abis = deployment.context.abis
+    for contract in deployment.context.contracts.values():
+        if contract.deployable(deployment.context):
+            assert contract.abi_key == abis.key_for(contract.contract.contract_type.name)
+
+
+def test_config_files_not_changed(deployment, config_files):
+    assert not deployment.save_state
+    assert read_config_files() == config_files
+
+
+def test_backend_not_left_active(deployment):
+    assert isinstance(active_backend(), ApeBackend)
+
+
+def test_backfills_bytecode_keys_matching_the_code_on_chain(deployment, monkeypatch):
+    contracts = deployment.context.contracts
+    # the fingerprints are restored after the test, as the deployment is shared by the module
+    for contract in contracts.values():
+        monkeypatch.setattr(contract, "bytecode_key", contract.bytecode_key)
+    lending_pool_core, loans = contracts["usdc.lending_pool_core"], contracts["deadpool.loans"]
+    expected_keys = lending_pool_core.bytecode_key, loans.bytecode_key
+    lending_pool_core.bytecode_key = loans.bytecode_key = None
+
+    # the proxy is fingerprinted through its implementation, as its code on chain is a stub delegating to it
+    assert deployment.backfill_bytecode_keys() == {"usdc.lending_pool_core", "deadpool.loans"}
+    assert (lending_pool_core.bytecode_key, loans.bytecode_key) == expected_keys
+
+
+def test_scope_loads_the_pool_and_its_references():
+    with BoaBackend().activate() as backend:
+        dm = DeploymentManager(Environment.dev, scope={"usdc"}, backend=backend)
+    keys = set(dm.context.contracts)
+
+    assert {"usdc.loans", "usdc.lending_pool", "usdc.liquidity_controls", "common.usdc", "common.genesis", "punk"} <= keys
+    assert {k.split(".")[0] for k in keys if "." in k} == {"usdc", "common"}
+    assert keys == dm.repository.scoped_keys({"usdc"})
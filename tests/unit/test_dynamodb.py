@@ -0,0 +1,149 @@
+import boto3
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from moto import mock_aws
+
+from scripts._helpers.dynamodb import BATCH_WRITE_SIZE, DynamoWriter  # noqa: PLC2701
+
+TABLE = "abis"
+
+
+class SpyResource:
+    # records the size of every BatchWriteItem and can leave the tail of the first ones unprocessed, like a throttled table
+    def __init__(self, resource, unprocessed_calls: int = 0, unprocessed_size: int = 0, error: Exception | None = None):
+        self.resource = resource
+        self.unprocessed_calls = unprocessed_calls
+        self.unprocessed_size = unprocessed_size
+        self.error = error
+        self.batch_sizes = []
+
+    def Table(self, name):  # noqa: N802
+        return self.resource.Table(name)
+
+    def batch_write_item(self, RequestItems):  # noqa: N803
+        if self.error is not None:
+            raise self.error
+        requests = RequestItems[TABLE]
+        self.batch_sizes.append(len(requests))
+        unprocessed = []
+        if self.unprocessed_calls > 0:
+            self.unprocessed_calls -= 1
+            requests, unprocessed = requests[: -self.unprocessed_size], requests[-self.unprocessed_size :]
+        if requests:
+            self.resource.batch_write_item(RequestItems={TABLE: requests})
+        return {"UnprocessedItems": {TABLE: unprocessed} if unprocessed else {}}
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        resource = boto3.resource("dynamodb")
+        resource.create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "abi_key", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "abi_key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield resource
+
+
+def stored_keys(resource) -> set[str]:
+    return {item["abi_key"] for item in resource.Table(TABLE).scan()["Items"]}
+
+
+def items(n: int) -> list[dict]:
+    return [{"abi_key": f"key-{i}", "abi": f"abi-{i}"} for i in range(n)]
+
+
+def test_put_items_batches(dynamodb):
+    spy = SpyResource(dynamodb)
+    writer = DynamoWriter(spy, base_delay=0)
+
+    writer.put_items(TABLE, items(2 * BATCH_WRITE_SIZE + 10))
+
+    assert sorted(spy.batch_sizes) == [10, BATCH_WRITE_SIZE, BATCH_WRITE_SIZE]
+    assert stored_keys(dynamodb) == {i["abi_key"] for i in items(2 * BATCH_WRITE_SIZE + 10)}
+    assert writer.counts[TABLE].written == 2 * BATCH_WRITE_SIZE + 10
+    assert writer.failed() == 0
+
+
+def test_put_items_retries_unprocessed(dynamodb):
+    spy = SpyResource(dynamodb, unprocessed_calls=2, unprocessed_size=5)
+    writer = DynamoWriter(spy, max_workers=1, base_delay=0)
+
+    writer.put_items(TABLE, items(BATCH_WRITE_SIZE))
+
+    assert spy.batch_sizes == [BATCH_WRITE_SIZE, 5, 5]
+    assert stored_keys(dynamodb) == {i["abi_key"] for i in items(BATCH_WRITE_SIZE)}
+    assert writer.counts[TABLE].written == BATCH_WRITE_SIZE
+    assert writer.counts[TABLE].retries == 2
+    assert writer.failed() == 0
+
+
+def test_put_items_reports_items_left_unprocessed(dynamodb):
+    spy = SpyResource(dynamodb, unprocessed_calls=3, unprocessed_size=5)
+    writer = DynamoWriter(spy, max_workers=1, max_attempts=3, base_delay=0)
+
+    writer.put_items(TABLE, items(BATCH_WRITE_SIZE))
+
+    assert writer.counts[TABLE].written == BATCH_WRITE_SIZE - 5
+    assert writer.counts[TABLE].failed == 5
+
+
+def test_put_items_reports_client_errors(dynamodb):
+    writer = DynamoWriter(dynamodb, base_delay=0)
+
+    writer.put_items("missing", [{"abi_key": "key-0"}])
+
+    assert writer.counts["missing"].failed == 1
+    assert writer.failed() == 1
+
+
+def test_put_items_reports_connection_errors(dynamodb):
+    spy = SpyResource(dynamodb, error=EndpointConnectionError(endpoint_url="https://dynamodb.us-east-1.amazonaws.com"))
+    writer = DynamoWriter(spy, base_delay=0)
+
+    writer.put_items(TABLE, items(BATCH_WRITE_SIZE + 1))
+
+    assert writer.counts[TABLE].failed == BATCH_WRITE_SIZE + 1
+    assert writer.counts[TABLE].written == 0
+
+
+def test_update_items_keeps_other_attributes(dynamodb):
+    dynamodb.Table(TABLE).put_item(Item={"abi_key": "key-0", "abi": "old", "extra": "kept"})
+    writer = DynamoWriter(dynamodb, base_delay=0)
+
+    writer.update_items(TABLE, "abi_key", {"key-0": {"abi": "new"}, "key-1": {"abi": "abi-1"}})
+
+    assert dynamodb.Table(TABLE).get_item(Key={"abi_key": "key-0"})["Item"] == {
+        "abi_key": "key-0",
+        "abi": "new",
+        "extra": "kept",
+    }
+    assert writer.counts[TABLE].written == 2
+
+
+def test_update_items_reports_failures(dynamodb):
+    writer = DynamoWriter(dynamodb, base_delay=0)
+
+    writer.update_items("missing", "abi_key", {"key-0": {"abi": "abi-0"}})
+    writer.update_items(TABLE, "abi_key", {"key-0": {"abi": "abi-0"}})
+
+    assert writer.counts["missing"].failed == 1
+    assert (writer.failed("missing"), writer.failed(TABLE), writer.failed()) == (1, 0, 1)
+
+
+def test_read_items_pages_through_the_table(dynamodb):
+    dynamodb.Table(TABLE).put_item(Item={"abi_key": "key-0", "abi": "x" * 300_000})
+    dynamodb.Table(TABLE).put_item(Item={"abi_key": "key-1", "abi": "x" * 300_000})
+    dynamodb.Table(TABLE).put_item(Item={"abi_key": "key-2", "abi": "x" * 300_000, "version": 1})
+    dynamodb.Table(TABLE).put_item(Item={"abi_key": "key-3", "abi": "x" * 300_000})
+    writer = DynamoWriter(dynamodb, base_delay=0)
+
+    stored = writer.read_items(TABLE, "abi_key")
+
+    assert sorted(stored) == ["key-0", "key-1", "key-2", "key-3"]
+    assert stored["key-2"] == {"abi": "x" * 300_000, "version": 1}
@@ -0,0 +1,93 @@
+import gc
+from textwrap import dedent
+
+import boa
+import pytest
+
+from ..conftest_base import _event_stores, event_store, get_events, get_last_event
+
+EMITTER = """
+event Stored:
+    sender: indexed(address)
+    value: uint256
+    data: Bytes[32]
+
+event Cleared:
+    value: uint256
+
+@external
+def store(first: uint256, second: uint256):
+    log Stored(msg.sender, first, b"\\x01\\x02")
+    log Stored(msg.sender, second, b"")
+    log Cleared(first)
+
+@external
+def clear():
+    log Cleared(0)
+"""
+
+
+@pytest.fixture
+def emitter():
+    return boa.loads(dedent(EMITTER))
+
+
+def test_events_decoded(emitter, contract_owner):
+    emitter.store(1, 2)
+
+    stored = get_events(emitter, "Stored")
+    assert [e.value for e in stored] == [1, 2]
+    assert stored[0].sender == contract_owner
+    assert stored[0].data == "0x0102"
+    assert stored[0].args_dict == {"sender": contract_owner, "value": 1, "data": "0x0102"}
+    assert get_last_event(emitter).event_name == "Cleared"
+    assert [e.event_name for e in get_events(emitter)] == ["Stored", "Stored", "Cleared"]
+
+
+def test_events_filtered(emitter):
+    emitter.store(1, 2)
+
+    assert [e.value for e in get_events(emitter, "Stored", value=2)] == [2]
+    assert get_events(emitter, "Stored", value=3) == []
+    assert get_events(emitter, "Missing") == []
+
+
+def test_unknown_attribute(emitter):
+    emitter.store(1, 2)
+
+    with pytest.raises(AttributeError, match="No attr missing in Stored"):
+        _ = get_last_event(emitter, "Stored").missing
+
+
+def test_events_of_the_last_transaction_only(emitter):
+    emitter.store(1, 2)
+    first = get_last_event(emitter, "Cleared")
+
+    emitter.clear()
+
+    assert get_events(emitter, "Stored") == []
+    assert get_last_event(emitter, "Cleared").value == 0
+    assert first.value == 1
+
+
+def test_events_decoded_once(emitter):
+    emitter.store(1, 2)
+
+    assert get_last_event(emitter, "Stored") is get_last_event(emitter, "Stored")
+
+
+# boa environments keep a reference to every contract deployed in them, so a contract object standing in for one is
+# needed to release it
+class Contract:
+    _computation = None
+
+
+def test_store_doesnt_keep_the_contract_alive():
+    contract = Contract()
+    assert event_store(contract).events() == []
+    stores = len(_event_stores)
+
+    del contract
+    gc.collect()
+
+    assert len(_event_stores) == stores - 1
@@ -0,0 +1,68 @@
+import socket
+from dataclasses import dataclass, field
+
+import pytest
+
+from ..integration import fork_state
+from ..integration.fork_state import ForkStateMissingError, ForkStateRPC, ForkStateStore
+
+BLOCK = {"number": "0x12e6f57", "hash": "0x01"}
+
+
+# answers every request with its method and params, counting the requests
+@dataclass
+class FakeRPC:
+    name: str = "fake"
+    requests: list[tuple] = field(default_factory=list)
+
+    def fetch_multi(self, payloads):
+        self.requests += payloads
+        return [{"method": method, "params": params} for method, params in payloads]
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def connect(*_, **__):
+        raise AssertionError("network access")
+
+    monkeypatch.setattr(socket, "socket", connect)
+    monkeypatch.setattr(socket, "create_connection", connect)
+
+
+def test_recorded_state_replayed_without_network(tmp_path, monkeypatch, no_network):
+    rpc = FakeRPC()
+    recorder = ForkStateRPC(ForkStateStore(tmp_path), rpc)
+    recorder.fetch("eth_getBlockByNumber", ["0x12e6f57", False])
+    recorder.fetch_multi([("eth_getCode", ["0x01", "0x12e6f57"]), ("eth_getBalance", ["0x01", "0x12e6f57"])])
+
+    monkeypatch.setenv("BOA_FORK_STATE_DIR", str(tmp_path.parent))
+    monkeypatch.setenv("BOA_FORK_RPC_URL", "http://localhost:8545")
+    monkeypatch.setenv("BOA_FORK_OFFLINE", "1")
+    replay = fork_state.fork_state_rpc(tmp_path.name)
+
+    assert replay.fetch("eth_getCode", ["0x01", "0x12e6f57"]) == {"method": "eth_getCode", "params": ["0x01", "0x12e6f57"]}
+    assert len(replay.fetch_multi([("eth_getBlockByNumber", ["0x12e6f57", False])])) == 1
+    with pytest.raises(ForkStateMissingError, match="eth_getStorageAt"):
+        replay.fetch("eth_getStorageAt", ["0x01", "0x0", "0x12e6f57"])
+    assert len(rpc.requests) == 3
+
+
+def test_only_missing_requests_fetched(tmp_path):
+    rpc = FakeRPC()
+    store = ForkStateStore(tmp_path)
+    store.put("eth_getCode", ["0x01"], "0x6000")
+
+    results = ForkStateRPC(store, rpc).fetch_multi([("eth_getCode", ["0x01"]), ("eth_getCode", ["0x02"])])
+
+    assert results == ["0x6000", {"method": "eth_getCode", "params": ["0x02"]}]
+    assert rpc.requests == [("eth_getCode", ["0x02"])]
+
+
+def test_tracked_store_by_default(monkeypatch):
+    monkeypatch.delenv("BOA_FORK_STATE_DIR", raising=False)
+    monkeypatch.delenv("BOA_FORK_RPC_URL", raising=False)
+
+    rpc = fork_state.fork_state_rpc(19820759)
+
+    assert rpc.store.path == fork_state.FORK_STATE_DIR / "19820759"
+    assert rpc.name == f"fork state at {fork_state.FORK_STATE_DIR / '19820759'}"
@@ -0,0 +1,79 @@
+from itertools import pairwise
+
+import pytest
+
+from scripts._helpers import graph  # noqa: PLC2701
+
+# token <- pool_core <- pool <- loans, token <- vault <- loans
+EDGES = {
+    "token": {"pool_core", "vault"},
+    "pool_core": {"pool"},
+    "pool": {"loans"},
+    "vault": {"loans"},
+}
+
+
+def test_topological_sort_orders_dependencies_first():
+    order = graph.topological_sort(EDGES)
+
+    assert sorted(order) == ["loans", "pool", "pool_core", "token", "vault"]
+    for node, dependents in EDGES.items():
+        assert all(order.index(node) < order.index(d) for d in dependents)
+
+
+def test_topological_sort_is_deterministic():
+    reordered = dict(reversed(EDGES.items()))
+
+    assert graph.topological_sort(reordered) == ["token", "pool_core", "vault", "pool", "loans"]
+    assert graph.topological_sort(EDGES) == graph.topological_sort(reordered)
+
+
+def test_topological_sort_includes_nodes_without_edges():
+    assert graph.topological_sort({"a": set(), "b": {"c"}}) == ["a", "b", "c"]
+
+
+def test_topological_sort_reports_the_cycle():
+    edges = EDGES | {"loans": {"token"}, "other": {"token"}}
+
+    with pytest.raises(graph.DependencyCycleError) as e:
+        graph.topological_sort(edges)
+
+    cycle = e.value.path
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) in ({"token", "pool_core", "pool", "loans"}, {"token", "vault", "loans"})
+    for node, dependent in pairwise(cycle):
+        assert dependent in edges[node]
+    assert "Dependency cycle found: " in str(e.value)
+
+
+def test_find_cycle_skips_nodes_only_depending_on_the_cycle():
+    # c depends on the a <-> b cycle without being part of it
+    edges = {"a": {"b", "c"}, "b": {"a"}}
+
+    assert graph.find_cycle(edges, {"a", "b", "c"}) == ["a", "b", "a"]
+
+
+def test_find_cycle_of_a_self_dependency():
+    assert graph.find_cycle({"a": {"a"}}, {"a"}) == ["a", "a"]
+
+
+def test_reachable_includes_sources_and_dependents():
+    assert graph.reachable(EDGES, {"pool_core"}) == {"pool_core", "pool", "loans"}
+    assert graph.reachable(EDGES, {"pool_core"}, visited={"pool"}) == {"pool_core"}
+
+
+def test_deployment_levels_only_wait_for_dependencies_in_the_set():
+    order = graph.topological_sort(EDGES)
+
+    assert graph.deployment_levels(EDGES, order, set(order)) == [["token"], ["pool_core", "vault"], ["pool"], ["loans"]]
+    # token and pool_core are already deployed
+    assert graph.deployment_levels(EDGES, order, {"vault", "pool", "loans"}) == [["vault", "pool"], ["loans"]]
+    assert graph.deployment_levels(EDGES, order, set()) == []
+
+
+def test_closure_is_extended_and_recomputed():
+    dependency_graph = graph.DependencyGraph(EDGES)
+
+    assert dependency_graph.closure({"pool"}) == {"pool", "loans"}
+    assert dependency_graph.closure({"pool", "vault"}) == {"pool", "vault", "loans"}
+    assert dependency_graph.closure({"vault"}) == {"vault", "loans"}
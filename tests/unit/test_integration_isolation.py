@@ -0,0 +1,82 @@
+from textwrap import dedent
+
+pytest_plugins = ["pytester"]
+
+# the integration fixtures deploying and wiring the protocol, with a counter standing in for the forked protocol
+CONFTEST = '''
+import boa
+import pytest
+from boa.environment import Env
+
+from tests.integration.conftest import module_snapshot, revert_test_state
+
+COUNTER = """
+count: public(uint256)
+wired: public(uint256)
+
+@external
+def bump():
+    self.count += 1
+
+@external
+def wire(wired: uint256):
+    self.wired = wired
+"""
+
+
+@pytest.fixture(scope="session", autouse=True)
+def forked_env():
+    with boa.swap_env(Env()):
+        yield
+
+
+@pytest.fixture(scope="session")
+def counter(forked_env):
+    counter = boa.loads(COUNTER)
+    counter.bump()
+    return counter
+
+
+@pytest.fixture(scope="session")
+def protocol_snapshot(counter):
+    pass
+
+
+@pytest.fixture(scope="module")
+def contracts_config(counter):
+    counter.wire(5)
+'''
+
+WIRED_FROM_A_TEST_ON = """
+def test_unwired(counter):
+    assert (counter.count(), counter.wired()) == (1, 0)
+    counter.bump()
+
+
+def test_load_contract_config(contracts_config):
+    pass
+
+
+def test_wired(counter):
+    assert (counter.count(), counter.wired()) == (1, 5)
+    counter.bump()
+
+
+def test_still_wired(counter, contracts_config):
+    assert (counter.count(), counter.wired()) == (1, 5)
+    counter.wire(7)
+"""
+
+
+def run(pytester, *args):
+    pytester.makeconftest(dedent(CONFTEST))
+    pytester.makepyfile(test_first=WIRED_FROM_A_TEST_ON, test_second=WIRED_FROM_A_TEST_ON)
+    return pytester.runpytest_inprocess("-p", "no:cacheprovider", "-p", "no:ape_test", *args)
+
+
+def test_tests_and_modules_reverted(pytester):
+    run(pytester).assert_outcomes(passed=8)
+
+
+def test_reverted_without_the_boa_plugin_isolation(pytester):
+    run(pytester, "-p", "no:boa_test").assert_outcomes(passed=8)
@@ -0,0 +1,66 @@
+from scripts._helpers.journal import DeploymentJournal  # noqa: PLC2701
+
+
+def test_entries_replayed_when_reopened(tmp_path):
+    path = tmp_path / "deployments" / "dev.jsonl"
+    journal = DeploymentJournal.open(path)
+    journal.record("deploy", key="pool", address="0x01", tx="0xaa")
+    journal.record("post_deploy", key="pool")
+    journal.record("config", setter="pool.set_loans()")
+
+    replayed = DeploymentJournal.open(path)
+
+    assert replayed.entries == journal.entries
+    assert replayed.deployed() == {"pool": {"kind": "deploy", "key": "pool", "address": "0x01", "tx": "0xaa"}}
+    assert replayed.post_deployed() == {"pool"}
+    assert replayed.completed_setters() == {"pool.set_loans()"}
+
+
+def test_later_deployments_of_a_key_replace_earlier_ones(tmp_path):
+    journal = DeploymentJournal.open(tmp_path / "dev.jsonl")
+    journal.record("deploy", key="pool", address="0x01")
+    journal.record("deploy", key="pool", address="0x02")
+
+    assert DeploymentJournal.open(journal.path).deployed()["pool"]["address"] == "0x02"
+
+
+def test_setters_only_completed_once_confirmed(tmp_path):
+    journal = DeploymentJournal.open(tmp_path / "dev.jsonl")
+    journal.record("execute", setter="pool.set_loans()", contract="pool", func="setLoans", args=["loans"])
+
+    assert DeploymentJournal.open(journal.path).completed_setters() == set()
+
+
+def test_truncated_line_dropped_before_appending(tmp_path):
+    path = tmp_path / "dev.jsonl"
+    journal = DeploymentJournal.open(path)
+    journal.record("deploy", key="pool", address="0x01")
+    with path.open(mode="a", encoding="utf8") as f:
+        f.write('{"kind": "deploy", "key": "loa')
+
+    resumed = DeploymentJournal.open(path)
+    resumed.record("deploy", key="loans", address="0x02")
+
+    assert set(resumed.deployed()) == {"pool", "loans"}
+    assert DeploymentJournal.open(path).entries == resumed.entries
+
+
+def test_complete_entry_without_newline_dropped(tmp_path):
+    path = tmp_path / "dev.jsonl"
+    path.write_text('{"kind": "deploy", "key": "pool", "address": "0x01"}', encoding="utf8")
+
+    resumed = DeploymentJournal.open(path)
+    resumed.record("deploy", key="loans", address="0x02")
+
+    assert set(DeploymentJournal.open(path).deployed()) == {"loans"}
+
+
+def test_remove_deletes_the_file(tmp_path):
+    journal = DeploymentJournal.open(tmp_path / "dev.jsonl")
+    journal.record("deploy", key="pool", address="0x01")
+
+    journal.remove()
+    journal.remove()
+
+    assert not journal.path.exists()
+    assert journal.entries == []
@@ -1,7 +1,7 @@
 import boa
 import pytest
 
-from ..conftest_base import ZERO_ADDRESS, get_last_event
+from ..conftest_base import ZERO_ADDRESS, get_last_event, load_partial
 
 DEPLOYER = boa.env.generate_address()
 LENDER = boa.env.generate_address()
@@ -12,7 +12,7 @@ PROTOCOL_FEE = 100  # bps
 
 @pytest.fixture(scope="module")
 def weth9_contract():
-    return boa.load_partial("contracts/auxiliary/token/WETH9Mock.vy")
+    return load_partial("contracts/auxiliary/token/WETH9Mock.vy")
 
 
 @pytest.fixture(scope="module")
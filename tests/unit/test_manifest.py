@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import pytest
+
+from scripts import publish
+from scripts._helpers.manifest import PublishManifest, record_hashes, table_diff  # noqa: PLC2701
+
+TABLE = publish.pools_table
+
+
+# stores the items of a single table, counting the scans and failing the writes while `fails` is set
+@dataclass
+class FakeWriter:
+    items: dict[str, dict] = field(default_factory=dict)
+    fails: bool = False
+    scans: int = 0
+    writes: list[dict] = field(default_factory=list)
+
+    def read_items(self, *_):
+        self.scans += 1
+        return {key: dict(item) for key, item in self.items.items()}
+
+    def update_items(self, items: dict[str, dict]):
+        self.writes.append(items)
+        if not self.fails:
+            for key, item in items.items():
+                self.items.setdefault(key, {}).update(item)
+
+    def failed(self, *_) -> int:
+        return len(self.writes[-1]) if self.fails and self.writes else 0
+
+    def report(self):
+        pass
+
+
+@pytest.fixture
+def writer(monkeypatch, tmp_path):
+    monkeypatch.setattr(publish.boto3, "resource", lambda *_: None)
+    monkeypatch.setattr(publish, "manifest_path", lambda env: tmp_path / f"{env}-manifest.json")
+    return FakeWriter(items={"pool-1": {"fee": Decimal(10), "extra": "kept"}})
+
+
+def run_publish(writer: FakeWriter, records: dict, **kwargs) -> publish.DynamoPublisher:
+    publisher = publish.DynamoPublisher(publish.StageTimings(), **{"dry_run": False, "force": False} | kwargs)
+    publisher.writer = writer
+    publisher.submit(TABLE, records, lambda w, updates: w.update_items(updates))
+    publisher.wait()
+    return publisher
+
+
+def test_diff_compares_hashes_by_value():
+    published = {"pool-1": record_hashes({"fee": Decimal(10), "extra": "kept"}), "pool-2": record_hashes({"fee": 1})}
+
+    diff = table_diff(published, {"pool-1": {"fee": 10, "name": "usdc"}, "pool-3": {"fee": 3}})
+
+    assert diff.added == {"pool-3": {"fee": 3}}
+    assert diff.changed == {"pool-1": {"name": "usdc"}}
+    assert diff.removed == {"pool-2"}
+
+
+def test_manifest_records_written_attributes(tmp_path):
+    manifest = PublishManifest(tmp_path / "manifest.json")
+    manifest.replace(TABLE, {"pool-1": record_hashes({"fee": 1, "extra": "kept"})})
+
+    manifest.record(TABLE, {"pool-1": {"fee": 2}, "pool-2": {"fee": 3}})
+    manifest.save()
+
+    assert PublishManifest.load(tmp_path / "manifest.json").published(TABLE) == {
+        "pool-1": record_hashes({"fee": 2, "extra": "kept"}),
+        "pool-2": record_hashes({"fee": 3}),
+    }
+    assert PublishManifest.load(tmp_path / "missing.json").published(TABLE) is None
+
+
+def test_table_read_once_then_diffed_against_the_manifest(writer):
+    records = {"pool-1": {"fee": 10}, "pool-2": {"fee": 2}}
+
+    run_publish(writer, records)
+    assert (writer.scans, writer.writes) == (1, [{"pool-2": {"fee": 2}}])
+
+    run_publish(writer, records | {"pool-2": {"fee": 3}})
+    assert (writer.scans, writer.writes[1:]) == (1, [{"pool-2": {"fee": 3}}])
+
+    run_publish(writer, records | {"pool-2": {"fee": 3}})
+    assert len(writer.writes) == 2
+
+
+def test_failed_writes_published_again(writer):
+    writer.fails = True
+    with pytest.raises(publish.click.ClickException):
+        run_publish(writer, {"pool-1": {"fee": 11}})
+
+    writer.fails = False
+    run_publish(writer, {"pool-1": {"fee": 11}})
+
+    assert writer.writes == [{"pool-1": {"fee": 11}}] * 2
+    assert writer.items["pool-1"] == {"fee": 11, "extra": "kept"}
+
+
+def test_refresh_reads_the_table(writer):
+    run_publish(writer, {"pool-1": {"fee": 10}})
+    writer.items["pool-1"]["fee"] = Decimal(12)
+
+    run_publish(writer, {"pool-1": {"fee": 10}})
+    run_publish(writer, {"pool-1": {"fee": 10}}, refresh=True)
+
+    assert writer.scans == 2
+    assert writer.writes == [{"pool-1": {"fee": 10}}]
+
+
+def test_dry_run_writes_nothing(writer):
+    publisher = run_publish(writer, {"pool-1": {"fee": 12}}, dry_run=True)
+
+    assert writer.writes == []
+    assert publisher.manifest.published(TABLE) == {"pool-1": record_hashes({"fee": 10, "extra": "kept"})}
+
+
+def test_force_writes_every_record(writer):
+    run_publish(writer, {"pool-1": {"fee": 10}}, force=True)
+
+    assert writer.scans == 0
+    assert writer.writes == [{"pool-1": {"fee": 10}}]
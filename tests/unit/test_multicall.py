@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import pytest
+
+from scripts._helpers import multicall  # noqa: PLC2701
+from scripts._helpers.basetypes import ContractConfig, DeploymentContext, Environment  # noqa: PLC2701
+from scripts._helpers.transactions import execute_read  # noqa: PLC2701
+
+
+# getters return their value encoded in a single byte, the calldata is the getter name
+@dataclass
+class FakeContract:
+    address: str
+    getters: dict[str, int]
+    calls: int = 0
+
+    @property
+    def contract_type(self):
+        return SimpleNamespace(view_methods={name: {"name": name} for name in self.getters})
+
+    def call_view_method(self, func, *_):
+        self.calls += 1
+        return self.getters[func]
+
+
+class FakeEcosystem:
+    @staticmethod
+    def get_method_selector(abi):
+        return abi["name"].encode()
+
+    @staticmethod
+    def encode_calldata(_):
+        return b""
+
+    @staticmethod
+    def decode_returndata(_, data):
+        return (data[0],)
+
+
+# fails the calls to the getters in `failing`, or every batch when `error` is set
+@dataclass
+class FakeMulticall:
+    contracts: dict[str, FakeContract]
+    failing: set[str] = field(default_factory=set)
+    error: Exception | None = None
+    batches: list[int] = field(default_factory=list)
+
+    def aggregate3(self, calls):
+        if self.error is not None:
+            raise self.error
+        self.batches.append(len(calls))
+        results = []
+        for target, _, calldata in calls:
+            getter = calldata.decode()
+            value = self.contracts[target].getters[getter]
+            results.append(SimpleNamespace(success=getter not in self.failing, returnData=bytes([value])))
+        return results
+
+
+@pytest.fixture
+def context():
+    contracts = {
+        "pool": ContractConfig("pool", FakeContract("0xpool", {"owner": 1, "fee": 2}), None),
+        "loans": ContractConfig("loans", FakeContract("0xloans", {"owner": 1}), None),
+    }
+    return DeploymentContext(contracts, Environment.dev, "0xowner", backend=SimpleNamespace(multicall=True))
+
+
+@pytest.fixture
+def aggregator(context, monkeypatch):
+    aggregator = FakeMulticall({c.address(): c.contract for c in context.contracts.values()})
+    provider = SimpleNamespace(network=SimpleNamespace(ecosystem=FakeEcosystem()))
+    monkeypatch.setattr(multicall, "networks", SimpleNamespace(provider=provider))
+    monkeypatch.setattr(multicall, "multicall_available", lambda: True)
+    monkeypatch.setattr(multicall, "Contract", lambda *_, **__: aggregator)
+    return aggregator
+
+
+READS = {("pool", "owner"), ("pool", "fee"), ("loans", "owner")}
+
+
+def read_all(context) -> dict[tuple[str, str], int]:
+    return {(key, getter): execute_read(context, key, getter) for key, getter in sorted(READS)}
+
+
+def chain_calls(context) -> int:
+    return sum(c.contract.calls for c in context.contracts.values())
+
+
+def test_prefetched_values_are_cached(context, aggregator):
+    multicall.prefetch_reads(context, READS)
+
+    assert read_all(context) == {("loans", "owner"): 1, ("pool", "fee"): 2, ("pool", "owner"): 1}
+    assert chain_calls(context) == 0
+    assert aggregator.batches == [3]
+
+
+def test_reads_are_batched(context, aggregator, monkeypatch):
+    monkeypatch.setattr(multicall, "MULTICALL3_BATCH_SIZE", 2)
+
+    multicall.prefetch_reads(context, READS)
+
+    assert aggregator.batches == [2, 1]
+
+
+def test_failed_calls_fall_back_to_single_reads(context, aggregator):
+    aggregator.failing = {"fee"}
+
+    multicall.prefetch_reads(context, READS)
+
+    assert read_all(context)[("pool", "fee")] == 2
+    assert context.contracts["pool"].contract.calls == 1
+    assert context.contracts["loans"].contract.calls == 0
+
+
+def test_failed_batches_fall_back_to_single_reads(context, aggregator):
+    aggregator.error = ConnectionError("rpc unavailable")
+
+    multicall.prefetch_reads(context, READS)
+
+    assert read_all(context) == {("loans", "owner"): 1, ("pool", "fee"): 2, ("pool", "owner"): 1}
+    assert chain_calls(context) == 3
+
+
+def test_unknown_getters_are_not_prefetched(context, aggregator):
+    multicall.prefetch_reads(context, {("pool", "missing"), ("pool", "fee")})
+
+    assert aggregator.batches == [1]
+
+
+def test_nothing_prefetched_without_multicall(context, aggregator):
+    context.backend.multicall = False
+
+    multicall.prefetch_reads(context, READS)
+
+    assert aggregator.batches == []
@@ -0,0 +1,142 @@
+import json
+from dataclasses import dataclass, field
+
+import pytest
+
+from scripts._helpers import ownership  # noqa: PLC2701
+from scripts._helpers.basetypes import ContractConfig  # noqa: PLC2701
+
+OLD_OWNER = "0x01"
+NEW_OWNER = "0x02"
+
+
+@dataclass
+class Receipt:
+    txn_hash: str
+
+
+@dataclass
+class FakeContract:
+    address: str
+    owner_address: str = OLD_OWNER
+    proposed: str = "0x00"
+    fails: bool = False
+    calls: list = field(default_factory=list)
+
+    def owner(self):
+        return self.owner_address
+
+    def proposedOwner(self):  # noqa: N802
+        return self.proposed
+
+    def proposeOwner(self, target, nonce, **_):  # noqa: N802
+        self.calls.append(("proposeOwner", nonce))
+        if self.fails:
+            raise ValueError("reverted")
+        self.proposed = target
+        return Receipt(f"0x{nonce}")
+
+    def claimOwnership(self, sender, nonce, **_):  # noqa: N802
+        self.calls.append(("claimOwnership", nonce))
+        self.owner_address, self.proposed = str(sender), "0x00"
+        return Receipt(f"0x{nonce}")
+
+
+# a contract without the ownership functions, the rotation skips it
+@dataclass
+class WithoutOwnership:
+    address: str
+
+
+@dataclass
+class Sender:
+    address: str
+    nonce: int = 5
+
+    def __str__(self):
+        return self.address
+
+
+@pytest.fixture(autouse=True)
+def convert(monkeypatch):
+    monkeypatch.setattr(ownership, "convert", lambda value, to_type: 0 if to_type is int else value)
+
+
+def contract_config(key: str, contract) -> ContractConfig:
+    return ContractConfig(key, contract, None)
+
+
+def rotate(contracts, sender, action, summary_file):
+    return ownership.rotate_ownership(contracts, sender, action, NEW_OWNER, summary_file, max_workers=1)
+
+
+@pytest.mark.parametrize(
+    ("action", "owner", "proposed", "status"),
+    [
+        ("propose", OLD_OWNER, "0x00", None),
+        ("propose", NEW_OWNER, "0x00", "owned"),
+        ("propose", OLD_OWNER, NEW_OWNER, "proposed"),
+        ("claim", OLD_OWNER, NEW_OWNER, None),
+        ("claim", NEW_OWNER, "0x00", "owned"),
+        ("claim", OLD_OWNER, "0x00", "not proposed"),
+    ],
+)
+def test_pending_status(action, owner, proposed, status):
+    assert ownership._pending_status(action, NEW_OWNER, owner, proposed) == status
+
+
+def test_propose_skips_contracts_already_done(tmp_path):
+    contracts = {
+        "pending": contract_config("pending", FakeContract("0x10")),
+        "owned": contract_config("owned", FakeContract("0x11", owner_address=NEW_OWNER)),
+        "proposed": contract_config("proposed", FakeContract("0x12", proposed=NEW_OWNER)),
+        "not_deployed": contract_config("not_deployed", None),
+        "no_ownership": contract_config("no_ownership", WithoutOwnership("0x13")),
+    }
+
+    summary = rotate(contracts, Sender(OLD_OWNER), "propose", tmp_path / "propose.json")
+
+    assert summary.contracts == {
+        "pending": {"status": "confirmed", "nonce": 5, "txn_hash": "0x5"},
+        "owned": {"status": "skipped", "reason": "owned"},
+        "proposed": {"status": "skipped", "reason": "proposed"},
+    }
+    assert contracts["pending"].contract.calls == [("proposeOwner", 5)]
+    assert contracts["proposed"].contract.calls == []
+    assert json.loads((tmp_path / "propose.json").read_text(encoding="utf8"))["contracts"] == summary.contracts
+
+
+def test_rotation_resumed_after_a_failure(tmp_path):
+    failing = FakeContract("0x10", fails=True)
+    contracts = {"failing": contract_config("failing", failing), "other": contract_config("other", FakeContract("0x11"))}
+    summary_file = tmp_path / "propose.json"
+
+    summary = rotate(contracts, Sender(OLD_OWNER), "propose", summary_file)
+    assert summary.counts() == {"confirmed": 1, "failed": 1}
+    assert summary.contracts["failing"]["error"] == "reverted"
+
+    failing.fails = False
+    summary = rotate(contracts, Sender(OLD_OWNER, nonce=7), "propose", summary_file)
+    assert summary.contracts["failing"]["status"] == "confirmed"
+    assert summary.contracts["other"] == {"status": "skipped", "reason": "proposed"}
+
+
+def test_claim_only_proposed_contracts(tmp_path):
+    contracts = {
+        "proposed": contract_config("proposed", FakeContract("0x10", proposed=NEW_OWNER)),
+        "not_proposed": contract_config("not_proposed", FakeContract("0x11")),
+    }
+
+    summary = rotate(contracts, Sender(NEW_OWNER), "claim", tmp_path / "claim.json")
+
+    assert summary.counts() == {"confirmed": 1, "skipped": 1}
+    assert contracts["proposed"].contract.owner() == NEW_OWNER
+    assert contracts["not_proposed"].contract.calls == []
+
+
+def test_summary_of_another_target_not_resumed(tmp_path):
+    summary_file = tmp_path / "propose.json"
+    ownership.RotationSummary.load(summary_file, "propose", "0x03").record("pool", "confirmed")
+
+    assert ownership.RotationSummary.load(summary_file, "propose", NEW_OWNER).contracts == {}
+    assert ownership.RotationSummary.load(summary_file, "propose", "0x03").contracts == {"pool": {"status": "confirmed"}}
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from scripts._helpers.basetypes import ContractConfig, Environment  # noqa: PLC2701
+from scripts._helpers.repository import ConfigRepository  # noqa: PLC2701
+
+POOLS = {
+    "common": {
+        "weth": {"contract": "0x01", "contract_def": "WETH9Mock"},
+        "genesis": {"contract": "0x02", "contract_def": "GenesisPass"},
+    },
+    "configs": {"max_penalty_fee": 100},
+    "pools": {
+        "ETH-GRAILS": {
+            "contracts": {
+                "loans": {
+                    "contract": "0x10",
+                    "contract_def": "Loans",
+                    "properties": {"genesis_key": "common.genesis", "collateral_keys": ["punks"]},
+                },
+                "lending_pool": {
+                    "contract": "0x11",
+                    "contract_def": "LendingPoolPeripheral",
+                    "properties": {"token_key": "common.weth"},
+                },
+            }
+        },
+        "USDC": {"contracts": {"loans": {"contract": "0x20", "contract_def": "Loans", "properties": {}}}},
+    },
+}
+COLLECTIONS = {"punks": {"contract_address": "0x30"}, "squiggles": {"contract_address": "0x31"}}
+
+
+@pytest.fixture
+def repository(tmp_path):
+    config_dir = tmp_path / "configs" / "dev"
+    config_dir.mkdir(parents=True)
+    (config_dir / "pools.json").write_text(json.dumps(POOLS, indent=4, sort_keys=True) + "\n", encoding="utf8")
+    (config_dir / "collections.json").write_text(json.dumps(COLLECTIONS, indent=2, sort_keys=True) + "\n", encoding="utf8")
+    return ConfigRepository(Environment.dev, tmp_path)
+
+
+def read_json(repository, name: str) -> dict:
+    return json.loads((repository.pools.path.parent / name).read_text(encoding="utf8"))
+
+
+def deployed(key: str, address: str, **kwargs) -> ContractConfig:
+    contract = ContractConfig(key, None, None, **kwargs)
+    contract.load_contract(address)
+    return contract
+
+
+def test_scoped_keys_of_a_pool_include_its_references(repository):
+    assert repository.scoped_keys({"eth-grails"}) == {
+        "eth-grails.loans",
+        "eth-grails.lending_pool",
+        "common.genesis",
+        "common.weth",
+        "punks",
+    }
+
+
+def test_scoped_keys_of_a_key_prefix(repository):
+    assert repository.scoped_keys({"ETH-GRAILS.lending"}) == {"eth-grails.lending_pool", "common.weth"}
+    assert repository.scoped_keys({"usdc"}) == {"usdc.loans"}
+
+
+def test_save_without_changes_doesnt_rewrite_the_files(repository):
+    pools_path = repository.pools.path
+    before = pools_path.stat().st_mtime_ns, pools_path.read_bytes()
+
+    repository.save([deployed("usdc.loans", "0x20")])
+
+    assert (pools_path.stat().st_mtime_ns, pools_path.read_bytes()) == before
+    assert not repository.pools.dirty
+
+
+def test_save_writes_the_contract_state(repository):
+    repository.save(
+        [
+            deployed("usdc.loans", "0x21", abi_key="abi", bytecode_key="bytecode"),
+            deployed("squiggles", "0x32", nft=True),
+        ]
+    )
+
+    loans = read_json(repository, "pools.json")["pools"]["USDC"]["contracts"]["loans"]
+    assert loans == {
+        "contract": "0x21",
+        "contract_def": "Loans",
+        "properties": {},
+        "abi_key": "abi",
+        "bytecode_key": "bytecode",
+    }
+    assert read_json(repository, "collections.json")["squiggles"] == {"contract_address": "0x32"}
+    assert read_json(repository, "collections.json")["punks"] == {"contract_address": "0x30"}
+
+
+def test_save_keeps_the_file_format(repository):
+    repository.save([deployed("common.weth", "0x03")])
+
+    text = repository.pools.path.read_text(encoding="utf8")
+    assert text == json.dumps(read_json(repository, "pools.json"), indent=4, sort_keys=True) + "\n"
+    assert not list(repository.pools.path.parent.glob(".pools.json.*"))
+
+
+def test_apply_deployments_from_the_journal(repository):
+    repository.apply_deployments(
+        {
+            "eth-grails.loans": {"address": "0x12", "abi_key": "abi", "bytecode_key": None},
+            "punks": {"address": "0x33"},
+            "unknown.loans": {"address": "0x99"},
+        }
+    )
+    repository.save()
+
+    loans = read_json(repository, "pools.json")["pools"]["ETH-GRAILS"]["contracts"]["loans"]
+    assert (loans["contract"], loans["abi_key"], "bytecode_key" in loans) == ("0x12", "abi", False)
+    assert read_json(repository, "collections.json")["punks"] == {"contract_address": "0x33"}
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import pytest
+
+from scripts._helpers.basetypes import ContractConfig, DeploymentContext, Environment  # noqa: PLC2701
+from scripts._helpers.transactions import check_different, execute, execute_read  # noqa: PLC2701
+
+
+@dataclass
+class Receipt:
+    block_number: int
+    txn_hash: str = "0x01"
+
+
+# stores the values set through its setters and counts the reads reaching the chain
+@dataclass
+class FakeContract:
+    address: str
+    state: dict = field(default_factory=dict)
+    calls: int = 0
+    block: int = 100
+
+    def call_view_method(self, func, *_):
+        self.calls += 1
+        return self.state.get(func)
+
+    def __getattr__(self, name):
+        def setter(value, **_):
+            self.state[name.removeprefix("set").lower()] = value
+            self.block += 1
+            return Receipt(self.block)
+
+        return setter
+
+
+def make_context() -> DeploymentContext:
+    contracts = {
+        "pool": ContractConfig("pool", FakeContract("0xpool", {"owner": "0xowner", "fee": 1}), None),
+        "vault": ContractConfig("vault", FakeContract("0xvault", {"owner": "0xowner"}), None),
+    }
+    return DeploymentContext(contracts, Environment.local, "0xowner")
+
+
+def test_reads_are_cached():
+    context = make_context()
+
+    assert execute_read(context, "pool", "fee") == 1
+    assert execute_read(context, "pool", "fee") == 1
+
+    assert context.contracts["pool"].contract.calls == 1
+    assert (context.reads.hits, context.reads.misses) == (1, 1)
+
+
+def test_execute_invalidates_the_reads_of_the_contract():
+    context = make_context()
+    execute_read(context, "pool", "fee")
+    execute_read(context, "vault", "owner")
+
+    execute(context, "pool", "setFee", 2)
+
+    assert execute_read(context, "pool", "fee") == 2
+    assert execute_read(context, "vault", "owner") == "0xowner"
+    assert context.contracts["pool"].contract.calls == 2
+    assert context.contracts["vault"].contract.calls == 1
+
+
+def test_execute_advances_the_cache_block():
+    context = make_context()
+    context.reads.block = 100
+
+    execute(context, "pool", "setFee", 2)
+
+    assert context.reads.block == 101
+
+
+class Pool(ContractConfig):
+    loans_key = "loans"
+
+    @check_different(getter="loans", value_property="loans_key")
+    def set_loans(self, context):
+        execute(context, self.key, "setLoans", self.loans_key)
+
+
+def wiring_context(env: Environment, loans_address: str | None, *, empty_chain=False) -> DeploymentContext:
+    loans = ContractConfig("loans", None, None)
+    if loans_address:
+        loans.load_contract(loans_address)
+    contracts = {"pool": Pool("pool", FakeContract("0xpool"), None), "loans": loans}
+    return DeploymentContext(contracts, env, "0xowner", backend=SimpleNamespace(empty_chain=empty_chain))
+
+
+def test_setter_sent_when_the_value_differs():
+    context = wiring_context(Environment.dev, "0xloans")
+
+    context.contracts["pool"].set_loans(context)
+
+    assert context.contracts["pool"].contract.state["loans"] == "0xloans"
+    assert context.failed == []
+
+
+@pytest.mark.parametrize(("env", "empty_chain"), [(Environment.local, False), (Environment.dev, True)])
+def test_setter_skipped_for_contracts_missing_on_local_chains(env, empty_chain):
+    context = wiring_context(env, None, empty_chain=empty_chain)
+
+    context.contracts["pool"].set_loans(context)
+
+    assert "loans" not in context.contracts["pool"].contract.state
+    assert context.failed == []
+
+
+def test_setter_fails_for_contracts_missing_on_live_networks():
+    context = wiring_context(Environment.prod, None)
+
+    context.contracts["pool"].set_loans(context)
+
+    assert "loans" not in context.contracts["pool"].contract.state
+    assert context.failed == ["pool.loans"]
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from threading import Event
+
+from scripts._helpers.txqueue import TransactionQueue  # noqa: PLC2701
+
+
+@dataclass
+class Receipt:
+    nonce: int
+    txn_hash: str = "0x01"
+
+
+# records the nonces of the transfers filling the gaps left by failed transactions
+@dataclass
+class FakeAccount:
+    transfers: list[int] = field(default_factory=list)
+
+    def transfer(self, *_, nonce, **__):
+        self.transfers.append(nonce)
+
+
+def send(nonce):
+    return Receipt(nonce)
+
+
+def fail(nonce):
+    raise ValueError(f"reverted at {nonce}")
+
+
+def test_nonces_assigned_in_submission_order():
+    queue = TransactionQueue(FakeAccount(), 7, max_workers=4)
+
+    transactions = [queue.submit(f"tx-{i}", send) for i in range(5)]
+    queue.wait()
+
+    assert [t.nonce for t in transactions] == [7, 8, 9, 10, 11]
+    assert [t.receipt.nonce for t in transactions] == [7, 8, 9, 10, 11]
+    assert queue.nonce == 12
+    assert queue.failed() == []
+
+
+def test_sending_doesnt_wait_for_previous_transactions():
+    queue = TransactionQueue(FakeAccount(), 0, max_workers=2)
+    second_sent = Event()
+
+    def first(nonce):
+        assert second_sent.wait(timeout=5)
+        return Receipt(nonce)
+
+    def second(nonce):
+        second_sent.set()
+        return Receipt(nonce)
+
+    queue.submit("first", first)
+    queue.submit("second", second)
+    queue.wait()
+
+    assert queue.failed() == []
+
+
+def test_failures_are_reported_and_their_nonce_filled():
+    account = FakeAccount()
+    queue = TransactionQueue(account, 0, max_workers=1)
+    confirmed = []
+
+    queue.submit("ok", send, on_confirm=confirmed.append)
+    failed = queue.submit("failed", fail, on_confirm=confirmed.append)
+    queue.submit("after", send, on_confirm=confirmed.append)
+    queue.wait()
+
+    assert queue.failed() == [failed]
+    assert isinstance(failed.error, ValueError)
+    assert failed.receipt is None
+    assert account.transfers == [1]
+    assert [r.nonce for r in confirmed] == [0, 2]
+
+
+def test_failed_confirmation_fails_the_transaction():
+    queue = TransactionQueue(FakeAccount(), 0, max_workers=1)
+
+    def on_confirm(receipt):
+        raise RuntimeError("journal not writable")
+
+    account = queue.account
+    transaction = queue.submit("tx", send, on_confirm=on_confirm)
+    queue.wait()
+
+    assert queue.failed() == [transaction]
+    assert isinstance(transaction.error, RuntimeError)
+    # the transaction was sent, so its nonce isn't filled
+    assert account.transfers == []